@@ -0,0 +1,113 @@
+from typing import Tuple
+import numpy as np
+
+try:
+    from scipy.optimize import linear_sum_assignment  # optional (Hungarian)
+except Exception:
+    linear_sum_assignment = None
+
+# Cost yang lebih besar dari ini dianggap "tidak boleh dipasangkan" (di luar gate)
+GATED_COST = 1e6
+
+
+def box_centers(boxes: np.ndarray) -> np.ndarray:
+    """(N,4) xyxy -> (N,2) centroid, dibulatkan seperti tracker lama (integer //2)."""
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    return np.floor((boxes[:, 0:2] + boxes[:, 2:4]) * 0.5)
+
+
+def box_areas(boxes: np.ndarray) -> np.ndarray:
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    return np.clip(boxes[:, 2] - boxes[:, 0], 0, None) * np.clip(boxes[:, 3] - boxes[:, 1], 0, None)
+
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """IoU pairwise (A,B) antara dua set bbox xyxy, via broadcasting."""
+    a = np.asarray(a, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float64).reshape(-1, 4)
+    ix1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    iy1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    ix2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    iy2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None)
+    union = box_areas(a)[:, None] + box_areas(b)[None, :] - inter
+    return np.where(union > 0, inter / np.where(union > 0, union, 1.0), 0.0)
+
+
+def association_cost(track_boxes: np.ndarray, det_boxes: np.ndarray, max_dist: float,
+                     iou_weight: float = 0.0, size_weight: float = 0.0) -> np.ndarray:
+    """
+    Matriks cost (T,D) track vs deteksi.
+    - Jarak centroid dinormalisasi ke max_dist (0..1 di dalam gate).
+    - iou_weight > 0 menambah (1 - IoU) * weight.
+    - size_weight > 0 menambah |log(area_det / area_track)| * weight.
+    Pasangan dengan jarak > max_dist diberi GATED_COST.
+    """
+    tc = box_centers(track_boxes)
+    dc = box_centers(det_boxes)
+    diff = tc[:, None, :] - dc[None, :, :]
+    dist = np.sqrt((diff * diff).sum(axis=2))
+    scale = float(max_dist) if max_dist > 0 else 1.0
+    cost = dist / scale
+    if iou_weight > 0:
+        cost = cost + iou_weight * (1.0 - iou_matrix(track_boxes, det_boxes))
+    if size_weight > 0:
+        ta = np.maximum(box_areas(track_boxes), 1.0)
+        da = np.maximum(box_areas(det_boxes), 1.0)
+        cost = cost + size_weight * np.abs(np.log(da[None, :] / ta[:, None]))
+    cost[dist > max_dist] = GATED_COST
+    return cost
+
+
+def iou_cost(track_boxes: np.ndarray, det_boxes: np.ndarray, min_iou: float) -> np.ndarray:
+    """Cost (1 - IoU); pasangan dengan IoU < min_iou diberi GATED_COST."""
+    iou = iou_matrix(track_boxes, det_boxes)
+    cost = 1.0 - iou
+    cost[iou < min_iou] = GATED_COST
+    return cost
+
+
+def greedy_assignment(cost: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Greedy global: urutkan semua pasangan valid sekali, ambil yang termurah dulu."""
+    rows, cols = np.nonzero(cost < GATED_COST)
+    if rows.size == 0:
+        return rows, cols
+    order = np.argsort(cost[rows, cols], kind="stable")
+    rows, cols = rows[order], cols[order]
+    row_used = np.zeros(cost.shape[0], dtype=bool)
+    col_used = np.zeros(cost.shape[1], dtype=bool)
+    keep = np.zeros(rows.size, dtype=bool)
+    n_max = min(cost.shape)
+    n = 0
+    for k in range(rows.size):
+        r = rows[k]; c = cols[k]
+        if row_used[r] or col_used[c]:
+            continue
+        row_used[r] = True; col_used[c] = True
+        keep[k] = True
+        n += 1
+        if n >= n_max:
+            break
+    return rows[keep], cols[keep]
+
+
+def solve_assignment(cost: np.ndarray, method: str = "auto") -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pasangkan baris (track) ke kolom (deteksi). Return (rows, cols) yang lolos gate.
+    method: "hungarian" (scipy bila ada), "greedy", atau "auto" (hungarian bila scipy tersedia).
+    """
+    empty = np.zeros(0, dtype=np.intp)
+    if cost.size == 0:
+        return empty, empty
+    if method in ("auto", "hungarian") and linear_sum_assignment is not None:
+        # Buang baris/kolom yang seluruhnya di luar gate agar solver lebih kecil
+        valid = cost < GATED_COST
+        r_idx = np.flatnonzero(valid.any(axis=1))
+        c_idx = np.flatnonzero(valid.any(axis=0))
+        if r_idx.size == 0:
+            return empty, empty
+        sub = cost[np.ix_(r_idx, c_idx)]
+        rows, cols = linear_sum_assignment(sub)
+        ok = sub[rows, cols] < GATED_COST
+        return r_idx[rows[ok]], c_idx[cols[ok]]
+    return greedy_assignment(cost)
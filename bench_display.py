@@ -0,0 +1,118 @@
+"""
+Benchmark jalur tampilan frame -> canvas (tanpa Tk): CPU per frame jalur lama
+(cvtColor + PIL LANCZOS, alokasi baru tiap frame) vs CanvasView (cv2.resize ke buffer prealokasi).
+Biaya Tk (PhotoImage/paste) tidak termasuk; lihat label Display di aplikasi untuk angka end-to-end.
+Dengan --overlay: biaya gambar track (box/label/titik/path) per jumlah track, gambar per track
+lama vs draw_tracks batch di resolusi capture dan resolusi tampilan.
+
+    python bench_display.py
+    python bench_display.py --frame 1920x1080 --canvas 960x540 1280x720 --frames 200
+    python bench_display.py --overlay --tracks 10 50 100 200
+"""
+import argparse
+
+import cv2
+import numpy as np
+
+from config import CLASS_NAMES, COLOR_CONFIG
+from display_path import CanvasView, legacy_render, cpu_time
+from overlay import LabelSprites, draw_tracks
+from synthetic_traffic import generate
+from vehicle_tracker import VehicleTracker
+
+STYLES = {
+    True: (COLOR_CONFIG['counted_vehicle'], COLOR_CONFIG['center_dot_counted'], COLOR_CONFIG['tracking_path_counted'], "[COUNTED]"),
+    False: (COLOR_CONFIG['active_vehicle'], COLOR_CONFIG['center_dot_active'], COLOR_CONFIG['tracking_path'], "[ACTIVE]"),
+}
+
+
+def legacy_draw_tracks(frame, snap, max_pts: int = 10):
+    """Referensi gambar per track lama: rectangle/getTextSize/putText/circle/line satu per satu."""
+    H, W = frame.shape[:2]
+    for i in range(len(snap)):
+        x1, y1, x2, y2 = np.clip(snap.boxes[i], 0, [W - 1, H - 1, W - 1, H - 1]).astype(int).tolist()
+        box_color, center_color, path_color, prefix = STYLES[bool(snap.counted[i])]
+        cv2.rectangle(frame, (x1, y1), (x2, y2), box_color, 2)
+        label = f"{prefix} ID:{int(snap.ids[i])} {CLASS_NAMES.get(int(snap.classes[i]), 'unknown')} {float(snap.confidences[i]):.2f}"
+        (tw, th), base = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)
+        y_text = max(th + base + 2, y1)
+        cv2.rectangle(frame, (x1, y_text - th - base), (x1 + tw, y_text), box_color, -1)
+        cv2.putText(frame, label, (x1, y_text - 4), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+        cv2.circle(frame, ((x1 + x2) // 2, (y1 + y2) // 2), 3, center_color, -1)
+        path = snap.path(i, max_pts + 1).tolist()
+        for j in range(1, len(path)):
+            cv2.line(frame, tuple(path[j - 1]), tuple(path[j]), path_color, 2)
+
+
+def bench_overlay(n_tracks, frames: int, fw: int, fh: int, cw: int, ch: int):
+    print(f"{'tracks':>7} {'legacy ms':>10} {'batch ms':>9} {'batch@display ms':>17}")
+    for n in n_tracks:
+        scene = generate(n, 40, lanes=max(4, n // 6), width=fw, height=fh, occlusions=0, dropout=0.0)
+        tracker = VehicleTracker()
+        for f in range(len(scene)):
+            tracker.update_tracking(scene.detections(f), timestamp=float(scene.timestamps[f]))
+        snap = tracker.snapshot()
+        base = np.zeros((fh, fw, 3), dtype=np.uint8)
+        view = CanvasView()
+        view.layout(fw, fh, cw, ch)
+        small = np.zeros((view.size[1], view.size[0], 3), dtype=np.uint8)
+        sprites = LabelSprites()
+        runs = {
+            "legacy": lambda img: legacy_draw_tracks(img, snap),
+            "batch": lambda img: draw_tracks(img, snap, sprites, STYLES, CLASS_NAMES),
+            "display": lambda img: draw_tracks(img, snap, sprites, STYLES, CLASS_NAMES, scale=view.scale),
+        }
+        out = {}
+        for name, fn in runs.items():
+            img = small if name == "display" else base
+            fn(img)
+            t0 = cpu_time()
+            for _ in range(frames):
+                fn(img)
+            out[name] = (cpu_time() - t0) * 1000.0 / frames
+        print(f"{len(snap):>7} {out['legacy']:>10.2f} {out['batch']:>9.2f} {out['display']:>17.2f}")
+
+
+def _size(text: str):
+    w, h = text.lower().split("x")
+    return int(w), int(h)
+
+
+def bench(render, frames) -> float:
+    t0 = cpu_time()
+    for f in frames:
+        render(f)
+    return (cpu_time() - t0) * 1000.0 / len(frames)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark jalur tampilan")
+    ap.add_argument("--frame", nargs="+", default=["1280x720", "1920x1080"])
+    ap.add_argument("--canvas", nargs="+", default=["800x450", "1280x720"])
+    ap.add_argument("--frames", type=int, default=100)
+    ap.add_argument("--interpolation", default="area", choices=["area", "linear", "nearest"])
+    ap.add_argument("--overlay", action="store_true", help="benchmark gambar track, bukan resize")
+    ap.add_argument("--tracks", type=int, nargs="+", default=[10, 50, 100, 200])
+    args = ap.parse_args()
+    if args.overlay:
+        fw, fh = _size(args.frame[-1])
+        cw, ch = _size(args.canvas[0])
+        bench_overlay(args.tracks, args.frames, fw, fh, cw, ch)
+        return
+
+    rng = np.random.default_rng(0)
+    print(f"{'frame':>10} {'canvas':>10} {'legacy ms':>10} {'fast ms':>8} {'speedup':>8}")
+    for fs in args.frame:
+        fw, fh = _size(fs)
+        frames = [rng.integers(0, 256, (fh, fw, 3), dtype=np.uint8) for _ in range(4)] * max(1, args.frames // 4)
+        for cs in args.canvas:
+            cw, ch = _size(cs)
+            view = CanvasView(args.interpolation)
+            view.layout(fw, fh, cw, ch)
+            old_ms = bench(lambda f: legacy_render(f, cw, ch), frames)
+            new_ms = bench(view.render, frames)
+            print(f"{fs:>10} {cs:>10} {old_ms:>10.2f} {new_ms:>8.2f} {old_ms / max(new_ms, 1e-6):>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
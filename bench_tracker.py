@@ -0,0 +1,193 @@
+"""
+Benchmark tracker + counter di atas lalu lintas sintetis (synthetic_traffic.py).
+
+Per backend tracker (tracker_backends.BACKENDS) dan jumlah objek simultan dilaporkan:
+latency per frame (p50/p90/p99/max) untuk update_tracking + check_line_crossings_directional,
+alokasi memori per frame (tracemalloc, pass terpisah), akurasi hitung vs ground truth,
+jumlah ID, dan ID switch (perubahan track ID pada kendaraan GT yang sama).
+Dengan --recording, semua backend diberi urutan deteksi identik dari rekaman
+detection_log (tanpa ground truth: latency, jumlah ID, hasil hitung).
+
+Contoh:
+    python bench_tracker.py
+    python bench_tracker.py --objects 10 50 100 200 500 --frames 300 --assignment greedy
+    python bench_tracker.py --dropout 0.1 --occlusions 3 --seed 7
+    python bench_tracker.py --backends vehicle simple --recording recordings/det_20240101_080000
+"""
+import argparse
+import time
+import tracemalloc
+from typing import Any, Callable, Dict
+
+import numpy as np
+
+from association import iou_matrix
+from config import TRACKING_CONFIG
+from detection_log import iter_frames
+from synthetic_traffic import generate, SyntheticScene
+from tracker_backends import BACKENDS
+
+
+class TrackerBench:
+    """Adapter benchmark: satu frame = update_tracking + crossing garis."""
+
+    def __init__(self, factory: Callable[[], Any], line, high_conf: float = 0.40):
+        self.tracker = factory()
+        self.line = line
+        self.line_settings = {"invert_direction": False}
+        self.high_conf = high_conf
+
+    def step(self, detections, timestamp, frames_elapsed: int = 1):
+        self.tracker.update_tracking(detections, frames_elapsed, high_conf=self.high_conf, timestamp=timestamp)
+        self.tracker.check_line_crossings_directional(self.line, self.line_settings)
+
+    def counts(self) -> Dict[str, Any]:
+        return self.tracker.get_counts()
+
+    def ids(self) -> int:
+        return self.tracker.next_id - 1
+
+    def track_ids_for(self, boxes: np.ndarray) -> np.ndarray:
+        """Track ID (terdeteksi frame ini) untuk setiap bbox deteksi, -1 bila tidak ada (IoU < 0.3)."""
+        snap = self.tracker.snapshot()
+        out = np.full(len(boxes), -1, dtype=np.int64)
+        live = np.flatnonzero(snap.updated)
+        if live.size == 0 or len(boxes) == 0:
+            return out
+        iou = iou_matrix(boxes, snap.boxes[live])
+        best = iou.argmax(axis=1)
+        ok = iou[np.arange(len(boxes)), best] >= 0.3
+        out[ok] = snap.ids[live[best[ok]]]
+        return out
+
+
+def count_accuracy(counts: Dict[str, Any], gt: Dict[str, Any]) -> float:
+    """1 - (selisih absolut per arah & kelas) / total ground truth."""
+    err = sum(abs(counts[d].get(c, 0) - n) for d in ("up", "down") for c, n in gt[d].items())
+    total = gt["total_up"] + gt["total_down"]
+    return 1.0 - err / total if total else 1.0
+
+
+def run(factory, scene: SyntheticScene, warmup: int = 5, alloc_frames: int = 50) -> Dict[str, Any]:
+    dets = [scene.detections(f) for f in range(len(scene))]
+    ts = scene.timestamps.tolist()
+
+    bench = TrackerBench(factory, scene.line)
+    lat = np.zeros(len(scene))
+    last_tid: Dict[int, int] = {}
+    switches = 0
+    for f in range(len(scene)):
+        t0 = time.perf_counter()
+        bench.step(dets[f], ts[f])
+        lat[f] = time.perf_counter() - t0
+        boxes, _, _, vids = scene.frames[f]
+        for vid, tid in zip(vids.tolist(), bench.track_ids_for(boxes).tolist()):
+            if tid < 0:
+                continue
+            prev = last_tid.get(vid)
+            if prev is not None and prev != tid:
+                switches += 1
+            last_tid[vid] = tid
+    lat_ms = lat[warmup:] * 1000.0
+    acc = count_accuracy(bench.counts(), scene.gt_counts())
+    ids = bench.ids()
+
+    # Pass terpisah (tracemalloc memperlambat): puncak alokasi transien per frame
+    bench = TrackerBench(factory, scene.line)
+    for f in range(min(warmup, len(scene))):
+        bench.step(dets[f], ts[f])
+    peaks = []
+    tracemalloc.start()
+    for f in range(warmup, min(len(scene), warmup + alloc_frames)):
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        bench.step(dets[f], ts[f])
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+
+    return {
+        "p50": float(np.percentile(lat_ms, 50)),
+        "p90": float(np.percentile(lat_ms, 90)),
+        "p99": float(np.percentile(lat_ms, 99)),
+        "max": float(lat_ms.max()),
+        "alloc_kb": float(np.mean(peaks)) / 1024.0 if peaks else 0.0,
+        "accuracy": acc,
+        "ids": ids,
+        "idsw": switches,
+        "idsw_per_100": 100.0 * switches / max(1, len(last_tid)),
+    }
+
+
+def run_recording(factory, path: str) -> Dict[str, Any]:
+    """Urutan deteksi identik dari rekaman detection_log; garis & high_conf sesuai rekaman."""
+    bench = TrackerBench(factory, None)
+    lat = []
+    last_idx = -1
+    for fi, ts, high, line, boxes, classes, conf in iter_frames(path):
+        bench.high_conf = high
+        bench.line = None if line is None else [tuple(map(int, line[0])), tuple(map(int, line[1]))]
+        dets = [{"bbox": b, "class": c, "confidence": p}
+                for b, c, p in zip(boxes.tolist(), classes.tolist(), conf.tolist())]
+        elapsed = fi - last_idx if last_idx >= 0 else 1
+        last_idx = fi
+        t0 = time.perf_counter()
+        bench.step(dets, ts, elapsed)
+        lat.append(time.perf_counter() - t0)
+    lat_ms = np.array(lat or [0.0]) * 1000.0
+    c = bench.counts()
+    return {"frames": len(lat), "p50": float(np.percentile(lat_ms, 50)), "p99": float(np.percentile(lat_ms, 99)),
+            "ids": bench.ids(), "up": c["total_up"], "down": c["total_down"]}
+
+
+def _available(names):
+    ok = {}
+    for name in names:
+        try:
+            BACKENDS[name]()
+            ok[name] = BACKENDS[name]
+        except Exception as e:
+            print(f"skip backend {name}: {e}")
+    return ok
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark tracker/counter di lalu lintas sintetis")
+    ap.add_argument("--objects", type=int, nargs="+", default=[10, 50, 100, 200, 500])
+    ap.add_argument("--frames", type=int, default=300)
+    ap.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    ap.add_argument("--assignment", choices=["auto", "hungarian", "greedy"], default=None)
+    ap.add_argument("--lanes", type=int, default=0, help="0 = otomatis (sesuai jumlah objek)")
+    ap.add_argument("--jitter", type=float, default=1.5)
+    ap.add_argument("--dropout", type=float, default=0.03)
+    ap.add_argument("--occlusions", type=int, default=1)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--recording", default=None, help="folder rekaman detection_log (ganti scene sintetis)")
+    args = ap.parse_args()
+    if args.assignment:
+        TRACKING_CONFIG["assignment"] = args.assignment
+    backends = _available(args.backends)
+
+    if args.recording:
+        print(f"{'backend':>10} {'frames':>7} {'p50 ms':>8} {'p99 ms':>8} {'ids':>6} {'up':>5} {'down':>5}")
+        for name, factory in backends.items():
+            r = run_recording(factory, args.recording)
+            print(f"{name:>10} {r['frames']:>7} {r['p50']:>8.3f} {r['p99']:>8.3f} {r['ids']:>6} {r['up']:>5} {r['down']:>5}")
+        return
+
+    print(f"assignment={TRACKING_CONFIG.get('assignment', 'auto')} frames={args.frames} "
+          f"jitter={args.jitter} dropout={args.dropout} occlusions={args.occlusions}")
+    print(f"{'backend':>10} {'objects':>7} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8} "
+          f"{'alloc KB':>9} {'accuracy':>9} {'gt/ids':>10} {'idsw':>6} {'idsw/100':>8}")
+    for n in args.objects:
+        lanes = args.lanes or max(4, n // 6)
+        scene = generate(n, args.frames, lanes=lanes, jitter=args.jitter, dropout=args.dropout,
+                         occlusions=args.occlusions, seed=args.seed)
+        for name, factory in backends.items():
+            r = run(factory, scene)
+            print(f"{name:>10} {n:>7} {r['p50']:>8.3f} {r['p90']:>8.3f} {r['p99']:>8.3f} {r['max']:>8.3f} "
+                  f"{r['alloc_kb']:>9.1f} {r['accuracy']:>9.3f} {scene.n_vehicles:>4}/{r['ids']:<5} "
+                  f"{r['idsw']:>6} {r['idsw_per_100']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
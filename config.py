@@ -35,6 +35,13 @@ class SettingsManager:
                 "band_px": 12,
                 "invert_direction": False
             },
+            "counting": {
+                # Garis & zona tambahan, mis.
+                # "lines": [{"name": "north", "points": [[x1, y1], [x2, y2]], "invert_direction": false}]
+                # "zones": [{"name": "lane1", "polygon": [[x, y], [x, y], [x, y], ...]}]
+                "lines": [],
+                "zones": []
+            },
             "input": {
                 "type": "screen",
                 "webcam_index": 0,
@@ -51,13 +58,61 @@ class SettingsManager:
                 "detection_stride": 3,
                 "predict_missing": False,
                 "max_prediction_frames": 1,
+                "motion_model": "kalman",          # "kalman" (constant-velocity) atau "linear" (2 titik terakhir)
+                "tracker_backend": "vehicle",      # "vehicle" (VehicleTracker), "simple" (try/tracking.py), "bytetrack" (ultralytics)
                 "use_class_filter": True,
                 "draw_paths": True,
                 "max_path_points_drawn": 10,
+                "overlay_resolution": "capture",   # "capture" (gambar di frame asli) atau "display" (di buffer canvas)
                 "flush_frames": 2,
+                "display_path": "fast",            # "fast" (cv2.resize ke buffer + 1 item canvas) atau "legacy" (PIL LANCZOS, pembanding)
+                "display_interpolation": "area",   # "area", "linear", "nearest" (upscale selalu linear)
+                "display_fps": 30,                 # laju timer refresh canvas (hanya frame terbaru yang ditampilkan)
+                "ui_refresh_ms": 200,              # interval task UI yang menerapkan perubahan label hitungan/FPS
+                "count_only": False,               # stasiun tanpa operator: tanpa gambar/tampilan, counter/DB/event tetap jalan
+                "count_only_thumbnail_sec": 1.0,   # interval thumbnail di mode count_only (0 = hanya tombol Thumbnail)
                 "use_mss_screen_capture": True,
                 "win_force_dpi_awareness": True,
 
+                # Rekam deteksi per frame (npz) untuk replay tracker/counter tanpa YOLO
+                "record_detections": False,
+                "record_dir": "recordings",
+                "record_chunk_frames": 3000,
+                # Rekaman video teranotasi (audit), encode di thread writer; frame dibuang bila antrean penuh
+                "record_video": False,
+                "record_video_backend": "opencv",  # "opencv" (cv2.VideoWriter mp4v) atau "ffmpeg" (pipe libx264)
+                "record_video_fps": 15,
+                "record_video_width": 0,           # 0 = resolusi capture
+                "record_video_segment_sec": 600,   # rotasi segmen per durasi (0 = nonaktif)
+                "record_video_segment_mb": 0,      # rotasi segmen per ukuran file (0 = nonaktif)
+                "record_video_queue": 32,
+
+                # DVR pra-event: ring JPEG frame mentah di memori, klip disimpan saat crossing / manual
+                "dvr_enabled": False,
+                "dvr_pre_seconds": 10,
+                "dvr_post_seconds": 3,
+                "dvr_fps": 10,
+                "dvr_width": 960,                  # 0 = resolusi capture
+                "dvr_jpeg_quality": 75,
+                "dvr_memory_mb": 64,               # batas memori ring (prealokasi)
+                "dvr_trigger_classes": ["truck", "bus"],   # "*" = semua kelas, [] = manual saja
+
+                # Crop bukti per kendaraan terhitung (JPEG + index.csv), ditulis thread pool
+                "evidence_enabled": False,
+                "evidence_dir": "evidence",
+                "evidence_workers": 2,
+                "evidence_max_pending": 64,        # crop tertunda maksimum; lebih dari ini dibuang
+                "evidence_padding": 0.1,           # margin crop relatif terhadap ukuran bbox
+                "evidence_jpeg_quality": 90,
+
+                # Preview LAN (MJPEG + JSON hitungan), encode di thread sendiri
+                "preview_server": False,
+                "preview_host": "0.0.0.0",
+                "preview_port": 8080,
+                "preview_fps": 5,
+                "preview_width": 640,
+                "preview_jpeg_quality": 70,
+
                 # Stabilizer & clamp (dipakai di mode tracking non-RAW)
                 "strict_clamp_boxes": True,
                 "bbox_smooth_mode": "adaptive",
@@ -106,13 +161,37 @@ settings_manager = SettingsManager()
 MODEL_CONFIG = settings_manager.settings["model"]
 DEFAULT_LINE_SETTINGS = settings_manager.settings["line_settings"]
 RUNTIME_CONFIG = settings_manager.settings["runtime"]
+COUNTING_CONFIG = settings_manager.settings["counting"]
 
 TRACKING_CONFIG = {
     "min_detection_size": 20,
     "max_track_lost_frames": 15,
     "max_match_distance": 80,
+    # Asosiasi track-deteksi: "auto" (Hungarian bila scipy ada), "hungarian", "greedy"
+    "assignment": "auto",
+    "iou_weight": 0.0,
+    "size_weight": 0.0,
+    # Two-stage (ByteTrack-style): deteksi low-confidence hanya menyambung track lama via IoU
+    "two_stage_association": True,
+    "low_confidence": 0.10,
+    "low_match_iou": 0.30,
+    # Re-ID appearance (histogram HSV crop bbox) untuk menyambung track yang hilang karena oklusi
+    "reid": False,
+    "reid_gallery_size": 64,          # maks. track hilang yang diingat
+    "reid_max_lost_frames": 90,       # umur entri galeri (frame video)
+    "reid_min_similarity": 0.80,      # koef. Bhattacharyya minimal (0..1)
+    "reid_max_distance": 300,         # px dari posisi prediksi
+    "reid_refresh_frames": 5,         # descriptor track aktif diperbarui tiap N frame
+    "reid_max_crops": 16,             # budget per frame: jumlah crop
+    "reid_budget_ms": 3.0,            # budget per frame: milidetik
     "predict_missing": RUNTIME_CONFIG["predict_missing"],
-    "max_prediction_frames": RUNTIME_CONFIG["max_prediction_frames"]
+    "max_prediction_frames": RUNTIME_CONFIG["max_prediction_frames"],
+    "motion_model": RUNTIME_CONFIG.get("motion_model", "kalman"),
+    "backend": RUNTIME_CONFIG.get("tracker_backend", "vehicle"),
+    "bbox_smooth_mode": RUNTIME_CONFIG.get("bbox_smooth_mode", "adaptive"),
+    "bbox_smooth_alpha": RUNTIME_CONFIG.get("bbox_smooth_alpha", 0.4),
+    "bbox_smooth_alpha_missed": RUNTIME_CONFIG.get("bbox_smooth_alpha_missed", 0.75),
+    "bbox_max_shift_px": RUNTIME_CONFIG.get("bbox_max_shift_px", 48),
 }
 
 CLASS_NAMES = {2: "car", 3: "motorcycle", 5: "bus", 7: "truck"}
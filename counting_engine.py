@@ -0,0 +1,226 @@
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+
+from config import CLASS_NAMES
+
+COUNT_CLASSES = ["car", "motorcycle", "bus", "truck"]
+DIRECTIONS = ["up", "down"]
+ZONE_EVENTS = ["entered", "exited"]
+
+
+class CrossingEvent(NamedTuple):
+    kind: str            # "line" / "zone"
+    name: str            # nama garis/zona ("main" = garis hitung utama)
+    track_id: int
+    direction: str       # up/down (garis) atau entered/exited (zona)
+    class_name: str
+    timestamp: float     # interpolasi di titik potong (epoch detik)
+    x: float
+    y: float
+
+
+# kolom counter -> class id COCO
+COUNT_CLASS_IDS = np.array([next(cid for cid, n in CLASS_NAMES.items() if n == name) for name in COUNT_CLASSES],
+                           dtype=np.int32)
+
+
+def _class_lut() -> np.ndarray:
+    # class id COCO -> kolom counter; kelas tak dikenal dihitung sebagai "car" (sama seperti tracker lama)
+    lut = np.zeros(max(CLASS_NAMES) + 1, dtype=np.intp)
+    for cid, name in CLASS_NAMES.items():
+        if name in COUNT_CLASSES:
+            lut[cid] = COUNT_CLASSES.index(name)
+    return lut
+
+
+_LUT = _class_lut()
+
+
+def class_columns(class_ids: np.ndarray) -> np.ndarray:
+    """class id COCO (array) -> kolom counter (COUNT_CLASSES)."""
+    cls_ids = np.asarray(class_ids, dtype=np.intp)
+    return np.where(cls_ids < len(_LUT), _LUT[np.clip(cls_ids, 0, len(_LUT) - 1)], 0)
+
+
+class CountingEngine:
+    """
+    Counter untuk banyak garis bernama dan zona poligon.
+    Setiap segmen gerak track (titik sebelum -> titik sekarang) diuji terhadap
+    semua garis dalam satu operasi broadcasting (N segmen x L garis), dan terhadap
+    semua zona lewat satu ray-casting gabungan seluruh edge poligon.
+    Counter disimpan di array: lines (L, 2 arah, C kelas), zones (Z, 2 event, C kelas).
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        # Naik setiap geometri garis/zona berubah (cache overlay statis digambar ulang)
+        self.geometry_version = getattr(self, "geometry_version", 0) + 1
+        self.line_names: List[str] = []
+        self._p1 = np.zeros((0, 2), dtype=np.float64)
+        self._p2 = np.zeros((0, 2), dtype=np.float64)
+        self._invert = np.zeros(0, dtype=bool)
+        self.line_counts = np.zeros((0, len(DIRECTIONS), len(COUNT_CLASSES)), dtype=np.int64)
+        # track id -> bitmask garis yang sudah menghitung track tsb
+        self._counted: Dict[int, int] = {}
+
+        self.zone_names: List[str] = []
+        self._polygons: List[np.ndarray] = []
+        self._edges_a = np.zeros((0, 2), dtype=np.float64)
+        self._edges_b = np.zeros((0, 2), dtype=np.float64)
+        self._zone_starts = np.zeros(0, dtype=np.intp)
+        self.zone_counts = np.zeros((0, len(ZONE_EVENTS), len(COUNT_CLASSES)), dtype=np.int64)
+
+    def __bool__(self):
+        return bool(self.line_names or self.zone_names)
+
+    # ===== konfigurasi =====
+    def add_line(self, name: str, p1, p2, invert_direction: bool = False):
+        self.geometry_version += 1
+        if name in self.line_names:
+            i = self.line_names.index(name)
+            self._p1[i] = p1
+            self._p2[i] = p2
+            self._invert[i] = bool(invert_direction)
+            return
+        self.line_names.append(name)
+        self._p1 = np.vstack([self._p1, np.asarray(p1, dtype=np.float64).reshape(1, 2)])
+        self._p2 = np.vstack([self._p2, np.asarray(p2, dtype=np.float64).reshape(1, 2)])
+        self._invert = np.append(self._invert, bool(invert_direction))
+        self.line_counts = np.concatenate(
+            [self.line_counts, np.zeros((1, len(DIRECTIONS), len(COUNT_CLASSES)), dtype=np.int64)])
+
+    def add_zone(self, name: str, polygon: Sequence[Sequence[float]]):
+        poly = np.asarray(polygon, dtype=np.float64).reshape(-1, 2)
+        if poly.shape[0] < 3:
+            raise ValueError(f"Zone '{name}' needs at least 3 points")
+        self.geometry_version += 1
+        if name in self.zone_names:
+            self._polygons[self.zone_names.index(name)] = poly
+        else:
+            self.zone_names.append(name)
+            self._polygons.append(poly)
+            self.zone_counts = np.concatenate(
+                [self.zone_counts, np.zeros((1, len(ZONE_EVENTS), len(COUNT_CLASSES)), dtype=np.int64)])
+        self._pack_zones()
+
+    def _pack_zones(self):
+        self._edges_a = np.concatenate([p for p in self._polygons]) if self._polygons else np.zeros((0, 2))
+        self._edges_b = np.concatenate([np.roll(p, -1, axis=0) for p in self._polygons]) if self._polygons else np.zeros((0, 2))
+        sizes = [p.shape[0] for p in self._polygons]
+        self._zone_starts = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.intp) if sizes else np.zeros(0, dtype=np.intp)
+
+    def load(self, cfg: Dict[str, Any]):
+        """Muat garis & zona dari settings["counting"]."""
+        self.clear()
+        for i, ln in enumerate(cfg.get("lines", []) or []):
+            pts = ln.get("points") or []
+            if len(pts) != 2:
+                continue
+            self.add_line(str(ln.get("name", f"line{i + 1}")), pts[0], pts[1], bool(ln.get("invert_direction", False)))
+        for i, zn in enumerate(cfg.get("zones", []) or []):
+            poly = zn.get("polygon") or []
+            if len(poly) >= 3:
+                self.add_zone(str(zn.get("name", f"zone{i + 1}")), poly)
+
+    def reset_counts(self):
+        self.line_counts[:] = 0
+        self.zone_counts[:] = 0
+        self._counted = {}
+
+    def forget(self, track_ids: Sequence[int]):
+        for tid in track_ids:
+            self._counted.pop(int(tid), None)
+
+    # ===== evaluasi =====
+    def _points_in_zones(self, pts: np.ndarray) -> np.ndarray:
+        """(N, Z) bool: titik di dalam poligon (ray casting, semua edge sekaligus)."""
+        a, b = self._edges_a, self._edges_b
+        px = pts[:, 0:1]
+        py = pts[:, 1:2]
+        straddle = (a[None, :, 1] > py) != (b[None, :, 1] > py)
+        dy = b[:, 1] - a[:, 1]
+        dy = np.where(dy == 0, 1e-12, dy)
+        x_cross = a[None, :, 0] + (py - a[None, :, 1]) * (b[:, 0] - a[:, 0])[None, :] / dy[None, :]
+        flips = (straddle & (px < x_cross)).astype(np.int32)
+        return (np.add.reduceat(flips, self._zone_starts, axis=1) % 2).astype(bool)
+
+    def process(self, track_ids: np.ndarray, prev_pts: np.ndarray, last_pts: np.ndarray,
+                class_ids: np.ndarray, prev_ts: Optional[np.ndarray] = None,
+                last_ts: Optional[np.ndarray] = None) -> List[CrossingEvent]:
+        """
+        Uji segmen gerak (prev -> last) setiap track terhadap semua garis & zona.
+        Posisi & timestamp event garis diinterpolasi di titik potong segmen.
+        """
+        events: List[CrossingEvent] = []
+        n = len(track_ids)
+        if n == 0:
+            return events
+        P = np.asarray(prev_pts, dtype=np.float64).reshape(-1, 2)
+        Q = np.asarray(last_pts, dtype=np.float64).reshape(-1, 2)
+        T1 = np.zeros(n) if last_ts is None else np.asarray(last_ts, dtype=np.float64)
+        T0 = T1 if prev_ts is None else np.asarray(prev_ts, dtype=np.float64)
+        cls_col = class_columns(class_ids)
+
+        if self.line_names:
+            r = Q - P                                   # (N,2) segmen gerak
+            s = self._p2 - self._p1                     # (L,2) garis
+            ap = self._p1[None, :, :] - P[:, None, :]   # (N,L,2)
+            denom = r[:, None, 0] * s[None, :, 1] - r[:, None, 1] * s[None, :, 0]
+            safe = np.where(denom == 0, 1.0, denom)
+            t = (ap[:, :, 0] * s[None, :, 1] - ap[:, :, 1] * s[None, :, 0]) / safe
+            u = (ap[:, :, 0] * r[:, None, 1] - ap[:, :, 1] * r[:, None, 0]) / safe
+            hit = (denom != 0) & (t > 0) & (t <= 1) & (u >= 0) & (u <= 1)
+            if hit.any():
+                # arah: tanda proyeksi gerak ke normal garis (-vy, vx), sama seperti garis utama
+                up = (-denom < 0) ^ self._invert[None, :]
+                ni, li = np.nonzero(hit)
+                for k, j, is_up, tk in zip(ni.tolist(), li.tolist(), up[ni, li].tolist(), t[ni, li].tolist()):
+                    tid = int(track_ids[k])
+                    mask = self._counted.get(tid, 0)
+                    if mask >> j & 1:
+                        continue
+                    self._counted[tid] = mask | (1 << j)
+                    d = 0 if is_up else 1
+                    self.line_counts[j, d, cls_col[k]] += 1
+                    events.append(CrossingEvent(
+                        "line", self.line_names[j], tid, DIRECTIONS[d], COUNT_CLASSES[cls_col[k]],
+                        float(T0[k] + (T1[k] - T0[k]) * tk),
+                        float(P[k, 0] + r[k, 0] * tk), float(P[k, 1] + r[k, 1] * tk)))
+
+        if self.zone_names:
+            inside = self._points_in_zones(np.vstack([P, Q]))
+            in_prev, in_now = inside[:n], inside[n:]
+            for ev, mask in ((0, in_now & ~in_prev), (1, in_prev & ~in_now)):
+                ni, zi = np.nonzero(mask)
+                if ni.size:
+                    np.add.at(self.zone_counts, (zi, ev, cls_col[ni]), 1)
+                    events.extend(CrossingEvent(
+                        "zone", self.zone_names[z], int(track_ids[k]), ZONE_EVENTS[ev], COUNT_CLASSES[cls_col[k]],
+                        float(T1[k]), float(Q[k, 0]), float(Q[k, 1]))
+                        for k, z in zip(ni.tolist(), zi.tolist()))
+        return events
+
+    # ===== query =====
+    def get_counts(self) -> Dict[str, Any]:
+        lines = {}
+        for i, name in enumerate(self.line_names):
+            entry = {d: dict(zip(COUNT_CLASSES, self.line_counts[i, k].tolist())) for k, d in enumerate(DIRECTIONS)}
+            entry["total_up"] = int(self.line_counts[i, 0].sum())
+            entry["total_down"] = int(self.line_counts[i, 1].sum())
+            lines[name] = entry
+        zones = {}
+        for i, name in enumerate(self.zone_names):
+            entry = {e: dict(zip(COUNT_CLASSES, self.zone_counts[i, k].tolist())) for k, e in enumerate(ZONE_EVENTS)}
+            entry["total_entered"] = int(self.zone_counts[i, 0].sum())
+            entry["total_exited"] = int(self.zone_counts[i, 1].sum())
+            zones[name] = entry
+        return {"lines": lines, "zones": zones}
+
+    def line_geometry(self) -> List[Tuple[str, Tuple[int, int], Tuple[int, int]]]:
+        return [(name, tuple(map(int, self._p1[i])), tuple(map(int, self._p2[i])))
+                for i, name in enumerate(self.line_names)]
+
+    def zone_geometry(self) -> List[Tuple[str, np.ndarray]]:
+        return [(name, self._polygons[i].astype(np.int32)) for i, name in enumerate(self.zone_names)]
@@ -27,6 +27,7 @@ class DataViewer:
         ent = ttk.Entry(ctrls, textvariable=self.var_search, width=30)
         ent.pack(side=tk.LEFT, padx=6)
         ttk.Button(ctrls, text="Apply", command=self.reload).pack(side=tk.LEFT)
+        ttk.Button(ctrls, text="Line/Zone Counts", command=self.show_line_counts).pack(side=tk.LEFT, padx=6)
 
         ttk.Button(ctrls, text="Export CSV", command=self.export_csv).pack(side=tk.RIGHT, padx=4)
         ttk.Button(ctrls, text="Export JSON", command=self.export_json).pack(side=tk.RIGHT, padx=4)
@@ -75,6 +76,23 @@ class DataViewer:
         last_page = max(1, (self.total + self.page_size - 1) // self.page_size)
         self.page_label.config(text=f"Page {self.page}/{last_page} • Total rows: {self.total}")
 
+    def show_line_counts(self):
+        """Baris counter per garis/zona (tabel line_counts). Search = filter nama garis/zona (persis)."""
+        win = tk.Toplevel(self.win)
+        win.title("Line/Zone Counts")
+        win.geometry("700x450")
+        win.configure(bg="#2d2d2d")
+        cols = ("created_at", "kind", "name", "direction", "vehicle_class", "count")
+        tree = ttk.Treeview(win, columns=cols, show="headings")
+        for c in cols:
+            tree.heading(c, text=c)
+            tree.column(c, anchor="w", width=110)
+        tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=8)
+        rows = self.db.fetch_line_counts(self.var_search.get().strip(), limit=500)
+        for r in rows:
+            tree.insert("", tk.END, values=tuple(r[c] for c in cols))
+        tk.Label(win, text=f"Rows: {len(rows)} (latest 500)", bg="#2d2d2d", fg="#ffffff").pack(anchor="w", padx=10, pady=(0, 8))
+
     def prev_page(self):
         if self.page > 1:
             self.page -= 1
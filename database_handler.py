@@ -96,6 +96,19 @@ class DatabaseHandler:
             )
             """
         )
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS line_counts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                created_at TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                name TEXT NOT NULL,
+                direction TEXT NOT NULL,
+                vehicle_class TEXT NOT NULL,
+                count INTEGER NOT NULL
+            )
+            """
+        )
         self.conn.commit()
 
     def _init_generic(self):
@@ -113,6 +126,19 @@ class DatabaseHandler:
             )
             """
         )
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS line_counts (
+                id SERIAL PRIMARY KEY,
+                created_at VARCHAR(32) NOT NULL,
+                kind VARCHAR(8) NOT NULL,
+                name VARCHAR(64) NOT NULL,
+                direction VARCHAR(8) NOT NULL,
+                vehicle_class VARCHAR(16) NOT NULL,
+                count INT NOT NULL
+            )
+            """
+        )
         try:
             self.conn.commit()
         except Exception:
@@ -192,6 +218,47 @@ class DatabaseHandler:
         if root:
             messagebox.showinfo("Saved", "Counts saved to database successfully!", parent=root)
 
+    def save_engine_counts(self, engine_counts: Dict[str, Any]):
+        """Simpan counter multi-line/zone (CountingEngine.get_counts()) sebagai baris per garis/arah/kelas."""
+        if not self.connected or self.conn is None:
+            raise RuntimeError("Database not connected")
+        created_at = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        rows = []
+        for kind, groups, keys in (("line", engine_counts.get("lines", {}), ("up", "down")),
+                                   ("zone", engine_counts.get("zones", {}), ("entered", "exited"))):
+            for name, entry in groups.items():
+                for direction in keys:
+                    for vclass, cnt in entry.get(direction, {}).items():
+                        rows.append((created_at, kind, name, direction, vclass, int(cnt)))
+        if not rows:
+            return
+        ph = "?" if self.db_type == "sqlite" else "%s"
+        cur = self.conn.cursor()
+        cur.executemany(
+            f"INSERT INTO line_counts (created_at, kind, name, direction, vehicle_class, count) VALUES ({ph}, {ph}, {ph}, {ph}, {ph}, {ph})",
+            rows,
+        )
+        try:
+            self.conn.commit()
+        except Exception:
+            pass
+
+    def fetch_line_counts(self, name: str = "", limit: int = 200) -> List[Dict[str, Any]]:
+        if not self.connected or self.conn is None:
+            return []
+        ph = "?" if self.db_type == "sqlite" else "%s"
+        query = "SELECT created_at, kind, name, direction, vehicle_class, count FROM line_counts"
+        params: List[Any] = []
+        if name:
+            query += f" WHERE name = {ph}"
+            params.append(name)
+        query += f" ORDER BY id DESC LIMIT {ph}"
+        params.append(int(limit))
+        cur = self.conn.cursor()
+        cur.execute(query, params)
+        keys = ("created_at", "kind", "name", "direction", "vehicle_class", "count")
+        return [dict(zip(keys, r)) for r in cur.fetchall()]
+
     def fetch_counts(
         self,
         page: int = 1,
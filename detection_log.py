@@ -0,0 +1,229 @@
+"""
+Rekam & replay deteksi per frame untuk tuning tracker/counter tanpa menjalankan YOLO.
+
+Satu sesi rekaman = satu folder berisi meta.json dan part_NNNNN.npz. Setiap part
+menyimpan array ringkas: frame_idx, timestamp, high_conf, garis hitung per frame,
+offsets (CSR) ke array deteksi boxes/classes/confidences.
+
+Contoh:
+    python detection_log.py recordings/det_20240101_080000
+    python detection_log.py recordings/det_20240101_080000 --set max_match_distance=60 --set motion_model=linear
+    python detection_log.py recordings/det_20240101_080000 --current-config
+
+Replay memakai TRACKING_CONFIG yang terekam di meta.json (hasil identik dengan sesi live);
+--current-config memakai config aktif, --set menimpa keduanya.
+"""
+import argparse
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+PART_GLOB = "part_*.npz"
+
+
+class DetectionRecorder:
+    """Kumpulkan deteksi per frame di memori; setiap chunk_frames ditulis ke part npz di thread terpisah."""
+
+    def __init__(self, out_dir: str, meta: Optional[Dict[str, Any]] = None, chunk_frames: int = 3000):
+        self.path = Path(out_dir)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.chunk_frames = max(1, int(chunk_frames))
+        self.frames = 0
+        self.detections = 0
+        self._part = 0
+        self._writers: List[threading.Thread] = []
+        self._reset_chunk()
+        meta = dict(meta or {})
+        meta.setdefault("created", time.strftime("%Y-%m-%d %H:%M:%S"))
+        with open(self.path / "meta.json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2, default=str)
+
+    def _reset_chunk(self):
+        self._frame_idx: List[int] = []
+        self._ts: List[float] = []
+        self._high: List[float] = []
+        self._lines: List[Tuple[float, float, float, float]] = []
+        self._counts: List[int] = []
+        self._boxes: List[List[int]] = []
+        self._classes: List[int] = []
+        self._conf: List[float] = []
+
+    def add(self, frame_idx: int, timestamp: float, high_conf: Optional[float],
+            detections: List[Dict[str, Any]], line=None):
+        self._frame_idx.append(int(frame_idx))
+        self._ts.append(float(timestamp))
+        self._high.append(np.nan if high_conf is None else float(high_conf))
+        if line:
+            (x1, y1), (x2, y2) = line
+            self._lines.append((x1, y1, x2, y2))
+        else:
+            self._lines.append((np.nan,) * 4)
+        self._counts.append(len(detections))
+        for det in detections:
+            self._boxes.append(det["bbox"])
+            self._classes.append(det["class"])
+            self._conf.append(det["confidence"])
+        self.frames += 1
+        self.detections += len(detections)
+        if len(self._frame_idx) >= self.chunk_frames:
+            self.flush()
+
+    def flush(self):
+        if not self._frame_idx:
+            return
+        arrays = {
+            "frame_idx": np.array(self._frame_idx, dtype=np.int64),
+            "timestamp": np.array(self._ts, dtype=np.float64),
+            "high_conf": np.array(self._high, dtype=np.float64),
+            "line": np.array(self._lines, dtype=np.float64).reshape(-1, 4),
+            "offsets": np.concatenate([[0], np.cumsum(self._counts)]).astype(np.int64),
+            "boxes": np.array(self._boxes, dtype=np.int32).reshape(-1, 4),
+            "classes": np.array(self._classes, dtype=np.int16),
+            # float64 agar threshold high_conf identik dengan saat live
+            "confidences": np.array(self._conf, dtype=np.float64),
+        }
+        target = self.path / f"part_{self._part:05d}.npz"
+        self._part += 1
+        self._reset_chunk()
+        t = threading.Thread(target=np.savez_compressed, args=(target,), kwargs=arrays, daemon=True)
+        t.start()
+        self._writers = [w for w in self._writers if w.is_alive()] + [t]
+
+    def close(self):
+        self.flush()
+        for t in self._writers:
+            t.join()
+        self._writers = []
+
+
+def iter_frames(path: str) -> Iterator[Tuple[int, float, Optional[float], Optional[np.ndarray],
+                                             np.ndarray, np.ndarray, np.ndarray]]:
+    """Yield (frame_idx, timestamp, high_conf, line(2,2)|None, boxes, classes, confidences) per frame."""
+    root = Path(path)
+    parts = sorted(root.glob(PART_GLOB)) if root.is_dir() else [root]
+    for p in parts:
+        with np.load(p) as z:
+            fi, ts, hc, ln, off = z["frame_idx"], z["timestamp"], z["high_conf"], z["line"], z["offsets"]
+            boxes, classes, conf = z["boxes"], z["classes"], z["confidences"]
+        for k in range(fi.shape[0]):
+            a, b = int(off[k]), int(off[k + 1])
+            line = None if np.isnan(ln[k, 0]) else ln[k].reshape(2, 2)
+            high = None if np.isnan(hc[k]) else float(hc[k])
+            yield int(fi[k]), float(ts[k]), high, line, boxes[a:b], classes[a:b], conf[a:b]
+
+
+def load_meta(path: str) -> Dict[str, Any]:
+    p = Path(path) / "meta.json"
+    if not p.exists():
+        return {}
+    with open(p, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def replay(path: str, tracker=None, line=None, line_settings: Optional[Dict[str, Any]] = None,
+           use_recorded_config: bool = True, overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Jalankan ulang rekaman ke VehicleTracker + crossing secepat mungkin.
+    line=None memakai garis yang terekam per frame; line_settings=None memakai meta.json.
+    use_recorded_config: TRACKING_CONFIG selama replay = config saat rekaman (meta.json "tracking"),
+    False = config yang sedang aktif; overrides diterapkan di atasnya. TRACKING_CONFIG dipulihkan sesudahnya.
+    Re-ID appearance tidak ikut (rekaman tidak menyimpan gambar).
+    """
+    from config import TRACKING_CONFIG
+
+    meta = load_meta(path)
+    saved = dict(TRACKING_CONFIG)
+    if use_recorded_config:
+        TRACKING_CONFIG.update(meta.get("tracking", {}))
+    TRACKING_CONFIG.update(overrides or {})
+    try:
+        return _replay(path, meta, tracker, line, line_settings)
+    finally:
+        TRACKING_CONFIG.clear()
+        TRACKING_CONFIG.update(saved)
+
+
+def _replay(path: str, meta: Dict[str, Any], tracker, line, line_settings) -> Dict[str, Any]:
+    from vehicle_tracker import VehicleTracker
+
+    if tracker is None:
+        tracker = VehicleTracker()
+        if meta.get("counting"):
+            tracker.counting_engine.load(meta["counting"])
+    if line_settings is None:
+        line_settings = meta.get("line_settings", {})
+    fixed_line = None
+    if line is not None:
+        (x1, y1), (x2, y2) = line
+        fixed_line = [(int(x1), int(y1)), (int(x2), int(y2))]
+
+    frames = dets = 0
+    last_idx = -1
+    t0 = time.perf_counter()
+    for fi, ts, high, rec_line, boxes, classes, conf in iter_frames(path):
+        elapsed = fi - last_idx if last_idx >= 0 else 1
+        last_idx = fi
+        tracker.update_tracking_arrays(boxes, classes, conf, elapsed, high_conf=high, timestamp=ts)
+        cur_line = fixed_line
+        if cur_line is None and rec_line is not None:
+            cur_line = [tuple(map(int, rec_line[0])), tuple(map(int, rec_line[1]))]
+        tracker.check_line_crossings_directional(cur_line, line_settings)
+        frames += 1
+        dets += int(boxes.shape[0])
+    elapsed_s = time.perf_counter() - t0
+    return {
+        "frames": frames,
+        "detections": dets,
+        "seconds": elapsed_s,
+        "fps": frames / elapsed_s if elapsed_s > 0 else 0.0,
+        "counts": tracker.get_counts(),
+        "engine": tracker.counting_engine.get_counts() if tracker.counting_engine else {},
+        "tracks_created": tracker.next_id - 1,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Replay rekaman deteksi ke tracker & counter")
+    ap.add_argument("path", help="folder rekaman (meta.json + part_*.npz) atau satu file part")
+    ap.add_argument("--line", type=int, nargs=4, metavar=("X1", "Y1", "X2", "Y2"), default=None,
+                    help="ganti garis hitung (default: garis yang terekam)")
+    ap.add_argument("--invert", action="store_true", help="balik arah up/down")
+    ap.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                    help="override TRACKING_CONFIG (VALUE dalam format JSON)")
+    ap.add_argument("--current-config", action="store_true",
+                    help="pakai TRACKING_CONFIG aktif, bukan config saat rekaman (meta.json)")
+    args = ap.parse_args()
+
+    overrides = {}
+    for kv in args.set:
+        key, _, val = kv.partition("=")
+        try:
+            overrides[key] = json.loads(val)
+        except ValueError:
+            overrides[key] = val
+    line_settings = dict(load_meta(args.path).get("line_settings", {}))
+    if args.invert:
+        line_settings["invert_direction"] = not line_settings.get("invert_direction", False)
+    line = None
+    if args.line:
+        line = [(args.line[0], args.line[1]), (args.line[2], args.line[3])]
+
+    res = replay(args.path, line=line, line_settings=line_settings,
+                 use_recorded_config=not args.current_config, overrides=overrides)
+    c = res["counts"]
+    print(f"frames={res['frames']} detections={res['detections']} tracks={res['tracks_created']} "
+          f"time={res['seconds']:.2f}s ({res['fps']:.0f} frame/s)")
+    print(f"UP   {c['total_up']:>6}  " + "  ".join(f"{k}={v}" for k, v in c["up"].items()))
+    print(f"DOWN {c['total_down']:>6}  " + "  ".join(f"{k}={v}" for k, v in c["down"].items()))
+    for name, e in res["engine"].get("lines", {}).items():
+        print(f"line {name}: up={e['total_up']} down={e['total_down']}")
+    for name, e in res["engine"].get("zones", {}).items():
+        print(f"zone {name}: entered={e['total_entered']} exited={e['total_exited']}")
+
+
+if __name__ == "__main__":
+    main()
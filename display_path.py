@@ -0,0 +1,137 @@
+from typing import Callable, Optional, Tuple
+import time
+
+import cv2
+import numpy as np
+
+INTERPOLATION = {"area": cv2.INTER_AREA, "linear": cv2.INTER_LINEAR, "nearest": cv2.INTER_NEAREST}
+
+
+class CanvasView:
+    """
+    Jalur tampilan frame -> canvas: skala & offset letterbox di-cache per
+    (ukuran frame, ukuran canvas), resize dan konversi BGR->RGB ditulis ke buffer
+    prealokasi (tanpa alokasi array per frame). Biaya CPU per frame dicatat.
+    """
+
+    def __init__(self, interpolation: str = "area"):
+        self.interpolation = interpolation
+        self._key: Optional[Tuple[int, int, int, int]] = None
+        self.scale = 1.0
+        self.x_off = 0
+        self.y_off = 0
+        self.size = (0, 0)           # (w, h) gambar di canvas
+        self._resized: Optional[np.ndarray] = None
+        self._rgb: Optional[np.ndarray] = None
+        self.frames = 0
+        self.cpu_ms = 0.0            # rata-rata (EMA) CPU thread per frame
+        self.last_cpu_ms = 0.0
+
+    def layout(self, fw: int, fh: int, cw: int, ch: int) -> bool:
+        """Hitung ulang skala/offset & buffer bila ukuran berubah. Return True jika berubah."""
+        key = (fw, fh, cw, ch)
+        if key == self._key:
+            return False
+        self._key = key
+        if fw * ch > fh * cw:
+            scale = cw / fw
+        else:
+            scale = ch / fh
+        new_w = max(1, int(fw * scale))
+        new_h = max(1, int(fh * scale))
+        self.scale = scale
+        self.size = (new_w, new_h)
+        self.x_off = (cw - new_w) // 2
+        self.y_off = (ch - new_h) // 2
+        self._resized = np.empty((new_h, new_w, 3), dtype=np.uint8)
+        self._rgb = np.empty((new_h, new_w, 3), dtype=np.uint8)
+        return True
+
+    def render(self, frame: np.ndarray, draw: Optional[Callable[[np.ndarray, float], None]] = None) -> np.ndarray:
+        """
+        Frame BGR -> buffer RGB ukuran canvas (buffer yang sama dipakai ulang).
+        draw(img_bgr, scale): gambar overlay di resolusi tampilan sebelum konversi warna.
+        """
+        new_w, new_h = self.size
+        if (new_w, new_h) == (frame.shape[1], frame.shape[0]):
+            if draw is None:
+                src = frame
+            else:
+                np.copyto(self._resized, frame)        # frame publikasi tidak boleh dimutasi
+                src = self._resized
+        else:
+            interp = INTERPOLATION.get(self.interpolation, cv2.INTER_AREA)
+            if self.scale > 1.0 and interp == cv2.INTER_AREA:
+                interp = cv2.INTER_LINEAR          # INTER_AREA hanya unggul untuk downscale
+            src = cv2.resize(frame, (new_w, new_h), dst=self._resized, interpolation=interp)
+        if draw is not None:
+            draw(src, self.scale)
+        cv2.cvtColor(src, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        return self._rgb
+
+    def canvas_to_frame(self, x: float, y: float, fw: int, fh: int) -> Tuple[int, int]:
+        xf = int((x - self.x_off) / self.scale)
+        yf = int((y - self.y_off) / self.scale)
+        return (max(0, min(fw - 1, xf)), max(0, min(fh - 1, yf)))
+
+    def account(self, cpu_s: float):
+        ms = cpu_s * 1000.0
+        self.frames += 1
+        self.last_cpu_ms = ms
+        self.cpu_ms = ms if self.frames == 1 else self.cpu_ms * 0.95 + ms * 0.05
+
+
+def legacy_render(frame: np.ndarray, cw: int, ch: int):
+    """Jalur lama (pembanding): BGR->RGB, PIL, resize LANCZOS; alokasi baru setiap frame."""
+    from PIL import Image
+    img = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    iw, ih = img.size
+    if iw / ih > cw / ch:
+        new_w, new_h = cw, int(cw / (iw / ih))
+    else:
+        new_w, new_h = int(ch * (iw / ih)), ch
+    return img.resize((new_w, new_h), Image.LANCZOS)
+
+
+def cpu_time() -> float:
+    """CPU time thread saat ini (detik); fallback ke process_time."""
+    try:
+        return time.thread_time()
+    except Exception:
+        return time.process_time()
+
+
+class RenderMeter:
+    """
+    CPU thread worker per frame: total iterasi loop dan bagian render (gambar overlay + publish).
+    Di mode count-only frame tanpa render dihitung sebagai skipped; biaya render yang dihemat
+    diperkirakan dari EMA render terakhir (frame penuh atau thumbnail).
+    """
+
+    def __init__(self):
+        self.render_ms = 0.0
+        self.loop_ms = 0.0
+        self.rendered = 0
+        self.skipped = 0
+
+    @staticmethod
+    def _ema(old: float, new: float, n: int) -> float:
+        return new if n <= 1 else old * 0.95 + new * 0.05
+
+    def rendered_frame(self, cpu_s: float):
+        self.rendered += 1
+        self.render_ms = self._ema(self.render_ms, cpu_s * 1000.0, self.rendered)
+
+    def skipped_frame(self):
+        self.skipped += 1
+
+    def loop(self, cpu_s: float):
+        self.loop_ms = self._ema(self.loop_ms, cpu_s * 1000.0, self.rendered + self.skipped)
+
+    def savings(self, display_ms: float = 0.0) -> Tuple[float, float]:
+        """(ms CPU dihemat per frame, persen dari total bila render penuh); 0 bila belum pernah render."""
+        if self.rendered == 0:
+            return 0.0, 0.0
+        saved = self.render_ms + display_ms
+        total = self.loop_ms + saved
+        return saved, (100.0 * saved / total) if total > 0 else 0.0
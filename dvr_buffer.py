@@ -0,0 +1,184 @@
+"""
+DVR pra-event: ring N detik terakhir frame mentah (JPEG) di memori, disimpan ke disk saat dipicu.
+
+- Memori tetap: satu array slot prealokasi (slot x slot_bytes = dvr_memory_mb), tidak tumbuh.
+  JPEG yang lebih besar dari slot dibuang dan dihitung (oversize).
+- Capture thread hanya memanggil push(frame, ts): dibatasi dvr_fps, frame disalin/di-resize ke
+  buffer staging prealokasi (frame asli boleh langsung dianotasi) bila encoder sedang idle.
+- Thread encoder: JPEG encode staging -> slot ring. Klip yang dipicu (crossing kelas terpilih atau
+  manual) ditutup setelah post_seconds, lalu ditulis ke disk di thread terpisah.
+
+Satu klip = folder clip_YYYYmmdd_HHMMSS_<nomor>_<alasan>/ berisi frame_NNNN.jpg + clip.json (timestamp per frame).
+"""
+import json
+import math
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+
+class DvrBuffer:
+    def __init__(self, out_dir: str, pre_seconds: float = 10.0, post_seconds: float = 3.0, fps: float = 10.0,
+                 memory_mb: float = 64.0, width: int = 960, quality: int = 75):
+        self.path = Path(out_dir)
+        self.pre_seconds = float(pre_seconds)
+        self.post_seconds = float(post_seconds)
+        self.fps = max(1.0, float(fps))
+        self.width = int(width)
+        self.quality = int(quality)
+        # Ring cukup untuk pre + post: awal klip masih ada saat post_seconds selesai
+        self.slots = int(math.ceil((self.pre_seconds + self.post_seconds) * self.fps)) + 1
+        self.slot_bytes = max(4096, int(float(memory_mb) * 1024 * 1024) // self.slots)
+        self.span = (self.slots - 1) / self.fps      # detik yang pasti masih ada di ring
+        self._ring = np.zeros((self.slots, self.slot_bytes), dtype=np.uint8)
+        self._len = np.zeros(self.slots, dtype=np.int64)
+        self._ts = np.zeros(self.slots, dtype=np.float64)
+        self._head = 0                        # slot berikutnya yang ditulis
+        self._latest_ts = 0.0
+
+        self._stage: Optional[np.ndarray] = None
+        self._stage_ts = 0.0
+        self._busy = False
+        self._next_t = 0.0
+        self._ready = threading.Event()
+
+        self._lock = threading.Lock()         # hanya untuk daftar klip tertunda
+        self._clips: List[Dict[str, Any]] = []
+        self._writers: List[threading.Thread] = []
+
+        self.encoded = 0
+        self.skipped = 0                      # push dilewati karena encoder masih sibuk
+        self.oversize = 0
+        self.clips = 0
+        self.encode_ms = 0.0
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True, name="dvr-encoder")
+        self._thread.start()
+
+    # ===== sisi capture =====
+    def push(self, frame: np.ndarray, ts: float) -> bool:
+        """Ambil frame mentah ke staging (dibatasi fps). Dipanggil sebelum frame dianotasi."""
+        if ts < self._next_t:
+            return False
+        if self._busy:
+            self.skipped += 1
+            return False
+        self._next_t = ts + 1.0 / self.fps
+        h, w = frame.shape[:2]
+        size = (self.width, max(1, int(h * self.width / w))) if 0 < self.width < w else (w, h)
+        if self._stage is None or (self._stage.shape[1], self._stage.shape[0]) != size:
+            self._stage = np.empty((size[1], size[0], 3), dtype=np.uint8)
+        if size == (w, h):
+            np.copyto(self._stage, frame)
+        else:
+            cv2.resize(frame, size, dst=self._stage, interpolation=cv2.INTER_AREA)
+        self._stage_ts = ts
+        self._busy = True
+        self._ready.set()
+        return True
+
+    def trigger(self, reason: str, ts: Optional[float] = None):
+        """
+        Picu klip [ts - pre, ts + post]. Trigger yang tumpang tindih memperpanjang klip tertunda selama
+        panjangnya tidak melebihi isi ring (span); selebihnya menjadi klip baru (frame pra-event tidak
+        tertimpa sebelum klip ditulis).
+        """
+        ts = time.time() if ts is None else float(ts)
+        with self._lock:
+            last = self._clips[-1] if self._clips else None
+            if (last is not None and ts - self.pre_seconds <= last["end"]
+                    and ts + self.post_seconds - last["start"] <= self.span):
+                last["end"] = max(last["end"], ts + self.post_seconds)
+                last["triggers"].append({"reason": reason, "timestamp": ts})
+            else:
+                self._clips.append({"start": ts - self.pre_seconds, "end": ts + self.post_seconds,
+                                    "triggers": [{"reason": reason, "timestamp": ts}]})
+
+    # ===== thread encoder =====
+    def _run(self):
+        while self._running:
+            if not self._ready.wait(0.5):
+                self._flush_due(time.time() - 1.0 / self.fps)
+                continue
+            self._ready.clear()
+            if not self._busy:
+                continue
+            t0 = time.perf_counter()
+            ok, buf = cv2.imencode(".jpg", self._stage, [int(cv2.IMWRITE_JPEG_QUALITY), self.quality])
+            ts = self._stage_ts
+            self._busy = False
+            if ok:
+                n = buf.shape[0]
+                if n > self.slot_bytes:
+                    self.oversize += 1
+                else:
+                    i = self._head
+                    self._ring[i, :n] = buf.ravel()
+                    self._len[i] = n
+                    self._ts[i] = ts
+                    self._head = (i + 1) % self.slots
+                    self._latest_ts = ts
+                    self.encoded += 1
+            ms = (time.perf_counter() - t0) * 1000.0
+            self.encode_ms = ms if self.encoded <= 1 else self.encode_ms * 0.95 + ms * 0.05
+            self._flush_due(self._latest_ts)
+        self._flush_due(float("inf"))
+
+    def _flush_due(self, now: float):
+        """Klip yang post_seconds-nya sudah lewat: salin JPEG dari ring (thread ini) lalu tulis di thread lain."""
+        with self._lock:
+            due = [c for c in self._clips if c["end"] <= now]
+            if not due:
+                return
+            self._clips = [c for c in self._clips if c["end"] > now]
+        for clip in due:
+            sel = np.flatnonzero((self._len > 0) & (self._ts >= clip["start"]) & (self._ts <= clip["end"]))
+            sel = sel[np.argsort(self._ts[sel])]
+            frames = [(float(self._ts[i]), self._ring[i, :self._len[i]].tobytes()) for i in sel.tolist()]
+            if not frames:
+                continue
+            self.clips += 1
+            t = threading.Thread(target=self._write_clip, args=(clip, frames, self.clips), daemon=True)
+            t.start()
+            self._writers = [w for w in self._writers if w.is_alive()] + [t]
+
+    def _write_clip(self, clip: Dict[str, Any], frames, seq: int):
+        first = clip["triggers"][0]
+        name = time.strftime("clip_%Y%m%d_%H%M%S", time.localtime(first["timestamp"]))
+        reason = "".join(ch if ch.isalnum() else "_" for ch in first["reason"])[:32]
+        out = self.path / f"{name}_{seq:04d}_{reason}"
+        try:
+            out.mkdir(parents=True, exist_ok=True)
+            index = []
+            for k, (ts, data) in enumerate(frames):
+                fname = f"frame_{k:04d}.jpg"
+                with open(out / fname, "wb") as f:
+                    f.write(data)
+                index.append({"file": fname, "timestamp": ts})
+            meta = dict(clip, fps=self.fps, frames=index)
+            with open(out / "clip.json", "w", encoding="utf-8") as f:
+                json.dump(meta, f, indent=2)
+        except Exception as e:
+            print(f"DVR write error: {e}")
+
+    def close(self):
+        """Hentikan encoder, tulis klip yang masih tertunda dengan frame yang tersedia."""
+        self._running = False
+        self._ready.set()
+        self._thread.join()
+        for t in self._writers:
+            t.join()
+        self._writers = []
+
+    def get_stats(self) -> Dict[str, Any]:
+        filled = self._len > 0
+        return {"slots": self.slots, "slot_kb": self.slot_bytes / 1024.0,
+                "memory_mb": self._ring.nbytes / (1024.0 * 1024.0),
+                "used_mb": float(self._len[filled].sum()) / (1024.0 * 1024.0),
+                "seconds": float(self._ts[filled].max() - self._ts[filled].min()) if filled.any() else 0.0,
+                "encoded": self.encoded, "skipped": self.skipped, "oversize": self.oversize,
+                "clips": self.clips, "pending": len(self._clips), "encode_ms": self.encode_ms}
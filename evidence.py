@@ -0,0 +1,96 @@
+"""
+Bukti per kendaraan terhitung: crop JPEG kendaraan saat crossing, ditulis asinkron.
+
+- Capture thread hanya menyalin crop bbox (kecil; frame sesudahnya dianotasi) lalu submit ke
+  thread pool kecil. Pekerjaan tertunda dibatasi max_pending: saat burst crossing melebihi batas,
+  crop dibuang dan dihitung (dropped) sehingga capture loop tidak pernah menunggu.
+- Worker: JPEG encode + tulis file + satu baris index.csv (sidecar) per crop.
+
+Nama file: YYYYmmdd_HHMMSS_mmm_id<track>_<kelas>_<arah>[_<garis>].jpg di evidence_dir/YYYYmmdd/.
+"""
+import csv
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Sequence
+
+import cv2
+import numpy as np
+
+INDEX_FIELDS = ["file", "timestamp", "track_id", "class", "direction", "line", "confidence", "x1", "y1", "x2", "y2"]
+
+
+class EvidenceWriter:
+    def __init__(self, out_dir: str, workers: int = 2, max_pending: int = 64, padding: float = 0.1,
+                 quality: int = 90, min_size: int = 8):
+        self.path = Path(out_dir)
+        self.padding = float(padding)
+        self.quality = int(quality)
+        self.min_size = int(min_size)
+        self.max_pending = max(1, int(max_pending))
+        self._pool = ThreadPoolExecutor(max_workers=max(1, int(workers)), thread_name_prefix="evidence")
+        self._lock = threading.Lock()         # pending + index.csv
+        self.pending = 0
+        self.saved = 0
+        self.dropped = 0
+        self.errors = 0
+
+    def capture(self, frame: np.ndarray, event, bbox: Sequence[int], confidence: float = 0.0) -> bool:
+        """Dipanggil capture thread saat crossing. False bila dibuang (antrean penuh / bbox kosong)."""
+        H, W = frame.shape[:2]
+        x1, y1, x2, y2 = bbox
+        px = int((x2 - x1) * self.padding); py = int((y2 - y1) * self.padding)
+        x1 = max(0, x1 - px); y1 = max(0, y1 - py); x2 = min(W, x2 + px); y2 = min(H, y2 + py)
+        if x2 - x1 < self.min_size or y2 - y1 < self.min_size:
+            return False
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.dropped += 1
+                return False
+            self.pending += 1
+        crop = frame[y1:y2, x1:x2].copy()
+        info = {"timestamp": float(event.timestamp), "track_id": int(event.track_id), "class": event.class_name,
+                "direction": event.direction, "line": event.name, "confidence": round(float(confidence), 3),
+                "x1": x1, "y1": y1, "x2": x2, "y2": y2}
+        self._pool.submit(self._write, crop, info)
+        return True
+
+    def _write(self, crop: np.ndarray, info: Dict[str, Any]):
+        try:
+            ts = info["timestamp"]
+            day = self.path / time.strftime("%Y%m%d", time.localtime(ts))
+            day.mkdir(parents=True, exist_ok=True)
+            stamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(ts)) + f"_{int(ts * 1000) % 1000:03d}"
+            name = f"{stamp}_id{info['track_id']}_{info['class']}_{info['direction']}"
+            if info["line"] and info["line"] != "main":
+                name += "_" + "".join(ch if ch.isalnum() else "-" for ch in info["line"])
+            ok, buf = cv2.imencode(".jpg", crop, [int(cv2.IMWRITE_JPEG_QUALITY), self.quality])
+            if not ok:
+                raise RuntimeError("imencode failed")
+            with open(day / f"{name}.jpg", "wb") as f:
+                f.write(buf.tobytes())
+            row = dict(info, file=f"{name}.jpg")
+            index = day / "index.csv"
+            with self._lock:
+                new = not index.exists()
+                with open(index, "a", newline="", encoding="utf-8") as f:
+                    w = csv.DictWriter(f, fieldnames=INDEX_FIELDS)
+                    if new:
+                        w.writeheader()
+                    w.writerow(row)
+                self.saved += 1
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            print(f"Evidence write error: {e}")
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def close(self):
+        """Tunggu semua crop tertunda selesai ditulis."""
+        self._pool.shutdown(wait=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"saved": self.saved, "pending": self.pending, "dropped": self.dropped, "errors": self.errors}
@@ -0,0 +1,90 @@
+from typing import Tuple, Union
+import numpy as np
+
+# State per track: [cx, cy, w, h, vcx, vcy, vw, vh] (kecepatan dalam px/frame)
+# Measurement:     [cx, cy, w, h]
+NDIM = 4
+STD_WEIGHT_POSITION = 1.0 / 20
+STD_WEIGHT_VELOCITY = 1.0 / 160
+
+
+def xyxy_to_cxcywh(boxes: np.ndarray) -> np.ndarray:
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    wh = boxes[:, 2:4] - boxes[:, 0:2]
+    return np.hstack([boxes[:, 0:2] + wh * 0.5, wh])
+
+
+def cxcywh_to_xyxy(z: np.ndarray) -> np.ndarray:
+    z = np.asarray(z, dtype=np.float64).reshape(-1, 4)
+    half = z[:, 2:4] * 0.5
+    return np.hstack([z[:, 0:2] - half, z[:, 0:2] + half])
+
+
+def _scale(mean_or_z: np.ndarray) -> np.ndarray:
+    # Noise sebanding ukuran bbox (pakai sisi terpanjang, minimal 1px)
+    return np.maximum(np.maximum(mean_or_z[:, 2], mean_or_z[:, 3]), 1.0)
+
+
+def initiate(boxes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Mean/cov awal (n,8)/(n,8,8) dari bbox xyxy; kecepatan nol dengan ketidakpastian besar."""
+    z = xyxy_to_cxcywh(boxes)
+    n = z.shape[0]
+    mean = np.hstack([z, np.zeros((n, NDIM))])
+    s = _scale(z)
+    std = np.hstack([
+        np.repeat((2 * STD_WEIGHT_POSITION * s)[:, None], NDIM, axis=1),
+        np.repeat((10 * STD_WEIGHT_VELOCITY * s)[:, None], NDIM, axis=1),
+    ])
+    cov = np.zeros((n, 2 * NDIM, 2 * NDIM))
+    idx = np.arange(2 * NDIM)
+    cov[:, idx, idx] = std * std
+    return mean, cov
+
+
+def predict(mean: np.ndarray, cov: np.ndarray, dt) -> Tuple[np.ndarray, np.ndarray]:
+    """Batched predict constant-velocity sejauh dt frame (skalar atau per-track)."""
+    n = mean.shape[0]
+    if n == 0:
+        return mean.copy(), cov.copy()
+    dt = np.broadcast_to(np.asarray(dt, dtype=np.float64), (n,))
+    F = np.broadcast_to(np.eye(2 * NDIM), (n, 2 * NDIM, 2 * NDIM)).copy()
+    F[:, np.arange(NDIM), np.arange(NDIM, 2 * NDIM)] = dt[:, None]
+
+    s = _scale(mean)
+    std = np.hstack([
+        np.repeat((STD_WEIGHT_POSITION * s)[:, None], NDIM, axis=1),
+        np.repeat((STD_WEIGHT_VELOCITY * s)[:, None], NDIM, axis=1),
+    ])
+    Q = np.zeros_like(cov)
+    idx = np.arange(2 * NDIM)
+    Q[:, idx, idx] = std * std * dt[:, None]
+
+    new_mean = mean.copy()
+    new_mean[:, :NDIM] += dt[:, None] * mean[:, NDIM:]
+    new_cov = F @ cov @ F.transpose(0, 2, 1) + Q
+    return new_mean, new_cov
+
+
+def update(mean: np.ndarray, cov: np.ndarray, boxes: np.ndarray,
+           r_scale: Union[float, np.ndarray] = 1.0) -> Tuple[np.ndarray, np.ndarray]:
+    """Batched koreksi dengan measurement bbox xyxy (n,4). r_scale: skalar atau per baris (n,)."""
+    if mean.shape[0] == 0:
+        return mean.copy(), cov.copy()
+    z = xyxy_to_cxcywh(boxes)
+    s = _scale(mean)
+    r = (STD_WEIGHT_POSITION * s) ** 2 * np.asarray(r_scale, dtype=np.float64)
+    R = np.zeros((mean.shape[0], NDIM, NDIM))
+    idx = np.arange(NDIM)
+    R[:, idx, idx] = r[:, None]
+
+    PHt = cov[:, :, :NDIM]                       # P H^T  (n,8,4)
+    S = cov[:, :NDIM, :NDIM] + R                 # H P H^T + R  (n,4,4)
+    K = np.linalg.solve(S, PHt.transpose(0, 2, 1)).transpose(0, 2, 1)   # (n,8,4)
+    innov = z - mean[:, :NDIM]
+    new_mean = mean + (K @ innov[:, :, None])[:, :, 0]
+    new_cov = cov - K @ PHt.transpose(0, 2, 1)
+    return new_mean, new_cov
+
+
+def mean_to_xyxy(mean: np.ndarray) -> np.ndarray:
+    return cxcywh_to_xyxy(mean[:, :NDIM])
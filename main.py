@@ -3,6 +3,7 @@ import math
 import time
 import threading
 import traceback
+from pathlib import Path
 
 import cv2
 cv2.setUseOptimized(True)
@@ -42,13 +43,24 @@ from config import (
     COLOR_CONFIG,
     settings_manager,
     RUNTIME_CONFIG,
+    COUNTING_CONFIG,
 )
 from database_handler import DatabaseHandler
 from line_settings_dialog import LineSettingsDialog
 from model_settings_dialog import ModelSettingsDialog
 from database_settings_dialog import DatabaseSettingsDialog
 from data_viewer import DataViewer
-from vehicle_tracker import VehicleTracker
+from tracker_backends import create_tracker
+from association import iou_matrix
+from detection_log import DetectionRecorder
+from display_path import CanvasView, RenderMeter, legacy_render, cpu_time
+from overlay import StaticOverlay, LabelSprites, draw_tracks
+from ui_state import UiState
+from preview_server import PreviewServer
+from video_recorder import VideoRecorder
+from dvr_buffer import DvrBuffer
+from evidence import EvidenceWriter
+from track_events import LINE_CROSSED
 
 
 class ModernScreenVehicleCounter:
@@ -77,11 +89,18 @@ class ModernScreenVehicleCounter:
         self.init_yolo_model()
 
         self.db_handler = DatabaseHandler(self.on_db_status_changed)
-        self.vehicle_tracker = VehicleTracker()
+        self.vehicle_tracker = create_tracker(TRACKING_CONFIG.get("backend", "vehicle"))
+        try:
+            self.vehicle_tracker.counting_engine.load(COUNTING_CONFIG)
+        except Exception as e:
+            print(f"Counting lines/zones config error: {e}")
 
         self.setup_modern_gui()
         self.update_input_source_ui()
         self.update_preview_button_state()
+        self._display_tick()
+        self._refresh_ui()
+        self.preview_server = self._start_preview_server()
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
 
     def init_variables(self):
@@ -118,6 +137,33 @@ class ModernScreenVehicleCounter:
 
         # Frame state
         self.current_frame = None
+        # Overlay: layer statis (garis/band/label/zona) + cache sprite label per-track
+        self.static_overlay = StaticOverlay()
+        self.label_sprites = LabelSprites()
+        self._track_styles = {
+            True: (COLOR_CONFIG['counted_vehicle'], COLOR_CONFIG['center_dot_counted'], COLOR_CONFIG['tracking_path_counted'], "[COUNTED]"),
+            False: (COLOR_CONFIG['active_vehicle'], COLOR_CONFIG['center_dot_active'], COLOR_CONFIG['tracking_path'], "[ACTIVE]"),
+        }
+        # Display: skala/offset + buffer resize di-cache; satu item gambar canvas persisten
+        self.canvas_view = CanvasView(RUNTIME_CONFIG.get("display_interpolation", "area"))
+        self.photo = None
+        self._canvas_image = None
+        # Double buffer worker -> UI: worker menukar referensi frame (tanpa copy), timer UI
+        # tunggal menampilkan frame terbaru saja pada display_fps
+        self.current_tracks = None       # snapshot track untuk overlay di resolusi tampilan
+        # Mode count-only: tanpa gambar/tampilan, hanya thumbnail berkala atau sesuai permintaan
+        self.count_only = bool(RUNTIME_CONFIG.get("count_only", False))
+        self._thumb_request = False
+        self.render_meter = RenderMeter()
+        # Label hitungan/FPS: worker publish ke UiState, _refresh_ui menerapkan yang berubah saja
+        self.ui_state = UiState()
+        self.counts_snapshot = None      # dict hitungan terakhir (diganti utuh, dibaca endpoint /counts.json)
+        self.preview_server = None
+        self.dvr = None                  # DvrBuffer selama deteksi berjalan (dvr_enabled)
+        self.frames_published = 0
+        self.frames_displayed = 0
+        self._shown_seq = 0
+        self._display_rate = (time.time(), 0, 0)
         self.capture_thread = None
         self.preview_thread = None
 
@@ -277,6 +323,13 @@ class ModernScreenVehicleCounter:
         detection_inner = tk.Frame(detection_card, bg='#2d2d2d'); detection_inner.pack(fill=tk.X, padx=10, pady=10)
         self.start_button = tk.Button(detection_inner, text="🎬 Start Detection", command=self.toggle_capture, bg='#107c10', fg='white', font=('Arial', 9), relief='flat', bd=0, pady=5)
         self.start_button.pack(fill=tk.X, pady=2)
+        count_only_row = tk.Frame(detection_inner, bg='#2d2d2d'); count_only_row.pack(fill=tk.X, pady=2)
+        self.var_count_only = tk.BooleanVar(value=self.count_only)
+        tk.Checkbutton(count_only_row, text="Count only (no video)", variable=self.var_count_only, command=self.on_count_only_changed,
+                       bg='#2d2d2d', fg='#ffffff', selectcolor='#1e1e1e', activebackground='#2d2d2d', activeforeground='#ffffff',
+                       font=('Arial', 9)).pack(side=tk.LEFT)
+        tk.Button(count_only_row, text="📷 Thumbnail", command=self.request_thumbnail, bg='#6a6a6a', fg='white', font=('Arial', 8), relief='flat', bd=0, padx=6).pack(side=tk.RIGHT)
+        tk.Button(count_only_row, text="🎞 Clip", command=self.save_dvr_clip, bg='#6a6a6a', fg='white', font=('Arial', 8), relief='flat', bd=0, padx=6).pack(side=tk.RIGHT, padx=(0, 4))
         tk.Button(detection_inner, text="🔄 Reset Counts", command=self.reset_count, bg='#d13438', fg='white', font=('Arial', 9), relief='flat', bd=0, pady=5).pack(fill=tk.X, pady=(5, 0))
 
         # Status
@@ -332,6 +385,8 @@ class ModernScreenVehicleCounter:
         self.total_up_label = tk.Label(total_frame, text="📈 Total UP: 0", bg='#363636', fg='#28a745', font=('Arial', 12, 'bold')); self.total_up_label.pack(pady=5)
         self.total_down_label = tk.Label(total_frame, text="📉 Total DOWN: 0", bg='#363636', fg='#dc3545', font=('Arial', 12, 'bold')); self.total_down_label.pack(pady=5)
         self.create_modern_vehicle_counts(stats_card)
+        self.extra_counts_label = tk.Label(stats_card, text="", bg='#2d2d2d', fg='#bbbbbb', font=('Arial', 8), justify=tk.LEFT)
+        self.extra_counts_label.pack(anchor=tk.W, padx=10, pady=(4, 6))
 
         database_card = tk.LabelFrame(right_frame, text="💾 Database Operations", bg='#2d2d2d', fg='#ffffff', font=('Arial', 10, 'bold'), relief='solid', bd=1)
         database_card.pack(fill=tk.X, pady=(0, 15), padx=10)
@@ -354,6 +409,8 @@ class ModernScreenVehicleCounter:
         tk.Label(performance_frame, text="Performance Metrics:", bg='#363636', fg='#ffffff', font=('Arial', 9, 'bold')).pack(anchor=tk.W, padx=5, pady=2)
         self.accuracy_label = tk.Label(performance_frame, text="🎯 Optimize via settings.json > runtime", bg='#363636', fg='#ffffff', font=('Arial', 9))
         self.accuracy_label.pack(anchor=tk.W, pady=1, padx=5)
+        self.display_label = tk.Label(performance_frame, text="🖼️ Display: -", bg='#363636', fg='#bbbbbb', font=('Arial', 8))
+        self.display_label.pack(anchor=tk.W, pady=1, padx=5)
 
         legend_card = tk.LabelFrame(right_frame, text="🧭 Direction Legend", bg='#2d2d2d', fg='#ffffff', font=('Arial', 10, 'bold'), relief='solid', bd=1)
         legend_card.pack(fill=tk.X, padx=10)
@@ -468,9 +525,7 @@ class ModernScreenVehicleCounter:
                 return
             h, w = frame.shape[:2]
             self.region_status.config(text=f"📺 Screen OK: {w}×{h}px")
-            with self.frame_lock:
-                self.current_frame = frame
-            self.root.after(0, self.update_display)
+            self.publish_frame(frame)
         else:
             if not self.open_video_source():
                 return
@@ -488,9 +543,7 @@ class ModernScreenVehicleCounter:
                 self.region_status.config(text=f"📺 Webcam OK: {w}×{h}px (index {self.var_webcam_index.get()})")
             else:
                 self.region_status.config(text=f"📺 Stream OK: {w}×{h}px")
-            with self.frame_lock:
-                self.current_frame = frame
-            self.root.after(0, self.update_display)
+            self.publish_frame(frame)
         self.persist_input_settings()
 
     def persist_input_settings(self):
@@ -631,6 +684,7 @@ class ModernScreenVehicleCounter:
             self.preview_status.config(text="👁️ Preview: Off", fg='#ffffff')
             self.video_title.config(text="🎥 Live Video Feed - Modern AI Detection")
             self.canvas.delete("all"); self.canvas.configure(bg='#1a1a1a')
+            self._canvas_image = None
             if not self.is_capturing:
                 self.close_video_source()
 
@@ -662,21 +716,34 @@ class ModernScreenVehicleCounter:
                 frame = self.get_frame()
                 if frame is None:
                     time.sleep(0.05); continue
-                if self.counting_line:
-                    self.draw_counting_line(frame)
-                with self.frame_lock:
-                    self.current_frame = frame.copy()
-                self.root.after(0, self.update_display)
+                self.draw_static_overlay(frame)
+                self.publish_frame(frame)
                 fps_counter += 1
                 if fps_counter % 10 == 0:
                     now = time.time()
                     fps = 10 / (now - fps_start)
                     fps_start = now
-                    self.root.after(0, lambda f=fps: self.fps_label.config(text=f"📈 Preview FPS: {f:.1f}"))
+                    self.ui_state.publish(fps=f"📈 Preview FPS: {fps:.1f}")
                 time.sleep(0.03)
             except Exception:
                 time.sleep(0.1)
 
+    def on_count_only_changed(self):
+        self.count_only = bool(self.var_count_only.get())
+        RUNTIME_CONFIG["count_only"] = self.count_only
+        settings_manager.save()
+        if self.count_only:
+            self._thumb_request = True
+
+    def request_thumbnail(self):
+        self._thumb_request = True
+
+    def save_dvr_clip(self):
+        dvr = self.dvr
+        if dvr is None:
+            messagebox.showwarning("⚠️", "DVR tidak aktif (aktifkan dvr_enabled lalu mulai deteksi)"); return
+        dvr.trigger("manual")
+
     def toggle_capture(self):
         if self.input_type == "screen" and not self.capture_region:
             messagebox.showwarning("⚠️", "Pilih capture region terlebih dahulu"); return
@@ -770,20 +837,8 @@ class ModernScreenVehicleCounter:
             y1, y2 = y2, y1
         return [x1, y1, x2, y2]
 
-    def _bbox_iou(self, a, b):
-        ax1, ay1, ax2, ay2 = a
-        bx1, by1, bx2, by2 = b
-        ix1, iy1 = max(ax1, bx1), max(ay1, by1)
-        ix2, iy2 = min(ax2, bx2), min(ay2, by2)
-        iw, ih = max(0, ix2 - ix1), max(0, iy2 - iy1)
-        inter = iw * ih
-        aw, ah = max(0, ax2 - ax1), max(0, ay2 - ay1)
-        bw, bh = max(0, bx2 - bx1), max(0, by2 - by1)
-        union = aw * ah + bw * bh - inter
-        return inter / union if union > 0 else 0.0
-
     # ===== RAW draw (seperti skrip) + opsional Track ID =====
-    def _draw_raw_detections(self, frame, results, x_off=0, y_off=0, tracked=None):
+    def _draw_raw_detections(self, frame, results, x_off=0, y_off=0, tracked=None, min_conf=0.0):
         annotated = frame
         names = None
         try:
@@ -795,7 +850,7 @@ class ModernScreenVehicleCounter:
 
         show_all = bool(RUNTIME_CONFIG.get("raw_show_all_classes", False))
         veh_ids = VEHICLE_CLASSES
-        draw_ids = bool(RUNTIME_CONFIG.get("raw_draw_ids", True)) and isinstance(tracked, dict)
+        draw_ids = bool(RUNTIME_CONFIG.get("raw_draw_ids", True)) and tracked is not None and len(tracked) > 0
 
         if not results:
             return
@@ -816,15 +871,21 @@ class ModernScreenVehicleCounter:
         clss = clss.detach().cpu().numpy().astype(int)
 
         H, W = annotated.shape[:2]
-        # Siapkan list tracked boxes untuk IoU match
-        tracked_list = []
-        if draw_ids:
-            for tid, tr in tracked.items():
-                tracked_list.append((tid, tr["bbox"]))
-
-        for (x1, y1, x2, y2), c, cls_id in zip(xyxy, confs, clss):
+        # IoU semua box RAW vs tracked box sekaligus (snapshot tracker)
+        best_tids = [None] * len(xyxy)
+        if draw_ids and len(xyxy):
+            raw_boxes = xyxy + np.array([x_off, y_off, x_off, y_off], dtype=xyxy.dtype)
+            ious = iou_matrix(raw_boxes, tracked.boxes)
+            best = ious.argmax(axis=1)
+            ok = ious[np.arange(len(best)), best] >= 0.1
+            best_tids = [int(tracked.ids[b]) if k else None for b, k in zip(best.tolist(), ok.tolist())]
+
+        for (x1, y1, x2, y2), c, cls_id, best_tid in zip(xyxy, confs, clss, best_tids):
             if not show_all and cls_id not in veh_ids:
                 continue
+            if c < min_conf:
+                # box low-confidence hanya untuk tracker (two-stage), tidak digambar
+                continue
             x1i = int(x1 + x_off); y1i = int(y1 + y_off)
             x2i = int(x2 + x_off); y2i = int(y2 + y_off)
             x1i, y1i, x2i, y2i = self._clamp_bbox([x1i, y1i, x2i, y2i], W, H)
@@ -834,31 +895,14 @@ class ModernScreenVehicleCounter:
             label_name = str(cls_id)
             if isinstance(names, dict):
                 label_name = names.get(int(cls_id), str(cls_id))
-            base_label = f"{label_name} {c:.2f}"
-
-            # Cari track ID terdekat via IoU
-            tid_text = ""
-            if draw_ids and tracked_list:
-                best_tid = None
-                best_iou = 0.0
-                for tid, tb in tracked_list:
-                    iou = self._bbox_iou([x1i, y1i, x2i, y2i], tb)
-                    if iou > best_iou:
-                        best_iou = iou
-                        best_tid = tid
-                if best_tid is not None and best_iou >= 0.1:
-                    tid_text = f" | ID:{best_tid}"
-
-            label = base_label + tid_text
-            (tw, th), base = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)
-            y_text = max(th + base + 2, y1i)
-            cv2.rectangle(annotated, (x1i, y_text - th - base), (x1i + tw, y_text), (0, 255, 0), -1)
-            cv2.putText(annotated, label, (x1i, y_text - 4), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 0), 1)
+            parts = (f"{label_name} ", f"{c:.2f}", f" | ID:{best_tid}") if best_tid is not None else (f"{label_name} ", f"{c:.2f}")
+            self.label_sprites.draw(annotated, x1i, y1i, parts, (0, 255, 0), (0, 0, 0))
 
     def capture_loop(self):
         fps_counter = 0
         fps_start = time.time()
         frame_idx = 0
+        last_track_idx = -1
 
         # Modes
         raw_mode = bool(RUNTIME_CONFIG.get("raw_detections_mode", False))
@@ -877,12 +921,40 @@ class ModernScreenVehicleCounter:
         half = (MODEL_CONFIG.get("device", "cpu").startswith("cuda") and RUNTIME_CONFIG.get("use_half", True))
         use_class_filter = bool(RUNTIME_CONFIG.get("use_class_filter", True))
         classes_arg = list(VEHICLE_CLASSES) if (use_class_filter and not (raw_mode or raw_counting) and not RUNTIME_CONFIG.get("raw_show_all_classes", False)) else None
+        counting_active = raw_counting or not raw_mode
+        two_stage = counting_active and bool(TRACKING_CONFIG.get("two_stage_association", True))
+        low_conf = float(TRACKING_CONFIG.get("low_confidence", 0.10))
+        recorder = self._start_detection_recorder() if counting_active else None
+        video_rec = self._start_video_recorder()
+        dvr = self.dvr = self._start_dvr()
+        dvr_classes = set(RUNTIME_CONFIG.get("dvr_trigger_classes", ["truck", "bus"]) or [])
+        # Trigger DVR dari bus event tracker (line_crossed garis utama + garis/zona engine)
+        dvr_sub = (self.vehicle_tracker.events.subscribe(maxlen=256, types=(LINE_CROSSED,))
+                   if dvr is not None and dvr_classes else None)
+        evidence = self._start_evidence_writer()
+        # Overlay track di resolusi tampilan: UI menggambar snapshot pada buffer canvas
+        overlay_at_display = (RUNTIME_CONFIG.get("overlay_resolution", "capture") == "display"
+                              and RUNTIME_CONFIG.get("display_path", "fast") != "legacy")
+        thumb_every = float(RUNTIME_CONFIG.get("count_only_thumbnail_sec", 1.0))
+        last_thumb = 0.0
+        meter = self.render_meter
 
         while self.is_capturing:
             try:
                 frame = self.get_frame()
                 if frame is None:
                     time.sleep(0.01); continue
+                frame_ts = time.time()
+                t_loop = cpu_time()
+                if dvr is not None:
+                    dvr.push(frame, frame_ts)        # frame mentah, sebelum anotasi
+                # Count-only: counter, DB & event tetap jalan; gambar + publish hanya untuk thumbnail
+                count_only = self.count_only
+                render = (not count_only or self._thumb_request
+                          or (thumb_every > 0 and frame_ts - last_thumb >= thumb_every))
+                # Rekaman video butuh frame teranotasi walau count-only (hanya tampilan yang dilewati)
+                annotate = render or video_rec is not None
+                raw_draw = None
 
                 run_det = (frame_idx % stride == 0)
 
@@ -915,17 +987,23 @@ class ModernScreenVehicleCounter:
                                 x_off, y_off = xmin, ymin
 
                     # YOLO inference
+                    # Two-stage association: YOLO dijalankan dengan conf serendah low_confidence;
+                    # deteksi di bawah high_conf hanya dipakai tracker untuk menyambung track lama
+                    yolo_conf = raw_conf if (raw_mode or raw_counting) else float(MODEL_CONFIG['confidence_threshold'])
+                    high_conf = max(yolo_conf, float(MODEL_CONFIG['detection_confidence']))
+                    keep_conf = min(low_conf, high_conf) if two_stage else high_conf
+                    infer_conf = min(yolo_conf, keep_conf)
                     if raw_mode or raw_counting:
-                        results = self.model(det_frame, verbose=False, conf=raw_conf, iou=raw_iou, imgsz=imgsz, half=half)
+                        results = self.model(det_frame, verbose=False, conf=infer_conf, iou=raw_iou, imgsz=imgsz, half=half)
                     else:
                         if classes_arg is not None:
                             results = self.model(det_frame, verbose=False,
-                                                 conf=MODEL_CONFIG['confidence_threshold'],
+                                                 conf=infer_conf,
                                                  iou=MODEL_CONFIG['iou_threshold'],
                                                  imgsz=imgsz, half=half, classes=classes_arg)
                         else:
                             results = self.model(det_frame, verbose=False,
-                                                 conf=MODEL_CONFIG['confidence_threshold'],
+                                                 conf=infer_conf,
                                                  iou=MODEL_CONFIG['iou_threshold'],
                                                  imgsz=imgsz, half=half)
 
@@ -938,7 +1016,7 @@ class ModernScreenVehicleCounter:
                                 for box in boxes:
                                     cls = int(box.cls[0])
                                     conf = float(box.conf[0])
-                                    if cls in VEHICLE_CLASSES and conf >= MODEL_CONFIG['detection_confidence']:
+                                    if cls in VEHICLE_CLASSES and conf >= keep_conf:
                                         x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
                                         x1 += x_off; y1 += y_off; x2 += x_off; y2 += y_off
                                         w = x2 - x1; h = y2 - y1
@@ -950,34 +1028,66 @@ class ModernScreenVehicleCounter:
                                                 'class': cls, 'confidence': conf
                                             })
 
+                    # Jumlah frame sejak update tracker terakhir (stride) untuk prediksi Kalman
+                    frames_elapsed = frame_idx - last_track_idx if last_track_idx >= 0 else 1
+                    last_track_idx = frame_idx
+                    if recorder is not None:
+                        recorder.add(frame_idx, frame_ts, high_conf, detections, self.counting_line)
+
                     # Update tracker lebih dulu jika raw_counting agar ID siap untuk ditampilkan
                     tracked = None
                     if raw_counting:
-                        self.vehicle_tracker.update_tracking(detections)
-                        tracked = self.vehicle_tracker.get_tracked_vehicles_with_status()
+                        self.vehicle_tracker.update_tracking(detections, frames_elapsed, high_conf=high_conf, timestamp=frame_ts, frame=frame)
+                        tracked = self.vehicle_tracker.snapshot()
 
-                    # Gambar RAW (dengan ID jika ada tracked)
+                    # Gambar RAW (dengan ID jika ada tracked) ditunda sampai sesudah counting:
+                    # crop bukti crossing diambil dari frame yang belum dianotasi
                     if raw_mode or raw_counting:
-                        self._draw_raw_detections(frame, results, x_off, y_off, tracked=tracked)
+                        raw_draw = (results, x_off, y_off, tracked, yolo_conf)
                     else:
                         # Non-RAW: tracking + draw dari tracker
-                        self.vehicle_tracker.update_tracking(detections)
+                        self.vehicle_tracker.update_tracking(detections, frames_elapsed, high_conf=high_conf, timestamp=frame_ts, frame=frame)
 
                 # Counting (keduanya: raw_counting dan non-RAW)
+                tracks_overlay = None
                 if raw_counting or not (raw_mode or raw_counting):
                     if self.vehicle_tracker.check_line_crossings_directional(self.counting_line, self.line_settings):
                         self.update_count_labels()
+                        if dvr_sub is not None:
+                            for ev in dvr_sub.drain():
+                                if "*" in dvr_classes or ev.class_name in dvr_classes:
+                                    dvr.trigger(f"{ev.class_name} {ev.direction} ID{ev.track_id}", ev.timestamp)
+                        if evidence is not None:
+                            # Crop disalin sebelum frame dianotasi; encode + tulis di thread pool
+                            for ev, bbox, conf in self.vehicle_tracker.crossing_details():
+                                evidence.capture(frame, ev, bbox, conf)
+                if annotate:
+                    t_r = cpu_time()
+                    if raw_draw is not None:
+                        results, x_off, y_off, tracked, yolo_conf = raw_draw
+                        self._draw_raw_detections(frame, results, x_off, y_off, tracked=tracked, min_conf=yolo_conf)
                     # Draw tracked boxes hanya di non-RAW
                     if not (raw_mode or raw_counting):
-                        self.draw_detections_with_colors(frame)
+                        if overlay_at_display:
+                            tracks_overlay = self.vehicle_tracker.snapshot()
+                        else:
+                            self.draw_detections_with_colors(frame)
+
+                    # Garis hitung + zona (layer statis cache)
+                    self.draw_static_overlay(frame)
 
-                # Garis hitung
-                self.draw_counting_line(frame)
+                    if video_rec is not None:
+                        video_rec.submit(frame, tracks_overlay, frame_ts)
 
                 # Show
-                with self.frame_lock:
-                    self.current_frame = frame.copy()
-                self.root.after(0, self.update_display)
+                if render:
+                    self.publish_frame(frame, tracks_overlay)
+                    meter.rendered_frame(cpu_time() - t_r)
+                    if count_only:
+                        last_thumb = frame_ts
+                        self._thumb_request = False
+                else:
+                    meter.skipped_frame()
 
                 # FPS
                 fps_counter += 1
@@ -991,60 +1101,141 @@ class ModernScreenVehicleCounter:
                         mode_tag = "RAW+Count"
                     else:
                         mode_tag = "Det"
-                    self.root.after(0, lambda f=fps, m=mode_tag: self.fps_label.config(text=f"📈 {m} FPS: {f:.1f}"))
-
+                    fps_text = f"📈 {mode_tag} FPS: {fps:.1f}"
+                    if count_only:
+                        saved, pct = meter.savings(self.canvas_view.cpu_ms)
+                        fps_text += f" | count-only -{saved:.1f}ms/frame ({pct:.0f}%)" if saved else " | count-only"
+                    if TRACKING_CONFIG.get("reid", False):
+                        rs = self.vehicle_tracker.reid.get_stats()
+                        fps_text += f" | ReID {rs['avg_ms']:.1f}ms +{rs['relinked']}"
+                    if video_rec is not None:
+                        fps_text += f" | REC drop {video_rec.dropped}" if video_rec.dropped else " | REC"
+                    if dvr is not None:
+                        ds = dvr.get_stats()
+                        fps_text += f" | DVR {ds['used_mb']:.0f}/{ds['memory_mb']:.0f}MB {ds['clips']} clip"
+                    self.ui_state.publish(fps=fps_text)
+
+                meter.loop(cpu_time() - t_loop)
                 frame_idx += 1
                 time.sleep(0.005)
             except Exception as e:
                 print(f"Capture error: {e}")
                 time.sleep(0.02)
 
-    # ===== Tracked drawing (non-RAW) =====
-    def draw_detections_with_colors(self, frame):
-        tracked = self.vehicle_tracker.get_tracked_vehicles_with_status()
-        draw_paths = bool(RUNTIME_CONFIG.get("draw_paths", True))
-        max_pts = int(RUNTIME_CONFIG.get("max_path_points_drawn", 10))
+        if meter.skipped:
+            saved, pct = meter.savings(self.canvas_view.cpu_ms)
+            print(f"Count-only: {meter.skipped} frame tanpa render, hemat ≈ {saved:.1f} ms CPU/frame ({pct:.0f}%)")
+        if recorder is not None:
+            recorder.close()
+            print(f"Detection log: {recorder.frames} frame, {recorder.detections} deteksi -> {recorder.path}")
+        if dvr_sub is not None:
+            dvr_sub.close()
+            if dvr_sub.dropped:
+                print(f"DVR: {dvr_sub.dropped} event crossing terlewat (antrean penuh)")
+        if dvr is not None:
+            self.dvr = None
+            dvr.close()
+            ds = dvr.get_stats()
+            print(f"DVR: {ds['clips']} klip, ring {ds['slots']} slot x {ds['slot_kb']:.0f} KB = {ds['memory_mb']:.0f} MB "
+                  f"({ds['oversize']} oversize, {ds['skipped']} skip) -> {dvr.path}")
+        if evidence is not None:
+            evidence.close()
+            es = evidence.get_stats()
+            print(f"Evidence: {es['saved']} crop, {es['dropped']} drop, {es['errors']} error -> {evidence.path}")
+        if video_rec is not None:
+            video_rec.close()
+            print(f"Video: {video_rec.written} frame, {video_rec.segments} segmen, "
+                  f"{video_rec.dropped} drop, {video_rec.repeated} ulang ({video_rec.backend}) -> {video_rec.path}")
+
+    def _start_detection_recorder(self):
+        if not RUNTIME_CONFIG.get("record_detections", False):
+            return None
+        try:
+            out_dir = Path(RUNTIME_CONFIG.get("record_dir", "recordings")) / time.strftime("det_%Y%m%d_%H%M%S")
+            meta = {
+                "input": self.input_type,
+                "line_settings": dict(self.line_settings),
+                "counting": COUNTING_CONFIG,
+                "tracking": dict(TRACKING_CONFIG),
+                "model": dict(MODEL_CONFIG),
+            }
+            return DetectionRecorder(out_dir, meta, int(RUNTIME_CONFIG.get("record_chunk_frames", 3000)))
+        except Exception as e:
+            print(f"Detection recorder error: {e}")
+            return None
 
-        H, W = frame.shape[:2]
+    def _start_video_recorder(self):
+        if not RUNTIME_CONFIG.get("record_video", False):
+            return None
+        try:
+            out_dir = Path(RUNTIME_CONFIG.get("record_dir", "recordings")) / time.strftime("vid_%Y%m%d_%H%M%S")
+            return VideoRecorder(out_dir, fps=float(RUNTIME_CONFIG.get("record_video_fps", 15)),
+                                 width=int(RUNTIME_CONFIG.get("record_video_width", 0)),
+                                 backend=RUNTIME_CONFIG.get("record_video_backend", "opencv"),
+                                 segment_sec=float(RUNTIME_CONFIG.get("record_video_segment_sec", 600)),
+                                 segment_mb=float(RUNTIME_CONFIG.get("record_video_segment_mb", 0)),
+                                 queue_size=int(RUNTIME_CONFIG.get("record_video_queue", 32)),
+                                 overlay_fn=self._track_overlay_fn())
+        except Exception as e:
+            print(f"Video recorder error: {e}")
+            return None
 
-        for track_id, tr in tracked.items():
-            bbox = tr['bbox']
-            bbox = self._clamp_bbox(bbox, W, H)
-            x1, y1, x2, y2 = map(int, bbox)
+    def _start_dvr(self):
+        if not RUNTIME_CONFIG.get("dvr_enabled", False):
+            return None
+        try:
+            dvr = DvrBuffer(Path(RUNTIME_CONFIG.get("record_dir", "recordings")) / "dvr",
+                            pre_seconds=float(RUNTIME_CONFIG.get("dvr_pre_seconds", 10)),
+                            post_seconds=float(RUNTIME_CONFIG.get("dvr_post_seconds", 3)),
+                            fps=float(RUNTIME_CONFIG.get("dvr_fps", 10)),
+                            memory_mb=float(RUNTIME_CONFIG.get("dvr_memory_mb", 64)),
+                            width=int(RUNTIME_CONFIG.get("dvr_width", 960)),
+                            quality=int(RUNTIME_CONFIG.get("dvr_jpeg_quality", 75)))
+            print(f"DVR: ring {dvr.slots} slot x {dvr.slot_bytes // 1024} KB (maks {RUNTIME_CONFIG.get('dvr_memory_mb', 64)} MB)")
+            return dvr
+        except Exception as e:
+            print(f"DVR error: {e}")
+            return None
 
-            cls_name = CLASS_NAMES.get(tr['class'], 'unknown')
-            conf = tr['confidence']
-            counted = tr.get('is_counted', False)
+    def _start_evidence_writer(self):
+        if not RUNTIME_CONFIG.get("evidence_enabled", False):
+            return None
+        try:
+            return EvidenceWriter(RUNTIME_CONFIG.get("evidence_dir", "evidence"),
+                                  workers=int(RUNTIME_CONFIG.get("evidence_workers", 2)),
+                                  max_pending=int(RUNTIME_CONFIG.get("evidence_max_pending", 64)),
+                                  padding=float(RUNTIME_CONFIG.get("evidence_padding", 0.1)),
+                                  quality=int(RUNTIME_CONFIG.get("evidence_jpeg_quality", 90)))
+        except Exception as e:
+            print(f"Evidence writer error: {e}")
+            return None
 
-            if counted:
-                box_color = COLOR_CONFIG['counted_vehicle']
-                center_color = COLOR_CONFIG['center_dot_counted']
-                path_color = COLOR_CONFIG['tracking_path_counted']
-                prefix = f"[COUNTED] ID:{track_id}"
-            else:
-                box_color = COLOR_CONFIG['active_vehicle']
-                center_color = COLOR_CONFIG['center_dot_active']
-                path_color = COLOR_CONFIG['tracking_path']
-                prefix = f"[ACTIVE] ID:{track_id}"
-
-            cv2.rectangle(frame, (x1, y1), (x2, y2), box_color, 2)
-            label = f"{prefix} {cls_name} {conf:.2f}"
-            (tw, th), base = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)
-            y_text = max(th + base + 2, y1)
-            cv2.rectangle(frame, (x1, y_text - th - base), (x1 + tw, y_text), box_color, -1)
-            cv2.putText(frame, label, (x1, y_text - 4), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-
-            cx, cy = (x1 + x2) // 2, (y1 + y2) // 2
-            cv2.circle(frame, (cx, cy), 3, center_color, -1)
-
-            if draw_paths:
-                path = tr['path']
-                if len(path) > 1:
-                    start_idx = max(1, len(path) - max_pts)
-                    for i in range(start_idx, len(path)):
-                        cv2.line(frame, path[i-1], path[i], path_color, 2)
-
-    def draw_counting_line(self, frame):
+    # ===== Tracked drawing (non-RAW) =====
+    def draw_detections_with_colors(self, frame, snap=None, scale=1.0):
+        if snap is None:
+            snap = self.vehicle_tracker.snapshot()
+        draw_tracks(frame, snap, self.label_sprites, self._track_styles, CLASS_NAMES,
+                    draw_paths=bool(RUNTIME_CONFIG.get("draw_paths", True)),
+                    max_points=int(RUNTIME_CONFIG.get("max_path_points_drawn", 10)), scale=scale)
+
+    def _static_overlay_key(self):
+        ls = self.line_settings
+        engine = self.vehicle_tracker.counting_engine
+        line = tuple(map(tuple, self.counting_line)) if self.counting_line else None
+        return (line, ls.get('line_color'), ls.get('line_thickness'), int(ls.get('band_px', 12)),
+                ls.get('show_label'), ls.get('label_text'), getattr(engine, 'geometry_version', 0))
+
+    def draw_static_overlay(self, frame):
+        """Garis hitung + band + label + garis/zona engine: dirender ulang hanya saat setting berubah."""
+        self.static_overlay.ensure(frame.shape, self._static_overlay_key(), self._build_static_overlay)
+        self.static_overlay.apply(frame)
+
+    def _build_static_overlay(self, ov):
+        self.draw_counting_line(ov)
+        self.draw_counting_zones(ov)
+
+    def draw_counting_line(self, ov):
+        """Susun garis hitung + band + label ke StaticOverlay (argumen seperti cv2 tanpa img)."""
         if not self.counting_line:
             return
         hex_color = self.line_settings['line_color'].lstrip('#')
@@ -1052,7 +1243,7 @@ class ModernScreenVehicleCounter:
         bgr = (rgb[2], rgb[1], rgb[0])
         th = self.line_settings['line_thickness']
         p1, p2 = self.counting_line
-        cv2.line(frame, p1, p2, bgr, th)
+        ov.line(p1, p2, bgr, th)
 
         band_px = int(self.line_settings.get("band_px", 12))
         x1, y1 = p1; x2, y2 = p2
@@ -1063,15 +1254,27 @@ class ModernScreenVehicleCounter:
         p1a = (int(x1 + nx * off), int(y1 + ny * off)); p2a = (int(x2 + nx * off), int(y2 + ny * off))
         p1b = (int(x1 - nx * off), int(y1 - ny * off)); p2b = (int(x2 - nx * off), int(y2 - ny * off))
         band_color = (bgr[0]//2, bgr[1]//2, bgr[2]//2)
-        cv2.line(frame, p1a, p2a, band_color, 1, lineType=cv2.LINE_AA)
-        cv2.line(frame, p1b, p2b, band_color, 1, lineType=cv2.LINE_AA)
+        ov.line(p1a, p2a, band_color, 1, lineType=cv2.LINE_AA)
+        ov.line(p1b, p2b, band_color, 1, lineType=cv2.LINE_AA)
 
         if self.line_settings['show_label']:
             label_text = self.line_settings['label_text']
             mid_x = (p1[0] + p2[0]) // 2; mid_y = (p1[1] + p2[1]) // 2
-            cv2.putText(frame, label_text, (mid_x + 10, mid_y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, bgr, 2)
-            cv2.putText(frame, "UP", (p1[0] - 30, p1[1] - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
-            cv2.putText(frame, "DOWN", (p2[0] + 10, p2[1] + 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 2)
+            ov.putText(label_text, (mid_x + 10, mid_y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, bgr, 2)
+            ov.putText("UP", (p1[0] - 30, p1[1] - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+            ov.putText("DOWN", (p2[0] + 10, p2[1] + 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 2)
+
+    def draw_counting_zones(self, ov):
+        engine = self.vehicle_tracker.counting_engine
+        if not engine:
+            return
+        color = (255, 160, 0)
+        for name, poly in engine.zone_geometry():
+            ov.polylines([poly], True, color, 1, lineType=cv2.LINE_AA)
+            ov.putText(name, (int(poly[0][0]) + 4, int(poly[0][1]) + 14), cv2.FONT_HERSHEY_SIMPLEX, 0.45, color, 1)
+        for name, p1, p2 in engine.line_geometry():
+            ov.line(p1, p2, color, 2)
+            ov.putText(name, (p1[0] + 4, p1[1] - 6), cv2.FONT_HERSHEY_SIMPLEX, 0.45, color, 1)
 
     # ===== Line drawing on canvas =====
     def start_line(self, event):
@@ -1093,7 +1296,7 @@ class ModernScreenVehicleCounter:
             p1_canvas = self.line_start_canvas; p2_canvas = (event.x, event.y)
             canvas_w = self.canvas.winfo_width(); canvas_h = self.canvas.winfo_height()
             with self.frame_lock:
-                frame = None if self.current_frame is None else self.current_frame.copy()
+                frame = self.current_frame
             if frame is not None:
                 fh, fw = frame.shape[:2]
             else:
@@ -1103,21 +1306,10 @@ class ModernScreenVehicleCounter:
                 else:
                     fw, fh = canvas_w, canvas_h
 
-            frame_aspect = fw / fh; canvas_aspect = canvas_w / canvas_h
-            if frame_aspect > canvas_aspect:
-                scale = canvas_w / fw; new_h = int(fh * scale)
-                y_off = (canvas_h - new_h) // 2; x_off = 0
-            else:
-                scale = canvas_h / fh; new_w = int(fw * scale)
-                x_off = (canvas_w - new_w) // 2; y_off = 0
-
-            def canvas_to_frame(x, y):
-                x_adj = x - x_off; y_adj = y - y_off
-                xf = int(x_adj / scale); yf = int(y_adj / scale)
-                xf = max(0, min(fw - 1, xf)); yf = max(0, min(fh - 1, yf))
-                return (xf, yf)
-
-            p1 = canvas_to_frame(*p1_canvas); p2 = canvas_to_frame(*p2_canvas)
+            # Geometri sama dengan yang dipakai update_display (cache CanvasView)
+            self.canvas_view.layout(fw, fh, canvas_w, canvas_h)
+            p1 = self.canvas_view.canvas_to_frame(*p1_canvas, fw, fh)
+            p2 = self.canvas_view.canvas_to_frame(*p2_canvas, fw, fh)
             if math.hypot(p2[0] - p1[0], p2[1] - p1[1]) > 10:
                 self.counting_line = [p1, p2]
                 self.line_drawn = True
@@ -1129,26 +1321,85 @@ class ModernScreenVehicleCounter:
                 messagebox.showwarning("⚠️", "Line too short. Draw longer line.")
             del self.line_start_canvas
 
+    def publish_frame(self, frame, tracks=None):
+        """
+        Serahkan frame selesai-gambar ke UI. Double buffer: frame dari get_frame() selalu array baru,
+        jadi cukup tukar referensi; worker tidak menyentuh frame ini lagi setelah publish.
+        tracks: snapshot yang digambar UI di resolusi tampilan (overlay_resolution = display).
+        """
+        with self.frame_lock:
+            self.current_frame = frame
+            self.current_tracks = tracks
+            self.frames_published += 1
+        if self.preview_server is not None:
+            self.preview_server.submit(frame, tracks)
+
+    def _display_tick(self):
+        """Timer UI tunggal: tampilkan frame terbaru (bila ada yang baru), frame di antaranya dilewati."""
+        interval = max(5, int(1000 / max(1.0, float(RUNTIME_CONFIG.get("display_fps", 30)))))
+        try:
+            with self.frame_lock:
+                seq = self.frames_published
+            if seq != self._shown_seq:
+                self._shown_seq = seq
+                self.update_display()
+            self._update_display_stats()
+        except Exception as e:
+            print(f"Display error: {e}")
+        self.root.after(interval, self._display_tick)
+
+    def _update_display_stats(self):
+        t0, p0, d0 = self._display_rate
+        now = time.time()
+        if now - t0 < 1.0:
+            return
+        p, d = self.frames_published, self.frames_displayed
+        self._display_rate = (now, p, d)
+        if p == p0:
+            return
+        dt = now - t0
+        self.display_label.config(text=f"🖼️ Display ({RUNTIME_CONFIG.get('display_path', 'fast')}): "
+                                       f"{self.canvas_view.cpu_ms:.1f} ms CPU/frame | "
+                                       f"{(p - p0) / dt:.0f} proc / {(d - d0) / dt:.0f} shown fps "
+                                       f"(skip {p - d})")
+
     def update_display(self):
         with self.frame_lock:
-            frame = None if self.current_frame is None else self.current_frame.copy()
-        if frame is not None:
-            img = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            img = Image.fromarray(img)
-            canvas_w = self.canvas.winfo_width(); canvas_h = self.canvas.winfo_height()
-            if canvas_w < 10 or canvas_h < 10:
-                return
-            iw, ih = img.size
-            ar = iw / ih; car = canvas_w / canvas_h
-            if ar > car:
-                new_w = canvas_w; new_h = int(canvas_w / ar)
-            else:
-                new_h = canvas_h; new_w = int(canvas_h * ar)
-            img = img.resize((new_w, new_h), Image.LANCZOS)
-            self.photo = ImageTk.PhotoImage(image=img)
+            frame = self.current_frame
+            tracks = self.current_tracks
+        if frame is None:
+            return
+        canvas_w = self.canvas.winfo_width(); canvas_h = self.canvas.winfo_height()
+        if canvas_w < 10 or canvas_h < 10:
+            return
+        t0 = cpu_time()
+        view = self.canvas_view
+        if RUNTIME_CONFIG.get("display_path", "fast") == "legacy":
+            self.photo = ImageTk.PhotoImage(image=legacy_render(frame, canvas_w, canvas_h))
             self.canvas.delete("all")
             self.canvas.create_image(canvas_w // 2, canvas_h // 2, image=self.photo, anchor=tk.CENTER)
-        self.root.update_idletasks()
+            self._canvas_image = None
+        else:
+            fh, fw = frame.shape[:2]
+            moved = view.layout(fw, fh, canvas_w, canvas_h)
+            draw = None
+            if tracks is not None:
+                draw = lambda img, scale: self.draw_detections_with_colors(img, tracks, scale)
+            img = Image.fromarray(view.render(frame, draw))
+            if self.photo is None or (self.photo.width(), self.photo.height()) != view.size:
+                self.photo = ImageTk.PhotoImage(image=img)
+                moved = True
+            else:
+                self.photo.paste(img)             # update in place, tanpa PhotoImage/item canvas baru
+            if self._canvas_image is None:
+                self._canvas_image = self.canvas.create_image(canvas_w // 2, canvas_h // 2, image=self.photo,
+                                                              anchor=tk.CENTER, tags="video")
+                self.canvas.tag_lower("video")
+            elif moved:
+                self.canvas.itemconfig(self._canvas_image, image=self.photo)
+                self.canvas.coords(self._canvas_image, canvas_w // 2, canvas_h // 2)
+        view.account(cpu_time() - t0)
+        self.frames_displayed += 1
 
     # ===== DB ops =====
     def save_counts_to_db(self):
@@ -1159,6 +1410,13 @@ class ModernScreenVehicleCounter:
             self.root.after(3000, lambda: self.on_db_status_changed(self.db_handler.connected))
         except Exception as e:
             messagebox.showerror("💾 Database Error", f"Failed to save to database: {e}")
+            return
+        # Counter per garis/zona disimpan terpisah: gagal di sini tidak membatalkan count utama
+        if self.vehicle_tracker.counting_engine:
+            try:
+                self.db_handler.save_engine_counts(self.vehicle_tracker.counting_engine.get_counts())
+            except Exception as e:
+                messagebox.showerror("💾 Database Error", f"Main counts saved, but line/zone counts failed: {e}")
 
     def view_reports(self):
         try:
@@ -1180,7 +1438,7 @@ class ModernScreenVehicleCounter:
     def create_automatic_line(self):
         fw, fh = None, None
         with self.frame_lock:
-            frame = None if self.current_frame is None else self.current_frame.copy()
+            frame = self.current_frame
         if frame is not None:
             fh, fw = frame.shape[:2]
         elif self.input_type == "screen" and self.capture_region:
@@ -1223,16 +1481,69 @@ class ModernScreenVehicleCounter:
             self.update_count_labels()
 
     def update_count_labels(self):
+        """Publikasikan snapshot hitungan (aman dari thread worker); label diupdate oleh _refresh_ui."""
         counts = self.vehicle_tracker.get_counts()
-        self.root.after(0, lambda: self.total_up_label.config(text=f"📈 Total UP: {counts['total_up']}"))
-        self.root.after(0, lambda: self.total_down_label.config(text=f"📉 Total DOWN: {counts['total_down']}"))
+        values = {"total_up": f"📈 Total UP: {counts['total_up']}",
+                  "total_down": f"📉 Total DOWN: {counts['total_down']}"}
         for vehicle in ['car', 'motorcycle', 'bus', 'truck']:
-            up_count = counts['up'].get(vehicle, 0)
-            down_count = counts['down'].get(vehicle, 0)
-            up_label = getattr(self, f'{vehicle}_up_label')
-            down_label = getattr(self, f'{vehicle}_down_label')
-            self.root.after(0, lambda ul=up_label, uc=up_count: ul.config(text=f"↑{uc}"))
-            self.root.after(0, lambda dl=down_label, dc=down_count: dl.config(text=f"↓{dc}"))
+            values[f"{vehicle}_up"] = f"↑{counts['up'].get(vehicle, 0)}"
+            values[f"{vehicle}_down"] = f"↓{counts['down'].get(vehicle, 0)}"
+        snap = dict(counts, version=self.ui_state.version + 1, timestamp=time.time())
+        if self.vehicle_tracker.counting_engine:
+            engine_counts = self.vehicle_tracker.counting_engine.get_counts()
+            snap["engine"] = engine_counts
+            values["extra_counts"] = self.format_engine_counts(engine_counts)
+        self.counts_snapshot = snap
+        self.ui_state.publish(**values)
+
+    def _counts_json(self):
+        snap = self.counts_snapshot
+        if snap is None:
+            snap = dict(self.vehicle_tracker.get_counts(), version=0, timestamp=time.time())
+        return snap
+
+    def _track_overlay_fn(self):
+        """overlay_fn(img, snap, scale) untuk thread lain (preview/rekaman): cache sprite sendiri."""
+        sprites = LabelSprites()
+        draw_paths = bool(RUNTIME_CONFIG.get("draw_paths", True))
+        max_points = int(RUNTIME_CONFIG.get("max_path_points_drawn", 10))
+
+        def overlay(img, snap, scale):
+            draw_tracks(img, snap, sprites, self._track_styles, CLASS_NAMES,
+                        draw_paths=draw_paths, max_points=max_points, scale=scale)
+        return overlay
+
+    def _start_preview_server(self):
+        if not RUNTIME_CONFIG.get("preview_server", False):
+            return None
+        try:
+            server = PreviewServer(host=RUNTIME_CONFIG.get("preview_host", "0.0.0.0"),
+                                   port=int(RUNTIME_CONFIG.get("preview_port", 8080)),
+                                   fps=float(RUNTIME_CONFIG.get("preview_fps", 5)),
+                                   width=int(RUNTIME_CONFIG.get("preview_width", 640)),
+                                   quality=int(RUNTIME_CONFIG.get("preview_jpeg_quality", 70)),
+                                   counts_fn=self._counts_json, overlay_fn=self._track_overlay_fn())
+            server.start()
+            return server
+        except Exception as e:
+            print(f"Preview server gagal dijalankan: {e}")
+            return None
+
+    def _refresh_ui(self):
+        """Task UI periodik tunggal: key UiState 'x' -> label self.x_label, hanya yang berubah."""
+        try:
+            for key, text in self.ui_state.pending().items():
+                label = getattr(self, f"{key}_label", None)
+                if label is not None:
+                    label.config(text=text)
+        except Exception as e:
+            print(f"UI refresh error: {e}")
+        self.root.after(max(20, int(RUNTIME_CONFIG.get("ui_refresh_ms", 200))), self._refresh_ui)
+
+    def format_engine_counts(self, engine_counts):
+        rows = [f"📏 {name}: ↑{c['total_up']} ↓{c['total_down']}" for name, c in engine_counts["lines"].items()]
+        rows += [f"⬛ {name}: in {c['total_entered']} / out {c['total_exited']}" for name, c in engine_counts["zones"].items()]
+        return "\n".join(rows)
 
     def on_monitor_changed(self):
         idx_str = self.monitor_var.get()
@@ -1251,6 +1562,8 @@ class ModernScreenVehicleCounter:
             self.is_previewing = False
             if self.preview_thread and self.preview_thread.is_alive():
                 self.preview_thread.join(timeout=1)
+        if self.preview_server is not None:
+            self.preview_server.stop()
         self.close_video_source()
         self.db_handler.close_connection()
         self.persist_input_settings()
@@ -0,0 +1,195 @@
+"""
+Overlay frame yang di-cache:
+- StaticOverlay: elemen statis (garis hitung, band, label, garis/zona CountingEngine) disusun
+  sekali saat setting berubah; per frame tanpa parse warna/geometri dan tanpa putText ulang.
+- LabelSprites: label per-track dari cache sprite (latar + teks) per token teks; label dirakit
+  dari token (mis. "[ACTIVE] ID:12 car " + "0.87") sehingga getTextSize/putText hanya
+  dipanggil sekali per token unik.
+- draw_tracks: box, path dan titik tengah semua track digambar batch per grup warna
+  (satu cv2.polylines per grup), opsional pada resolusi tampilan.
+"""
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+
+class StaticOverlay:
+    """
+    Layer statis. Builder dipanggil hanya saat key (ukuran frame + setting) berubah dan memakai
+    line()/polylines()/putText() dengan argumen seperti cv2 tanpa img:
+    - garis/poligon: parameter (warna, titik, normal band) dihitung sekali, per frame diputar ulang
+      langsung ke frame (cv2 line lebih murah daripada blend layer selebar frame);
+    - teks: dirender sekali ke layer kecil + alpha (selisih render latar hitam & putih, termasuk
+      tepi AA), per frame di-blend per persegi teks.
+    """
+
+    def __init__(self):
+        self.key: Optional[Hashable] = None
+        self._shape: Tuple[int, int] = (0, 0)
+        self._ops: List[Tuple[Callable, tuple, dict]] = []
+        # (y0, y1, x0, x1, 255 - alpha, warna premultiplied) per teks
+        self._rects: List[Tuple[int, int, int, int, np.ndarray, np.ndarray]] = []
+        self.builds = 0
+
+    def ensure(self, shape: Tuple[int, ...], key: Hashable, build: Callable[["StaticOverlay"], None]):
+        key = (shape[0], shape[1], key)
+        if key == self.key:
+            return
+        self.key = key
+        self._shape = (shape[0], shape[1])
+        self._ops = []
+        self._rects = []
+        build(self)
+        self.builds += 1
+
+    def line(self, *args, **kwargs):
+        self._ops.append((cv2.line, args, kwargs))
+
+    def polylines(self, *args, **kwargs):
+        self._ops.append((cv2.polylines, args, kwargs))
+
+    def putText(self, text: str, org, font_face, font_scale, color, thickness=1, line_type=cv2.LINE_8):
+        H, W = self._shape
+        (tw, th), base = cv2.getTextSize(text, font_face, font_scale, thickness)
+        m = thickness + 2
+        x0 = max(0, int(org[0]) - m); x1 = min(W, int(org[0]) + tw + m)
+        y0 = max(0, int(org[1]) - th - m); y1 = min(H, int(org[1]) + base + m)
+        if x1 <= x0 or y1 <= y0:
+            return
+        local = (int(org[0]) - x0, int(org[1]) - y0)
+        black = np.zeros((y1 - y0, x1 - x0, 3), dtype=np.uint8)
+        white = np.full_like(black, 255)
+        cv2.putText(black, text, local, font_face, font_scale, color, thickness, line_type)
+        cv2.putText(white, text, local, font_face, font_scale, color, thickness, line_type)
+        inv = (white.astype(np.int16) - black).min(axis=2).astype(np.uint8)       # 255 - alpha
+        self._rects.append((y0, y1, x0, x1, cv2.merge([inv] * 3), black))
+
+    def apply(self, frame: np.ndarray):
+        """Gambar layer ke frame in place: garis diputar ulang, teks di-blend frame * (1 - alpha) + warna."""
+        for fn, args, kwargs in self._ops:
+            fn(frame, *args, **kwargs)
+        for y0, y1, x0, x1, inv, premul in self._rects:
+            roi = frame[y0:y1, x0:x1]
+            cv2.multiply(roi, inv, dst=roi, scale=1.0 / 255.0)
+            cv2.add(roi, premul, dst=roi)
+
+
+class LabelSprites:
+    """
+    Cache sprite label per token teks (LRU): latar + teks dirender sekali, per frame cukup
+    salinan slice. Label dirakit dari token (mis. "[ACTIVE] ID:12 car " + "0.87") agar token yang
+    sering berubah (confidence) tetap punya himpunan nilai kecil. Tata letak sama dengan
+    rectangle terisi + putText label lama (posisi glyph bisa bergeser <= 1 px di sambungan token).
+    """
+
+    def __init__(self, font_scale: float = 0.5, thickness: int = 1, capacity: int = 2048):
+        self.font_scale = font_scale
+        self.thickness = thickness
+        self.capacity = capacity
+        self.text_h = cv2.getTextSize("A", FONT, font_scale, thickness)[0][1]
+        # Sprite ditambatkan ke tepi bawah (baseline = baris bawah - 4) dengan ruang baseline maksimum
+        self.max_base = max(cv2.getTextSize("[gjpqy]", FONT, font_scale, thickness)[1], 4)
+        self.height = self.text_h + self.max_base + 1
+        self._cache: "OrderedDict[Tuple[str, tuple, tuple], Tuple[np.ndarray, int]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def token(self, text: str, bg: Tuple[int, int, int], fg: Tuple[int, int, int]) -> Tuple[np.ndarray, int]:
+        """(sprite, baseline getTextSize) untuk token."""
+        key = (text, bg, fg)
+        hit = self._cache.get(key)
+        if hit is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return hit
+        self.misses += 1
+        (tw, _), base = cv2.getTextSize(text, FONT, self.font_scale, self.thickness)
+        spr = np.empty((self.height, max(1, tw), 3), dtype=np.uint8)
+        spr[:] = bg
+        cv2.putText(spr, text, (0, self.height - 1 - 4), FONT, self.font_scale, fg, self.thickness)
+        hit = (spr, min(base, self.max_base))
+        self._cache[key] = hit
+        if len(self._cache) > self.capacity:
+            self._cache.popitem(last=False)
+        return hit
+
+    def draw(self, frame: np.ndarray, x: int, y1: int, parts: Sequence[str],
+             bg: Tuple[int, int, int], fg: Tuple[int, int, int]):
+        """Label dari token; dasar label di max(th + base + 2, y1), terpotong di tepi frame."""
+        sprites = [self.token(t, bg, fg) for t in parts]
+        base = max(b for _, b in sprites)
+        h = self.text_h + base + 1
+        y_text = max(self.text_h + base + 2, y1)
+        H, W = frame.shape[:2]
+        y0 = max(0, y_text - h + 1); ye = min(H, y_text + 1)
+        if ye <= y0:
+            return
+        sy = self.height - (y_text + 1 - y0)
+        sye = sy + (ye - y0)
+        for spr, _ in sprites:
+            w = spr.shape[1]
+            x0 = max(0, x); x1 = min(W, x + w)
+            if x1 > x0:
+                frame[y0:ye, x0:x1] = spr[sy:sye, x0 - x:x1 - x]
+            x += w
+            if x >= W:
+                return
+        if x >= 0:
+            frame[y0:ye, x] = bg          # kolom penutup (rectangle lama inklusif x1 + tw)
+
+
+def _dot_offsets(radius: int) -> Tuple[np.ndarray, np.ndarray]:
+    m = np.zeros((2 * radius + 1, 2 * radius + 1), dtype=np.uint8)
+    cv2.circle(m, (radius, radius), radius, 255, -1)
+    dy, dx = np.nonzero(m > 127)
+    return (dy - radius).astype(np.intp), (dx - radius).astype(np.intp)
+
+
+_DOT = _dot_offsets(3)
+
+
+def draw_tracks(img: np.ndarray, snap, sprites: LabelSprites, styles, names: Dict[int, str], draw_paths: bool = True,
+                max_points: int = 10, scale: float = 1.0):
+    """
+    Gambar semua track snapshot secara batch per grup warna (counted / active):
+    satu cv2.polylines untuk semua box, satu untuk semua path, satu stamp numpy untuk semua
+    titik tengah; label dari cache sprite. scale: koordinat frame -> img (mis. resolusi tampilan).
+    styles: {counted(bool): (box_color, dot_color, path_color, prefix)}; names: class id -> nama.
+    """
+    n = len(snap)
+    if n == 0:
+        return
+    H, W = img.shape[:2]
+    b = snap.boxes * scale if scale != 1.0 else snap.boxes
+    b = np.clip(b, 0, [W - 1, H - 1, W - 1, H - 1]).astype(np.int32)
+    x1 = np.minimum(b[:, 0], b[:, 2]); x2 = np.maximum(b[:, 0], b[:, 2])
+    y1 = np.minimum(b[:, 1], b[:, 3]); y2 = np.maximum(b[:, 1], b[:, 3])
+    corners = np.stack([np.stack([x1, y1], 1), np.stack([x2, y1], 1),
+                        np.stack([x2, y2], 1), np.stack([x1, y2], 1)], axis=1)
+    cx = (x1 + x2) // 2; cy = (y1 + y2) // 2
+    counted = snap.counted.astype(bool)
+    for flag, (box_color, dot_color, path_color, prefix) in styles.items():
+        sel = np.flatnonzero(counted == flag)
+        if sel.size == 0:
+            continue
+        cv2.polylines(img, list(corners[sel]), True, box_color, 2)
+        if draw_paths:
+            paths = []
+            for i in sel.tolist():
+                p = snap.path(i, max_points + 1)
+                if p.shape[0] >= 2:
+                    paths.append((p * scale).astype(np.int32) if scale != 1.0 else p)
+            if paths:
+                cv2.polylines(img, paths, False, path_color, 2)
+        ys = (cy[sel, None] + _DOT[0]).ravel(); xs = (cx[sel, None] + _DOT[1]).ravel()
+        ok = (ys >= 0) & (ys < H) & (xs >= 0) & (xs < W)
+        img[ys[ok], xs[ok]] = dot_color
+        ids = snap.ids[sel].tolist(); cls = snap.classes[sel].tolist(); conf = snap.confidences[sel].tolist()
+        lx = x1[sel].tolist(); ly = y1[sel].tolist()
+        for k in range(sel.size):
+            label = f"{prefix} ID:{ids[k]} {names.get(cls[k], 'unknown')} "
+            sprites.draw(img, lx[k], ly[k], (label, f"{conf[k]:.2f}"), box_color, (255, 255, 255))
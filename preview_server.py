@@ -0,0 +1,236 @@
+"""
+Preview LAN opsional (stdlib http.server): stream MJPEG + endpoint JSON hitungan.
+
+- Capture thread hanya memanggil submit(frame, tracks): simpan referensi frame terbaru (O(1), tanpa copy
+  dan tanpa encode).
+- Satu thread encoder: resize ke preview_width, gambar overlay (opsional), JPEG encode paling banyak
+  sekali per frame pada preview_fps, dan hanya bila ada klien. Hasil encode dibagi ke semua klien.
+- Tiap klien dilayani thread sendiri dan selalu mengambil JPEG terbaru; klien lambat otomatis
+  mendapat fps lebih rendah (frame di antaranya dilewati) tanpa menahan encoder atau pipeline.
+
+Endpoint: /  (halaman viewer), /stream.mjpg, /snapshot.jpg, /counts.json, /stats.json
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional
+
+import cv2
+import numpy as np
+
+BOUNDARY = "frame"
+
+PAGE = """<!doctype html>
+<html><head><meta charset="utf-8"><title>Smart Traffic Counter - Live</title>
+<style>body{background:#1e1e1e;color:#fff;font-family:Arial;margin:16px}img{max-width:100%;border:1px solid #444}
+pre{background:#2d2d2d;padding:8px}</style></head>
+<body><h3>Smart Traffic Counter - Live Preview</h3><img src="/stream.mjpg"><pre id="c">...</pre>
+<script>
+async function poll(){try{const r=await fetch('/counts.json');const j=await r.json();
+document.getElementById('c').textContent='UP '+j.total_up+'  DOWN '+j.total_down+'\\n'+JSON.stringify({up:j.up,down:j.down});}catch(e){}
+setTimeout(poll,1000);}poll();
+</script></body></html>
+"""
+
+
+class PreviewServer:
+    def __init__(self, host: str = "0.0.0.0", port: int = 8080, fps: float = 5.0, width: int = 640,
+                 quality: int = 70, counts_fn: Optional[Callable[[], Dict[str, Any]]] = None,
+                 overlay_fn: Optional[Callable[[np.ndarray, Any, float], None]] = None):
+        self.host = host
+        self.port = int(port)
+        self.fps = max(0.5, float(fps))
+        self.width = int(width)
+        self.quality = int(quality)
+        self.counts_fn = counts_fn
+        self.overlay_fn = overlay_fn
+
+        self._in_lock = threading.Lock()
+        self._in_frame = None
+        self._in_tracks = None
+        self._in_seq = 0
+        self._new_frame = threading.Event()
+
+        self._out = threading.Condition()
+        self._jpeg: Optional[bytes] = None
+        self._jpeg_seq = 0
+
+        self.clients = 0
+        self._clients_lock = threading.Lock()
+        self._snapshot_wanted = False
+        self.stats = {"submitted": 0, "encoded": 0, "sent": 0, "encode_ms": 0.0}
+        self._running = False
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._threads = []
+
+    # ===== sisi pipeline =====
+    def submit(self, frame: np.ndarray, tracks=None):
+        """Dipanggil capture thread: frame tidak boleh dimutasi lagi oleh pemanggil setelah submit."""
+        with self._in_lock:
+            self._in_frame = frame
+            self._in_tracks = tracks
+            self._in_seq += 1
+        self.stats["submitted"] += 1
+        self._new_frame.set()
+
+    # ===== encoder =====
+    def _encode_loop(self):
+        interval = 1.0 / self.fps
+        last_seq = 0
+        next_t = 0.0
+        while self._running:
+            if not self._new_frame.wait(0.5):
+                continue
+            if self.clients == 0 and not self._snapshot_wanted:
+                with self._in_lock:
+                    self._new_frame.clear()    # tidak ada penonton: tidak encode, tunggu klien/snapshot
+                continue
+            now = time.time()
+            if now < next_t:
+                time.sleep(next_t - now)
+            with self._in_lock:
+                frame, tracks, seq = self._in_frame, self._in_tracks, self._in_seq
+                self._new_frame.clear()
+            if frame is None or seq == last_seq:
+                continue
+            last_seq = seq
+            next_t = time.time() + interval
+            t0 = time.perf_counter()
+            try:
+                jpeg = self._encode(frame, tracks)
+            except Exception as e:
+                print(f"Preview encode error: {e}")
+                continue
+            ms = (time.perf_counter() - t0) * 1000.0
+            st = self.stats
+            st["encoded"] += 1
+            st["encode_ms"] = ms if st["encoded"] == 1 else st["encode_ms"] * 0.9 + ms * 0.1
+            with self._out:
+                self._jpeg = jpeg
+                self._jpeg_seq += 1
+                self._snapshot_wanted = False
+                self._out.notify_all()
+
+    def _encode(self, frame: np.ndarray, tracks) -> bytes:
+        h, w = frame.shape[:2]
+        scale = 1.0
+        img = frame
+        if self.width and w > self.width:
+            scale = self.width / w
+            img = cv2.resize(frame, (self.width, max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+        if tracks is not None and self.overlay_fn is not None:
+            if img is frame:
+                img = frame.copy()
+            self.overlay_fn(img, tracks, scale)
+        ok, buf = cv2.imencode(".jpg", img, [int(cv2.IMWRITE_JPEG_QUALITY), self.quality])
+        if not ok:
+            raise RuntimeError("imencode failed")
+        return buf.tobytes()
+
+    def latest_jpeg(self, after_seq: int, timeout: float):
+        """(seq, jpeg) lebih baru dari after_seq; (after_seq, None) bila timeout."""
+        with self._out:
+            if self._jpeg_seq <= after_seq:
+                self._out.wait(timeout)
+            if self._jpeg_seq <= after_seq or self._jpeg is None:
+                return after_seq, None
+            return self._jpeg_seq, self._jpeg
+
+    # ===== lifecycle =====
+    def start(self):
+        server = self
+
+        class Handler(_PreviewHandler):
+            preview = server
+
+        self._httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._httpd.daemon_threads = True
+        self._running = True
+        self._threads = [threading.Thread(target=self._encode_loop, daemon=True, name="preview-encoder"),
+                         threading.Thread(target=self._httpd.serve_forever, daemon=True, name="preview-http")]
+        for t in self._threads:
+            t.start()
+        print(f"Preview server: http://{self.host}:{self.port}/")
+
+    def stop(self):
+        self._running = False
+        self._new_frame.set()
+        with self._out:
+            self._out.notify_all()
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def _add_client(self, delta: int):
+        with self._clients_lock:
+            self.clients += delta
+        self._new_frame.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats, clients=self.clients, fps=self.fps, width=self.width)
+
+
+class _PreviewHandler(BaseHTTPRequestHandler):
+    preview: PreviewServer = None
+    timeout = 10          # socket timeout: klien mati dilepas
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _send(self, code: int, ctype: str, body: bytes):
+        self.send_response(code)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        p = self.preview
+        if path == "/":
+            self._send(200, "text/html; charset=utf-8", PAGE.encode("utf-8"))
+        elif path == "/counts.json":
+            counts = p.counts_fn() if p.counts_fn else {}
+            self._send(200, "application/json", json.dumps(counts).encode("utf-8"))
+        elif path == "/stats.json":
+            self._send(200, "application/json", json.dumps(p.get_stats()).encode("utf-8"))
+        elif path == "/snapshot.jpg":
+            p._snapshot_wanted = True
+            p._new_frame.set()
+            _, jpeg = p.latest_jpeg(p._jpeg_seq, 2.0)
+            jpeg = jpeg or p._jpeg               # capture berhenti: JPEG terakhir
+            if jpeg is None:
+                self._send(503, "text/plain", b"no frame")
+            else:
+                self._send(200, "image/jpeg", jpeg)
+        elif path == "/stream.mjpg":
+            self._stream()
+        else:
+            self._send(404, "text/plain", b"not found")
+
+    def _stream(self):
+        p = self.preview
+        self.send_response(200)
+        self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        p._add_client(1)
+        seq = 0
+        try:
+            while p._running:
+                seq, jpeg = p.latest_jpeg(seq, 1.0)
+                if jpeg is None:
+                    continue
+                self.wfile.write(f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(jpeg)}\r\n\r\n".encode("ascii"))
+                self.wfile.write(jpeg)
+                self.wfile.write(b"\r\n")
+                with p._in_lock:              # banyak thread handler menambah counter yang sama
+                    p.stats["sent"] += 1
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            p._add_client(-1)
@@ -0,0 +1,192 @@
+from typing import Any, Dict, List, Tuple
+import time
+import numpy as np
+
+try:
+    import cv2
+except Exception:
+    cv2 = None
+
+from association import GATED_COST, solve_assignment
+
+# Descriptor: histogram 2D Hue x Saturation dari crop bbox, disimpan sebagai
+# sqrt(hist) ber-norma 1 sehingga kemiripan Bhattacharyya = dot product.
+H_BINS = 16
+S_BINS = 4
+DESC_DIM = H_BINS * S_BINS
+CROP_SIZE = 32          # crop diperkecil dulu agar biaya per box hampir konstan
+INNER_MARGIN = 0.15     # buang tepi bbox (latar jalan) sebelum histogram
+
+
+def hsv_descriptors(frame: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+    """(n,4) bbox xyxy -> (n, DESC_DIM) float32; baris nol bila crop kosong."""
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    out = np.zeros((boxes.shape[0], DESC_DIM), dtype=np.float32)
+    if cv2 is None or frame is None or boxes.shape[0] == 0:
+        return out
+    H, W = frame.shape[:2]
+    wh = boxes[:, 2:4] - boxes[:, 0:2]
+    inner = np.hstack([boxes[:, 0:2] + wh * INNER_MARGIN, boxes[:, 2:4] - wh * INNER_MARGIN])
+    inner = np.rint(inner).astype(np.int64)
+    inner[:, 0::2] = np.clip(inner[:, 0::2], 0, W)
+    inner[:, 1::2] = np.clip(inner[:, 1::2], 0, H)
+    for i, (x1, y1, x2, y2) in enumerate(inner.tolist()):
+        if x2 - x1 < 2 or y2 - y1 < 2:
+            continue
+        crop = cv2.resize(frame[y1:y2, x1:x2], (CROP_SIZE, CROP_SIZE), interpolation=cv2.INTER_AREA)
+        hsv = cv2.cvtColor(crop, cv2.COLOR_BGR2HSV)
+        hist = cv2.calcHist([hsv], [0, 1], None, [H_BINS, S_BINS], [0, 180, 0, 256]).ravel()
+        total = float(hist.sum())
+        if total > 0:
+            out[i] = np.sqrt(hist / total)
+    return out
+
+
+def blend_descriptors(old: np.ndarray, new: np.ndarray, weight: float) -> np.ndarray:
+    """EMA descriptor (n,D); hasil dinormalisasi ulang ke norma 1."""
+    d = (1.0 - weight) * old + weight * new
+    n = np.linalg.norm(d, axis=1, keepdims=True)
+    return (d / np.where(n > 0, n, 1.0)).astype(np.float32)
+
+
+class LostGallery:
+    """
+    Galeri terbatas track yang baru hilang (struct-of-arrays, kapasitas tetap).
+    Entri kedaluwarsa setelah max_age frame; bila penuh, entri tertua dibuang.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.capacity = max(1, int(capacity))
+        n = self.capacity
+        self.active = np.zeros(n, dtype=bool)
+        self.ids = np.full(n, -1, dtype=np.int64)
+        self.desc = np.zeros((n, DESC_DIM), dtype=np.float32)
+        self.points = np.zeros((n, 2), dtype=np.float64)       # titik path terakhir (untuk menyambung path)
+        self.times = np.zeros(n, dtype=np.float64)             # timestamp titik terakhir
+        self.origins = np.zeros((n, 2), dtype=np.float64)      # posisi prediksi saat masuk galeri
+        self.velocity = np.zeros((n, 2), dtype=np.float64)     # px/frame (Kalman)
+        self.classes = np.zeros(n, dtype=np.int32)
+        self.counted = np.zeros(n, dtype=bool)
+        self.lost_at = np.zeros(n, dtype=np.int64)             # nomor frame saat masuk galeri
+
+    def __len__(self):
+        return int(self.active.sum())
+
+    def clear(self):
+        self.active[:] = False
+        self.ids[:] = -1
+
+    def add(self, ids, desc, points, times, origins, velocity, classes, counted, frame_no: int) -> List[int]:
+        """Masukkan track hilang; return id yang terdesak keluar (galeri penuh)."""
+        evicted: List[int] = []
+        for k in range(len(ids)):
+            free = np.flatnonzero(~self.active)
+            if free.size:
+                g = int(free[0])
+            else:
+                g = int(np.argmin(self.lost_at))
+                evicted.append(int(self.ids[g]))
+            self.active[g] = True
+            self.ids[g] = ids[k]
+            self.desc[g] = desc[k]
+            self.points[g] = points[k]
+            self.times[g] = times[k]
+            self.origins[g] = origins[k]
+            self.velocity[g] = velocity[k]
+            self.classes[g] = classes[k]
+            self.counted[g] = counted[k]
+            self.lost_at[g] = frame_no
+        return evicted
+
+    def expire(self, frame_no: int, max_age: int) -> List[int]:
+        old = np.flatnonzero(self.active & (frame_no - self.lost_at > max_age))
+        ids = self.ids[old].tolist()
+        self.active[old] = False
+        self.ids[old] = -1
+        return ids
+
+    def take(self, g: np.ndarray):
+        self.active[g] = False
+        self.ids[g] = -1
+
+    def match(self, desc: np.ndarray, centers: np.ndarray, frame_no: int,
+              min_similarity: float, max_distance: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Pasangkan descriptor deteksi baru ke entri galeri; return (gallery_idx, det_idx)."""
+        g = np.flatnonzero(self.active)
+        empty = np.zeros(0, dtype=np.intp)
+        if g.size == 0 or desc.shape[0] == 0:
+            return empty, empty
+        sim = self.desc[g] @ desc.T                                     # (G, n) koef. Bhattacharyya
+        gap = (frame_no - self.lost_at[g]).astype(np.float64)
+        pred = self.origins[g] + self.velocity[g] * gap[:, None]
+        diff = pred[:, None, :] - centers[None, :, :]
+        dist = np.sqrt((diff * diff).sum(axis=2))
+        cost = 1.0 - sim
+        cost[(sim < min_similarity) | (dist > max_distance)] = GATED_COST
+        cost[:, ~desc.any(axis=1)] = GATED_COST
+        rows, cols = solve_assignment(cost)
+        return g[rows], cols
+
+
+class AppearanceReID:
+    """
+    Re-identifikasi ringan: descriptor HSV per track, dihitung hanya pada frame
+    yang ada deteksinya, dengan batas biaya per frame (jumlah crop & milidetik).
+    """
+
+    def __init__(self, gallery_size: int = 64):
+        self.gallery = LostGallery(gallery_size)
+        self.stats: Dict[str, Any] = {
+            "frames": 0, "crops": 0, "skipped": 0, "relinked": 0,
+            "over_budget": 0, "last_ms": 0.0, "avg_ms": 0.0,
+        }
+        self._budget_left = 0
+        self._budget_s = 0.0
+        self._spent = 0.0
+
+    @property
+    def available(self) -> bool:
+        return cv2 is not None
+
+    def clear(self):
+        self.gallery.clear()
+
+    def begin_frame(self, max_crops: int, budget_ms: float):
+        self._budget_left = max(0, int(max_crops))
+        self._budget_s = max(0.0, float(budget_ms)) / 1000.0
+        self._spent = 0.0
+
+    def describe(self, frame: np.ndarray, boxes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Hitung descriptor selama budget frame ini masih ada (urutan = prioritas).
+        Return (index box yang dihitung, descriptor).
+        """
+        n = int(np.asarray(boxes).reshape(-1, 4).shape[0])
+        done: List[int] = []
+        rows: List[np.ndarray] = []
+        t0 = time.perf_counter()
+        for i in range(n):
+            if self._budget_left <= 0 or self._spent + time.perf_counter() - t0 >= self._budget_s:
+                self.stats["skipped"] += n - i
+                break
+            rows.append(hsv_descriptors(frame, boxes[i:i + 1])[0])
+            done.append(i)
+            self._budget_left -= 1
+        self._spent += time.perf_counter() - t0
+        self.stats["crops"] += len(done)
+        desc = np.array(rows, dtype=np.float32).reshape(-1, DESC_DIM)
+        return np.array(done, dtype=np.intp), desc
+
+    def end_frame(self):
+        ms = self._spent * 1000.0
+        st = self.stats
+        st["frames"] += 1
+        st["last_ms"] = ms
+        st["avg_ms"] = ms if st["frames"] == 1 else st["avg_ms"] * 0.95 + ms * 0.05
+        if self._spent > self._budget_s:
+            st["over_budget"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        out = dict(self.stats)
+        out["gallery"] = len(self.gallery)
+        return out
@@ -0,0 +1,138 @@
+"""
+Generator lalu lintas sintetis (stream deteksi + ground truth crossing) untuk benchmark tracker/counter.
+
+Kendaraan bergerak di lajur vertikal (setengah lajur turun, setengah naik) melewati
+garis hitung horizontal. Jumlah kendaraan di layar dijaga konstan: kendaraan yang
+keluar frame diganti kendaraan baru dari tepi. Deteksi diberi jitter bbox, dropout
+acak, dan hilang di area oklusi (mis. pohon/jembatan).
+"""
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+
+from config import CLASS_NAMES
+
+# (class id, peluang, lebar px, tinggi px)
+VEHICLE_MIX = [(2, 0.60, 60, 50), (3, 0.25, 26, 40), (5, 0.05, 90, 110), (7, 0.10, 80, 90)]
+
+
+class GroundTruthCrossing(NamedTuple):
+    frame: int
+    vehicle_id: int
+    direction: str      # "up" (y mengecil) / "down" (y membesar)
+    class_name: str
+
+
+class SyntheticScene:
+    """Hasil generate(): deteksi per frame (boxes, classes, conf, id kendaraan GT) + ground truth crossing."""
+
+    def __init__(self, width: int, height: int, line: List[Tuple[int, int]],
+                 frames: List[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]],
+                 crossings: List[GroundTruthCrossing], n_vehicles: int, timestamps: np.ndarray):
+        self.width = width
+        self.height = height
+        self.line = line
+        self.frames = frames
+        self.crossings = crossings
+        self.n_vehicles = n_vehicles
+        self.timestamps = timestamps
+
+    def __len__(self):
+        return len(self.frames)
+
+    def detections(self, f: int) -> List[Dict[str, Any]]:
+        """Format dict yang dipakai capture_loop -> update_tracking."""
+        boxes, classes, conf, _ = self.frames[f]
+        return [{"bbox": b, "class": c, "confidence": p}
+                for b, c, p in zip(boxes.tolist(), classes.tolist(), conf.tolist())]
+
+    def gt_counts(self, until_frame: Optional[int] = None) -> Dict[str, Any]:
+        counts = {"up": {n: 0 for n in ("car", "motorcycle", "bus", "truck")},
+                  "down": {n: 0 for n in ("car", "motorcycle", "bus", "truck")},
+                  "total_up": 0, "total_down": 0}
+        for c in self.crossings:
+            if until_frame is not None and c.frame > until_frame:
+                continue
+            counts[c.direction][c.class_name] += 1
+            counts["total_" + c.direction] += 1
+        return counts
+
+
+def generate(n_objects: int = 50, n_frames: int = 300, lanes: int = 8, speed: Tuple[float, float] = (4.0, 12.0),
+             jitter: float = 1.5, dropout: float = 0.03, occlusions: int = 1, occlusion_size: Tuple[int, int] = (160, 60),
+             low_conf_rate: float = 0.10, width: int = 1920, height: int = 1080, line_y: Optional[int] = None,
+             fps: float = 25.0, seed: int = 0) -> SyntheticScene:
+    """
+    n_objects: jumlah kendaraan simultan di layar. speed: px/frame (min, max).
+    jitter: std noise tepi bbox (px). dropout: peluang deteksi hilang per frame.
+    occlusions: jumlah area oklusi statis (deteksi di dalamnya hilang), ditempatkan dekat garis.
+    low_conf_rate: fraksi deteksi dengan confidence rendah (0.10..0.35).
+    """
+    rng = np.random.default_rng(seed)
+    line_y = height // 2 if line_y is None else int(line_y)
+    lanes = max(2, int(lanes))
+    lane_x = (np.arange(lanes) + 0.5) * width / lanes
+    lane_dir = np.where(np.arange(lanes) < lanes // 2, 1.0, -1.0)      # +1 turun, -1 naik
+
+    mix_cls = np.array([m[0] for m in VEHICLE_MIX])
+    mix_p = np.array([m[1] for m in VEHICLE_MIX])
+    mix_w = np.array([m[2] for m in VEHICLE_MIX], dtype=np.float64)
+    mix_h = np.array([m[3] for m in VEHICLE_MIX], dtype=np.float64)
+
+    occ = []
+    for _ in range(int(occlusions)):
+        ox = rng.uniform(0, width - occlusion_size[0])
+        oy = line_y + rng.uniform(-occlusion_size[1], occlusion_size[1] * 0.5)
+        occ.append((ox, oy, ox + occlusion_size[0], oy + occlusion_size[1]))
+    occ = np.array(occ, dtype=np.float64).reshape(-1, 4)
+
+    n = int(n_objects)
+    vid = np.arange(n)
+    next_vid = n
+    lane = rng.integers(0, lanes, n)
+    kind = rng.choice(len(VEHICLE_MIX), n, p=mix_p)
+    scale = rng.uniform(0.85, 1.2, n)
+    y = rng.uniform(0, height, n)
+    v = rng.uniform(speed[0], speed[1], n) * lane_dir[lane]
+    xoff = rng.normal(0, width / lanes * 0.12, n)
+
+    frames = []
+    crossings: List[GroundTruthCrossing] = []
+    for f in range(int(n_frames)):
+        if f:
+            y_prev = y.copy()
+            y = y + v
+            crossed = np.flatnonzero((y_prev - line_y) * (y - line_y) < 0)
+            for k in crossed.tolist():
+                crossings.append(GroundTruthCrossing(
+                    f, int(vid[k]), "down" if v[k] > 0 else "up", CLASS_NAMES[int(mix_cls[kind[k]])]))
+            # Kendaraan keluar frame -> diganti kendaraan baru dari tepi lajur acak
+            out = np.flatnonzero((y < -mix_h[kind]) | (y > height + mix_h[kind]))
+            if out.size:
+                m = out.size
+                lane[out] = rng.integers(0, lanes, m)
+                kind[out] = rng.choice(len(VEHICLE_MIX), m, p=mix_p)
+                scale[out] = rng.uniform(0.85, 1.2, m)
+                v[out] = rng.uniform(speed[0], speed[1], m) * lane_dir[lane[out]]
+                y[out] = np.where(v[out] > 0, -mix_h[kind[out]] * 0.5, height + mix_h[kind[out]] * 0.5)
+                xoff[out] = rng.normal(0, width / lanes * 0.12, m)
+                vid[out] = np.arange(next_vid, next_vid + m)
+                next_vid += m
+
+        cx = lane_x[lane] + xoff
+        w = mix_w[kind] * scale
+        h = mix_h[kind] * scale
+        boxes = np.stack([cx - w / 2, y - h / 2, cx + w / 2, y + h / 2], axis=1)
+        boxes = boxes + rng.normal(0, jitter, boxes.shape)
+        keep = (boxes[:, 2] > 0) & (boxes[:, 0] < width) & (boxes[:, 3] > 0) & (boxes[:, 1] < height)
+        keep &= rng.random(n) >= dropout
+        if occ.size:
+            inside = ((cx[:, None] >= occ[None, :, 0]) & (cx[:, None] <= occ[None, :, 2]) &
+                      (y[:, None] >= occ[None, :, 1]) & (y[:, None] <= occ[None, :, 3])).any(axis=1)
+            keep &= ~inside
+        boxes = np.clip(boxes, 0, [width - 1, height - 1, width - 1, height - 1])
+        conf = np.where(rng.random(n) < low_conf_rate, rng.uniform(0.10, 0.35, n), rng.uniform(0.45, 0.95, n))
+        idx = np.flatnonzero(keep & ((boxes[:, 2] - boxes[:, 0]) > 2) & ((boxes[:, 3] - boxes[:, 1]) > 2))
+        frames.append((boxes[idx].astype(np.int32), mix_cls[kind[idx]].astype(np.int32), conf[idx], vid[idx].copy()))
+
+    return SyntheticScene(width, height, [(0, line_y), (width, line_y)], frames, crossings,
+                          int(next_vid), np.arange(int(n_frames)) / float(fps))
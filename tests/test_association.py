@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from association import GATED_COST, greedy_assignment, solve_assignment
+
+
+def pairs(rows, cols):
+    return sorted(zip(rows.tolist(), cols.tolist()))
+
+
+@pytest.mark.parametrize("method", ["hungarian", "greedy"])
+def test_gated_pairs_never_match(method):
+    cost = np.array([[0.1, GATED_COST],
+                     [GATED_COST, GATED_COST],
+                     [GATED_COST, 0.4]])
+    assert pairs(*solve_assignment(cost, method)) == [(0, 0), (2, 1)]
+
+
+@pytest.mark.parametrize("method", ["hungarian", "greedy"])
+def test_empty_or_all_gated(method):
+    empty = solve_assignment(np.zeros((0, 3)), method)
+    gated = solve_assignment(np.full((2, 3), GATED_COST), method)
+    assert empty[0].size == 0 and empty[1].size == 0
+    assert gated[0].size == 0 and gated[1].size == 0
+
+
+def test_greedy_matches_hungarian_without_ties():
+    rng = np.random.default_rng(7)
+    for _ in range(50):
+        # Track & deteksi saling berjauhan: pasangan termurah per baris unik, tanpa cost kembar
+        n = int(rng.integers(1, 8))
+        cost = rng.uniform(0.5, 1.0, size=(n, n + 2))
+        cost[rng.uniform(size=cost.shape) > 0.8] = GATED_COST
+        cost[np.arange(n), rng.permutation(n + 2)[:n]] = rng.uniform(0.0, 0.1, size=n)
+        assert pairs(*greedy_assignment(cost)) == pairs(*solve_assignment(cost, "hungarian"))
@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from counting_engine import CountingEngine
+
+CAR = 2
+TRUCK = 7
+
+
+def run(engine, prev, last, tids=(1,), cls=(CAR,), prev_ts=None, last_ts=None):
+    return engine.process(np.array(tids), np.array(prev, dtype=np.float64), np.array(last, dtype=np.float64),
+                          np.array(cls), None if prev_ts is None else np.array(prev_ts),
+                          None if last_ts is None else np.array(last_ts))
+
+
+@pytest.fixture
+def engine():
+    e = CountingEngine()
+    e.add_line("gate", (100, 500), (900, 500))
+    return e
+
+
+def test_line_directions(engine):
+    up = run(engine, [[300, 520]], [[300, 480]], tids=(1,))
+    down = run(engine, [[400, 480]], [[400, 520]], tids=(2,))
+    assert [(ev.name, ev.direction) for ev in up] == [("gate", "up")]
+    assert [(ev.name, ev.direction) for ev in down] == [("gate", "down")]
+    c = engine.get_counts()["lines"]["gate"]
+    assert (c["total_up"], c["total_down"]) == (1, 1)
+
+
+def test_line_invert_direction():
+    e = CountingEngine()
+    e.add_line("gate", (100, 500), (900, 500), invert_direction=True)
+    assert run(e, [[300, 520]], [[300, 480]])[0].direction == "down"
+
+
+def test_direction_follows_line_orientation():
+    # Garis dibalik (p1 <-> p2) membalik arah, sama seperti garis utama
+    e = CountingEngine()
+    e.add_line("gate", (900, 500), (100, 500))
+    assert run(e, [[300, 520]], [[300, 480]])[0].direction == "down"
+
+
+def test_long_jump_counted_without_band(engine):
+    events = run(engine, [[500, 900]], [[500, 100]])
+    assert len(events) == 1 and events[0].direction == "up"
+    assert events[0].y == pytest.approx(500.0)
+
+
+def test_counted_once_per_line(engine):
+    run(engine, [[300, 520]], [[300, 480]])
+    assert run(engine, [[300, 480]], [[300, 520]]) == []
+    assert engine.get_counts()["lines"]["gate"]["total_up"] == 1
+
+
+def test_multiple_lines_same_segment(engine):
+    engine.add_line("second", (100, 450), (900, 450))
+    events = run(engine, [[300, 520]], [[300, 420]])
+    assert sorted(ev.name for ev in events) == ["gate", "second"]
+
+
+def test_segment_endpoints(engine):
+    # Berawal tepat di garis: tidak dihitung (t > 0); berakhir tepat di garis: dihitung
+    assert run(engine, [[300, 500]], [[300, 480]], tids=(1,)) == []
+    assert len(run(engine, [[300, 520]], [[300, 500]], tids=(2,))) == 1
+
+
+def test_line_extent(engine):
+    assert len(run(engine, [[100, 520]], [[100, 480]], tids=(1,))) == 1      # tepat di ujung garis (u = 0)
+    assert run(engine, [[99, 520]], [[99, 480]], tids=(2,)) == []            # di luar segmen garis
+    assert run(engine, [[901, 520]], [[901, 480]], tids=(3,)) == []
+
+
+def test_interpolated_timestamp_and_position(engine):
+    ev = run(engine, [[200, 540]], [[400, 490]], prev_ts=[10.0], last_ts=[11.0])[0]
+    assert ev.timestamp == pytest.approx(10.8)
+    assert (ev.x, ev.y) == (pytest.approx(360.0), pytest.approx(500.0))
+
+
+def test_voted_class_column():
+    e = CountingEngine()
+    e.add_line("gate", (100, 500), (900, 500))
+    ev = run(e, [[300, 520]], [[300, 480]], cls=(TRUCK,))[0]
+    assert ev.class_name == "truck"
+    assert e.get_counts()["lines"]["gate"]["up"]["truck"] == 1
+
+
+def test_zone_enter_exit():
+    e = CountingEngine()
+    e.add_zone("box", [(100, 100), (300, 100), (300, 300), (100, 300)])
+    enter = run(e, [[50, 200]], [[150, 200]], tids=(1,), last_ts=[5.0])
+    stay = run(e, [[150, 200]], [[200, 200]], tids=(1,))
+    leave = run(e, [[200, 200]], [[200, 350]], tids=(1,))
+    assert [ev.direction for ev in enter] == ["entered"] and enter[0].timestamp == 5.0
+    assert stay == []
+    assert [ev.direction for ev in leave] == ["exited"]
+    z = e.get_counts()["zones"]["box"]
+    assert (z["total_entered"], z["total_exited"]) == (1, 1)
+
+
+def test_zone_concave_polygon():
+    # Bentuk L: titik di "lekukan" berada di luar zona
+    e = CountingEngine()
+    e.add_zone("L", [(0, 0), (200, 0), (200, 100), (100, 100), (100, 200), (0, 200)])
+    assert run(e, [[300, 150]], [[150, 150]], tids=(1,)) == []
+    assert [ev.direction for ev in run(e, [[150, 150]], [[50, 150]], tids=(1,))] == ["entered"]
+
+
+def test_zone_needs_three_points():
+    with pytest.raises(ValueError):
+        CountingEngine().add_zone("bad", [(0, 0), (1, 1)])
@@ -0,0 +1,82 @@
+import pytest
+
+from config import TRACKING_CONFIG
+from vehicle_tracker import VehicleTracker
+
+LINE = [(200, 360), (1200, 360)]
+
+
+@pytest.fixture
+def tracker(monkeypatch):
+    # Model linear: bbox track = bbox deteksi, posisi path persis sama dengan input
+    monkeypatch.setitem(TRACKING_CONFIG, "motion_model", "linear")
+    monkeypatch.setitem(TRACKING_CONFIG, "predict_missing", False)
+    t = VehicleTracker()
+    t.counting_engine.clear()
+    return t
+
+
+def det(cx, cy, cls=2, conf=0.9):
+    return {"bbox": [cx - 20, cy - 20, cx + 20, cy + 20], "class": cls, "confidence": conf}
+
+
+def drive(tracker, points, ts0=0.0, dt=1.0, settings=None, line=LINE):
+    events = []
+    for k, (x, y) in enumerate(points):
+        tracker.update_tracking([det(x, y)], timestamp=ts0 + k * dt)
+        if tracker.check_line_crossings_directional(line, settings or {}):
+            events.extend(tracker.crossing_events)
+    return events
+
+
+def test_crossing_up_and_down(tracker):
+    up = drive(tracker, [(400, 400), (400, 380), (400, 340)])
+    down = drive(tracker, [(800, 320), (800, 345), (800, 375)], ts0=10.0)
+    assert [e.direction for e in up] == ["up"]
+    assert [e.direction for e in down] == ["down"]
+    assert (tracker.counts["total_up"], tracker.counts["total_down"]) == (1, 1)
+
+
+def test_invert_direction(tracker):
+    events = drive(tracker, [(400, 400), (400, 340)], settings={"invert_direction": True})
+    assert [e.direction for e in events] == ["down"]
+
+
+def test_long_jump_without_band(tracker):
+    # Lompatan 70 px melewati garis (jauh di luar band_px) tetap dihitung
+    events = drive(tracker, [(500, 395), (500, 325)], settings={"band_px": 12})
+    assert len(events) == 1 and events[0].direction == "up"
+
+
+def test_counted_once(tracker):
+    events = drive(tracker, [(400, 400), (400, 340), (400, 380), (400, 330)])
+    assert len(events) == 1
+    assert tracker.counts["total_up"] == 1
+
+
+def test_interpolated_timestamp_and_point(tracker):
+    ev = drive(tracker, [(400, 400), (430, 340)], ts0=100.0)[0]
+    # d_prev = 40, d_now = -20 -> potong di 2/3 segmen
+    assert ev.timestamp == pytest.approx(100.0 + 2.0 / 3.0)
+    assert (ev.x, ev.y) == (pytest.approx(420.0), pytest.approx(360.0))
+
+
+@pytest.mark.parametrize("x, counted", [
+    (105, True),     # t_line = -0.095
+    (95, False),     # t_line = -0.105
+    (1295, True),    # t_line = 1.095
+    (1305, False),   # t_line = 1.105
+])
+def test_line_end_tolerance(tracker, x, counted):
+    events = drive(tracker, [(x, 400), (x, 340)])
+    assert bool(events) is counted
+
+
+def test_landing_exactly_on_line(tracker):
+    events = drive(tracker, [(400, 400), (400, 360)])
+    assert len(events) == 1
+
+
+def test_no_line_no_count(tracker):
+    assert drive(tracker, [(400, 400), (400, 340)], line=None) == []
+    assert tracker.counts["total_up"] == 0
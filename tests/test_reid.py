@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("cv2")
+
+from config import TRACKING_CONFIG  # noqa: E402
+from reid import AppearanceReID, hsv_descriptors  # noqa: E402
+from vehicle_tracker import VehicleTracker  # noqa: E402
+
+RED = (0, 0, 220)
+BLUE = (220, 60, 0)
+
+
+def scene(boxes_colors):
+    frame = np.full((480, 640, 3), 90, dtype=np.uint8)
+    for (x1, y1, x2, y2), color in boxes_colors:
+        frame[y1:y2, x1:x2] = color
+    return frame
+
+
+def det(box, conf=0.9):
+    return {"bbox": list(box), "class": 2, "confidence": conf}
+
+
+@pytest.fixture
+def tracker(monkeypatch):
+    monkeypatch.setitem(TRACKING_CONFIG, "reid", True)
+    monkeypatch.setitem(TRACKING_CONFIG, "motion_model", "linear")
+    monkeypatch.setitem(TRACKING_CONFIG, "max_track_lost_frames", 3)
+    monkeypatch.setitem(TRACKING_CONFIG, "reid_budget_ms", 1000.0)
+    return VehicleTracker()
+
+
+def test_lost_track_relinked(tracker):
+    red, blue = (100, 100, 160, 150), (400, 100, 460, 150)
+    frame = scene([(red, RED), (blue, BLUE)])
+    tracker.update_tracking([det(red), det(blue)], timestamp=0.0, frame=frame)
+    ids = tracker.snapshot().ids.tolist()
+    # Merah hilang lebih lama dari max_track_lost_frames -> masuk galeri
+    for k in range(1, 6):
+        tracker.update_tracking([det(blue)], timestamp=float(k), frame=scene([(blue, BLUE)]))
+    assert tracker.snapshot().ids.tolist() == [ids[1]] and len(tracker.reid.gallery) == 1
+    # Muncul lagi sedikit bergeser dengan warna sama -> id lama dipakai lagi
+    red2 = (130, 110, 190, 160)
+    tracker.update_tracking([det(red2), det(blue)], timestamp=6.0, frame=scene([(red2, RED), (blue, BLUE)]))
+    assert sorted(tracker.snapshot().ids.tolist()) == sorted(ids)
+    assert tracker.reid.stats["relinked"] == 1 and len(tracker.reid.gallery) == 0
+
+
+def test_different_appearance_not_relinked(tracker):
+    red = (100, 100, 160, 150)
+    tracker.update_tracking([det(red)], timestamp=0.0, frame=scene([(red, RED)]))
+    for k in range(1, 6):
+        tracker.update_tracking([], timestamp=float(k), frame=scene([]))
+    tracker.update_tracking([det(red)], timestamp=6.0, frame=scene([(red, BLUE)]))
+    assert tracker.snapshot().ids.tolist() == [2]
+    assert tracker.reid.stats["relinked"] == 0
+
+
+def test_describe_crop_budget():
+    reid = AppearanceReID()
+    boxes = np.array([[10 + 40 * i, 10, 40 + 40 * i, 40] for i in range(5)], dtype=np.float64)
+    frame = scene([])
+    reid.begin_frame(max_crops=2, budget_ms=1000.0)
+    done, desc = reid.describe(frame, boxes)
+    assert done.tolist() == [0, 1] and desc.shape == (2, hsv_descriptors(frame, boxes[:1]).shape[1])
+    # Budget crop sudah habis: panggilan berikutnya di frame yang sama tidak menghitung apa pun
+    done, desc = reid.describe(frame, boxes)
+    assert done.size == 0 and desc.shape[0] == 0
+    assert reid.stats["crops"] == 2 and reid.stats["skipped"] == 8
+
+
+def test_describe_time_budget():
+    reid = AppearanceReID()
+    reid.begin_frame(max_crops=16, budget_ms=0.0)
+    done, _ = reid.describe(scene([]), np.array([[10, 10, 40, 40]], dtype=np.float64))
+    assert done.size == 0 and reid.stats["skipped"] == 1
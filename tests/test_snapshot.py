@@ -0,0 +1,33 @@
+import pytest
+
+from vehicle_tracker import VehicleTracker
+
+
+def det(cx, cy, cls=2, conf=0.9):
+    return {"bbox": [cx - 20, cy - 20, cx + 20, cy + 20], "class": cls, "confidence": conf}
+
+
+@pytest.fixture
+def tracker():
+    t = VehicleTracker()
+    t.update_tracking([det(400, 400), det(800, 300)], timestamp=0.0)
+    return t
+
+
+def test_snapshot_arrays_read_only(tracker):
+    snap = tracker.snapshot()
+    with pytest.raises(ValueError):
+        snap.boxes[0, 0] = 0
+    with pytest.raises(ValueError):
+        snap.paths[0, 0] = (1, 1)
+
+
+def test_snapshot_cached_per_version(tracker):
+    snap = tracker.snapshot()
+    assert tracker.snapshot() is snap
+    tracker.update_tracking([det(405, 395), det(805, 295)], timestamp=1.0)
+    snap2 = tracker.snapshot()
+    assert snap2 is not snap and snap2.version == snap.version + 1
+    assert tracker.snapshot() is snap2
+    # Snapshot lama tidak ikut berubah
+    assert snap.path_count.tolist() == [1, 1] and snap2.path_count.tolist() == [2, 2]
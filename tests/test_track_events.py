@@ -0,0 +1,60 @@
+import pytest
+
+from config import TRACKING_CONFIG
+from track_events import LINE_CROSSED, TRACK_CREATED, EventBus, TrackEvent
+from vehicle_tracker import VehicleTracker
+
+
+def event(tid, etype=TRACK_CREATED):
+    return TrackEvent(etype, tid, 0.0, "car", 0.9, (0, 0, 10, 10))
+
+
+def test_full_subscription_counts_dropped():
+    bus = EventBus()
+    sub = bus.subscribe(maxlen=3)
+    bus.publish([event(k) for k in range(5)])
+    assert sub.dropped == 2 and sub.delivered == 5
+    assert [ev.track_id for ev in sub.drain()] == [2, 3, 4]
+    assert bus.stats()[0]["dropped"] == 2
+
+
+def test_wants_follows_subscribers():
+    bus = EventBus()
+    assert not bus.wants(LINE_CROSSED)
+    sub = bus.subscribe(types=(TRACK_CREATED,))
+    assert bus.wants(TRACK_CREATED) and not bus.wants(LINE_CROSSED)
+    sub.close()
+    assert not bus and not bus.wants(TRACK_CREATED)
+    bus.publish([event(1)])
+    assert sub.drain() == []
+
+
+def test_subscription_filters_types():
+    bus = EventBus()
+    sub = bus.subscribe(types=(LINE_CROSSED,))
+    bus.publish([event(1), event(2, LINE_CROSSED)])
+    assert [ev.track_id for ev in sub.drain()] == [2]
+
+
+@pytest.fixture
+def tracker(monkeypatch):
+    monkeypatch.setitem(TRACKING_CONFIG, "motion_model", "linear")
+    t = VehicleTracker()
+    t.counting_engine.clear()
+    return t
+
+
+def test_tracker_publishes_line_crossed(tracker):
+    line = [(200, 360), (1200, 360)]
+    sub = tracker.events.subscribe(types=(LINE_CROSSED,))
+    for k, y in enumerate((400, 340)):
+        tracker.update_tracking([{"bbox": [380, y - 20, 420, y + 20], "class": 7, "confidence": 0.8}], timestamp=float(k))
+        tracker.check_line_crossings_directional(line, {})
+    events = sub.drain()
+    assert [(ev.line, ev.direction, ev.class_name) for ev in events] == [("main", "up", "truck")]
+    assert events[0].bbox == (380, 320, 420, 360)
+
+
+def test_tracker_without_subscribers_builds_no_events(tracker):
+    tracker.update_tracking([{"bbox": [0, 0, 40, 40], "class": 2, "confidence": 0.9}], timestamp=0.0)
+    assert tracker.events.published == 0
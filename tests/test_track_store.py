@@ -0,0 +1,40 @@
+import numpy as np
+
+from track_store import TrackStore
+
+
+def test_slot_reuse_starts_clean():
+    st = TrackStore(capacity=4, path_len=8)
+    s = st.add(1, [0, 0, 10, 10], 7, 0.9)
+    st.push_points([s], np.array([[5, 5]]))
+    st.vote([s], np.array([3]), np.array([0.9]))
+    st.remove([s])
+    s2 = st.add(2, [20, 20, 30, 30], 2, 0.8)
+    assert s2 == s
+    assert st.path(s2) == [] and st.class_votes[s2].sum() == 0
+    assert st.slot_of(1) == -1 and st.slot_of(2) == s2
+    assert int(st.voted_classes([s2])[0]) == 2
+
+
+def test_grow_keeps_tracks():
+    st = TrackStore(capacity=2, path_len=4)
+    slots = [st.add(tid, [tid, tid, tid + 10, tid + 10], 2, 0.5) for tid in range(1, 4)]
+    for s in slots[:2]:
+        st.push_points([s], np.array([[s, s]]))
+    s4 = st.add(4, [0, 0, 1, 1], 3, 0.5)
+    assert st.capacity >= 4 and len(st) == 4
+    assert [st.slot_of(t) for t in range(1, 5)] == slots + [s4]
+    assert st.boxes[slots[0]].tolist() == [1, 1, 11, 11]
+    assert st.path(slots[1]) == [(slots[1], slots[1])]
+
+
+def test_last_points_after_wrap():
+    st = TrackStore(capacity=1, path_len=4)
+    s = st.add(1, [0, 0, 1, 1], 2, 0.5)
+    for k in range(10):
+        st.push_points([s], np.array([[k, 100 + k]]), ts=float(k))
+    assert st.path_count[s] == 4
+    assert st.last_points([s], 1).tolist() == [[9, 109]]
+    assert st.last_points([s], 4).tolist() == [[6, 106]]
+    assert st.last_times([s], 2).tolist() == [8.0]
+    assert st.path(s) == [(6, 106), (7, 107), (8, 108), (9, 109)]
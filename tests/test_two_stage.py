@@ -0,0 +1,37 @@
+import pytest
+
+from config import TRACKING_CONFIG
+from vehicle_tracker import VehicleTracker
+
+
+@pytest.fixture
+def tracker(monkeypatch):
+    monkeypatch.setitem(TRACKING_CONFIG, "two_stage_association", True)
+    monkeypatch.setitem(TRACKING_CONFIG, "reid", False)
+    return VehicleTracker()
+
+
+def det(cx, cy, conf, cls=2):
+    return {"bbox": [cx - 20, cy - 20, cx + 20, cy + 20], "class": cls, "confidence": conf}
+
+
+def test_low_confidence_never_creates_track(tracker):
+    tracker.update_tracking([det(400, 400, 0.2)], high_conf=0.5, timestamp=0.0)
+    assert len(tracker.snapshot()) == 0
+
+
+def test_low_confidence_keeps_existing_track(tracker):
+    tracker.update_tracking([det(400, 400, 0.9)], high_conf=0.5, timestamp=0.0)
+    tid = int(tracker.snapshot().ids[0])
+    # Deteksi low-confidence yang tumpang tindih (IoU tinggi) menyambung track yang sama
+    tracker.update_tracking([det(404, 402, 0.2)], high_conf=0.5, timestamp=1.0)
+    snap = tracker.snapshot()
+    assert snap.ids.tolist() == [tid]
+    assert int(snap.missed[0]) == 0 and bool(snap.updated[0])
+
+
+def test_low_confidence_ignored_when_disabled(tracker, monkeypatch):
+    monkeypatch.setitem(TRACKING_CONFIG, "two_stage_association", False)
+    tracker.update_tracking([det(400, 400, 0.9)], high_conf=0.5, timestamp=0.0)
+    tracker.update_tracking([det(404, 402, 0.2)], high_conf=0.5, timestamp=1.0)
+    assert int(tracker.snapshot().missed[0]) == 1
@@ -0,0 +1,118 @@
+from collections import deque
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+import threading
+
+TRACK_CREATED = "track_created"
+TRACK_UPDATED = "track_updated"
+LINE_CROSSED = "line_crossed"
+TRACK_LOST = "track_lost"
+EVENT_TYPES = (TRACK_CREATED, TRACK_UPDATED, LINE_CROSSED, TRACK_LOST)
+
+
+class TrackEvent(NamedTuple):
+    type: str                       # salah satu EVENT_TYPES
+    track_id: int
+    timestamp: float                # epoch detik (crossing: hasil interpolasi)
+    class_name: str
+    confidence: float
+    bbox: Tuple[int, int, int, int]
+    line: str = ""                  # line_crossed: nama garis/zona ("main" = garis utama)
+    direction: str = ""             # line_crossed: up/down atau entered/exited (zona)
+
+
+class Subscription:
+    """
+    Antrian event milik satu subscriber, dibatasi maxlen (deque).
+    Bila subscriber terlambat, event tertua dibuang dan dihitung di `dropped`;
+    publisher tidak pernah menunggu subscriber.
+    """
+
+    def __init__(self, bus: "EventBus", maxlen: int, types: Optional[Sequence[str]]):
+        self._bus = bus
+        self._queue = deque(maxlen=max(1, int(maxlen)))
+        self._signal = threading.Event()
+        self.types = frozenset(types) if types else frozenset(EVENT_TYPES)
+        self.dropped = 0
+        self.delivered = 0
+        self.closed = False
+
+    def __len__(self):
+        return len(self._queue)
+
+    def _push(self, events: List[TrackEvent]):
+        q = self._queue
+        for ev in events:
+            if ev.type in self.types:
+                if len(q) == q.maxlen:
+                    self.dropped += 1
+                q.append(ev)
+                self.delivered += 1
+        self._signal.set()
+
+    def drain(self, max_items: int = 0) -> List[TrackEvent]:
+        """Ambil event yang tertunda (non-blocking)."""
+        q = self._queue
+        n = len(q) if max_items <= 0 else min(max_items, len(q))
+        out = []
+        for _ in range(n):
+            try:
+                out.append(q.popleft())
+            except IndexError:
+                break
+        if not q:
+            self._signal.clear()
+        return out
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._signal.wait(timeout)
+
+    def events(self, timeout: float = 0.5) -> Iterator[TrackEvent]:
+        """Generator blocking: yield event sampai close() dipanggil."""
+        while not self.closed:
+            if self.wait(timeout):
+                for ev in self.drain():
+                    yield ev
+        for ev in self.drain():
+            yield ev
+
+    def close(self):
+        self.closed = True
+        self._bus.unsubscribe(self)
+        self._signal.set()
+
+
+class EventBus:
+    """Fan-out event tracker ke banyak subscriber; publish tidak pernah blocking."""
+
+    def __init__(self):
+        self._subs: Tuple[Subscription, ...] = ()
+        self._lock = threading.Lock()     # hanya untuk subscribe/unsubscribe
+        self.published = 0
+
+    def __bool__(self):
+        return bool(self._subs)
+
+    def subscribe(self, maxlen: int = 1024, types: Optional[Sequence[str]] = None) -> Subscription:
+        sub = Subscription(self, maxlen, types)
+        with self._lock:
+            self._subs = self._subs + (sub,)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            self._subs = tuple(s for s in self._subs if s is not sub)
+
+    def wants(self, event_type: str) -> bool:
+        return any(event_type in s.types for s in self._subs)
+
+    def publish(self, events: Iterable[TrackEvent]):
+        events = list(events)
+        if not events:
+            return
+        self.published += len(events)
+        for sub in self._subs:          # tuple immutable: aman tanpa lock
+            sub._push(events)
+
+    def stats(self) -> List[dict]:
+        return [{"types": sorted(s.types), "pending": len(s), "delivered": s.delivered,
+                 "dropped": s.dropped} for s in self._subs]
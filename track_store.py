@@ -0,0 +1,240 @@
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+# Kelas dianggap stabil bila porsi vote teratas >= SHARE dan total bobot (jumlah confidence) >= WEIGHT
+CLASS_STABLE_SHARE = 0.8
+CLASS_STABLE_WEIGHT = 2.0
+
+
+class TrackStore:
+    """
+    Penyimpanan track struct-of-arrays.
+    Setiap track menempati satu "slot" pada array prealokasi; slot yang dilepas
+    dipakai ulang lewat free-list. Jejak (path) disimpan sebagai ring buffer
+    per slot di satu array (capacity, path_len, 2).
+    """
+    __slots__ = (
+        "capacity", "path_len", "ids", "active", "boxes", "classes", "confidences",
+        "ages", "missed", "counted", "updated", "moved", "paths", "path_ts", "path_head", "path_count",
+        "kf_mean", "kf_cov", "appearance", "appearance_frame", "class_votes", "class_ids",
+        "_free", "_slot_of",
+    )
+
+    def __init__(self, capacity: int = 64, path_len: int = 64, desc_dim: int = 64,
+                 class_ids: Optional[np.ndarray] = None):
+        self.capacity = 0
+        self.path_len = int(path_len)
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.active = np.zeros(0, dtype=bool)
+        self.boxes = np.zeros((0, 4), dtype=np.float64)
+        self.classes = np.zeros(0, dtype=np.int32)
+        self.confidences = np.zeros(0, dtype=np.float64)
+        self.ages = np.zeros(0, dtype=np.int32)
+        self.missed = np.zeros(0, dtype=np.int32)
+        self.counted = np.zeros(0, dtype=bool)
+        self.updated = np.zeros(0, dtype=bool)
+        self.moved = np.zeros(0, dtype=bool)     # ada titik path baru sejak evaluasi crossing terakhir
+        self.paths = np.zeros((0, self.path_len, 2), dtype=np.int32)
+        self.path_ts = np.zeros((0, self.path_len), dtype=np.float64)   # timestamp tiap titik path
+        self.path_head = np.zeros(0, dtype=np.int32)    # index tulis berikutnya
+        self.path_count = np.zeros(0, dtype=np.int32)   # jumlah titik valid (<= path_len)
+        self.kf_mean = np.zeros((0, 8), dtype=np.float64)   # state Kalman [cx,cy,w,h,vcx,vcy,vw,vh]
+        self.kf_cov = np.zeros((0, 8, 8), dtype=np.float64)
+        self.appearance = np.zeros((0, int(desc_dim)), dtype=np.float32)   # descriptor re-ID
+        self.appearance_frame = np.zeros(0, dtype=np.int64)              # frame descriptor terakhir (-1 = belum ada)
+        # Histogram kelas per track (bobot = confidence); kolom k = class id class_ids[k]
+        self.class_ids = np.array([2, 3, 5, 7] if class_ids is None else class_ids, dtype=np.int32)
+        self.class_votes = np.zeros((0, len(self.class_ids)), dtype=np.float32)
+        self._free: List[int] = []
+        self._slot_of = {}
+        self._grow(max(1, int(capacity)))
+
+    def __len__(self):
+        return len(self._slot_of)
+
+    def _grow(self, new_cap: int):
+        old = self.capacity
+        extra = new_cap - old
+
+        def ext(a, fill=0):
+            pad = np.full((extra,) + a.shape[1:], fill, dtype=a.dtype)
+            return np.concatenate([a, pad])
+
+        self.ids = ext(self.ids, -1)
+        self.active = ext(self.active)
+        self.boxes = ext(self.boxes)
+        self.classes = ext(self.classes)
+        self.confidences = ext(self.confidences)
+        self.ages = ext(self.ages)
+        self.missed = ext(self.missed)
+        self.counted = ext(self.counted)
+        self.updated = ext(self.updated)
+        self.moved = ext(self.moved)
+        self.paths = ext(self.paths)
+        self.path_ts = ext(self.path_ts)
+        self.path_head = ext(self.path_head)
+        self.path_count = ext(self.path_count)
+        self.kf_mean = ext(self.kf_mean)
+        self.kf_cov = ext(self.kf_cov)
+        self.appearance = ext(self.appearance)
+        self.appearance_frame = ext(self.appearance_frame, -1)
+        self.class_votes = ext(self.class_votes)
+        # slot kecil dipakai lebih dulu
+        self._free.extend(range(new_cap - 1, old - 1, -1))
+        self.capacity = new_cap
+
+    def clear(self):
+        self.active[:] = False
+        self.ids[:] = -1
+        self.path_head[:] = 0
+        self.path_count[:] = 0
+        self._free = list(range(self.capacity - 1, -1, -1))
+        self._slot_of = {}
+
+    # ===== slot management =====
+    def add(self, tid: int, bbox, cls: int, conf: float) -> int:
+        if not self._free:
+            self._grow(self.capacity * 2)
+        s = self._free.pop()
+        self.ids[s] = tid
+        self.active[s] = True
+        self.boxes[s] = bbox
+        self.classes[s] = cls
+        self.confidences[s] = conf
+        self.ages[s] = 0
+        self.missed[s] = 0
+        self.counted[s] = False
+        self.updated[s] = True
+        self.path_head[s] = 0
+        self.path_count[s] = 0
+        self.appearance_frame[s] = -1
+        self.class_votes[s] = 0
+        self._slot_of[tid] = s
+        return s
+
+    def remove(self, slots: np.ndarray):
+        for s in np.asarray(slots, dtype=np.intp).tolist():
+            if not self.active[s]:
+                continue
+            self._slot_of.pop(int(self.ids[s]), None)
+            self.active[s] = False
+            self.ids[s] = -1
+            self._free.append(s)
+
+    def slot_of(self, tid: int) -> int:
+        return self._slot_of.get(tid, -1)
+
+    def active_slots(self) -> np.ndarray:
+        return np.flatnonzero(self.active)
+
+    # ===== class voting =====
+    def vote(self, slots: np.ndarray, cols: np.ndarray, weights: np.ndarray):
+        """Tambah vote kelas (kolom) berbobot confidence; slot unik per panggilan."""
+        slots = np.asarray(slots, dtype=np.intp)
+        if slots.size:
+            self.class_votes[slots, cols] += weights
+
+    def voted_classes(self, slots: np.ndarray) -> np.ndarray:
+        """Class id hasil vote; slot tanpa vote memakai kelas deteksi terakhir."""
+        slots = np.asarray(slots, dtype=np.intp)
+        votes = self.class_votes[slots]
+        return np.where(votes.sum(axis=1) > 0, self.class_ids[votes.argmax(axis=1)], self.classes[slots])
+
+    def class_stable(self, slots: np.ndarray) -> np.ndarray:
+        votes = self.class_votes[np.asarray(slots, dtype=np.intp)]
+        total = votes.sum(axis=1)
+        return (total >= CLASS_STABLE_WEIGHT) & (votes.max(axis=1) >= CLASS_STABLE_SHARE * total)
+
+    # ===== path ring buffer =====
+    def push_points(self, slots: np.ndarray, pts: np.ndarray, ts: float = 0.0):
+        """Tambah satu titik (beserta timestamp-nya) ke path setiap slot (vectorized)."""
+        slots = np.asarray(slots, dtype=np.intp)
+        if slots.size == 0:
+            return
+        head = self.path_head[slots]
+        self.paths[slots, head] = pts
+        self.path_ts[slots, head] = ts
+        self.path_head[slots] = (head + 1) % self.path_len
+        self.path_count[slots] = np.minimum(self.path_count[slots] + 1, self.path_len)
+        self.moved[slots] = True
+
+    def last_points(self, slots: np.ndarray, k: int = 1) -> np.ndarray:
+        """(n,2) titik ke-k dari belakang (k=1 titik terakhir). Slot harus punya >= k titik."""
+        slots = np.asarray(slots, dtype=np.intp)
+        idx = (self.path_head[slots] - k) % self.path_len
+        return self.paths[slots, idx]
+
+    def last_times(self, slots: np.ndarray, k: int = 1) -> np.ndarray:
+        slots = np.asarray(slots, dtype=np.intp)
+        idx = (self.path_head[slots] - k) % self.path_len
+        return self.path_ts[slots, idx]
+
+    def path(self, s: int) -> List[Tuple[int, int]]:
+        n = int(self.path_count[s])
+        if n == 0:
+            return []
+        idx = (int(self.path_head[s]) - n + np.arange(n)) % self.path_len
+        return [tuple(p) for p in self.paths[s, idx].tolist()]
+
+    # ===== snapshot =====
+    def snapshot(self, version: int) -> "TrackSnapshot":
+        slots = self.active_slots()
+        L = self.path_len
+        count = self.path_count[slots]
+        idx = (self.path_head[slots] - count)[:, None] + np.arange(L)[None, :]
+        paths = self.paths[slots[:, None], idx % L]
+        return TrackSnapshot(
+            version=version,
+            ids=self.ids[slots],
+            boxes=np.rint(self.boxes[slots]).astype(np.int32),
+            classes=self.voted_classes(slots),
+            class_stable=self.class_stable(slots),
+            confidences=self.confidences[slots],
+            counted=self.counted[slots],
+            updated=self.updated[slots],
+            ages=self.ages[slots],
+            missed=self.missed[slots],
+            paths=paths,
+            path_count=count,
+        )
+
+
+class TrackSnapshot:
+    """
+    Tampilan read-only state tracker pada satu versi (frame).
+    Array hasil gather (bukan view ke store) dan ditandai non-writeable, jadi
+    aman dibaca renderer/exporter sementara tracker memproses frame berikutnya.
+    paths: (n, path_len, 2) urut kronologis; titik valid = paths[i, :path_count[i]].
+    classes: kelas hasil vote berbobot confidence; class_stable: vote sudah dominan.
+    """
+    __slots__ = ("version", "ids", "boxes", "classes", "class_stable", "confidences", "counted", "updated",
+                 "ages", "missed", "paths", "path_count")
+
+    def __init__(self, version: int, **arrays):
+        self.version = version
+        for name, arr in arrays.items():
+            arr.setflags(write=False)
+            setattr(self, name, arr)
+
+    def __len__(self):
+        return int(self.ids.shape[0])
+
+    def path(self, i: int, max_points: int = 0) -> np.ndarray:
+        n = int(self.path_count[i])
+        start = max(0, n - max_points) if max_points > 0 else 0
+        return self.paths[i, start:n]
+
+    def as_dict(self) -> Dict[int, Dict[str, Any]]:
+        """Format lama get_tracked_vehicles_with_status (dict-of-dicts, path sebagai list)."""
+        out = {}
+        for i, tid in enumerate(self.ids.tolist()):
+            out[tid] = {
+                "bbox": self.boxes[i].tolist(),
+                "class": int(self.classes[i]),
+                "confidence": float(self.confidences[i]),
+                "path": [tuple(p) for p in self.path(i).tolist()],
+                "is_counted": bool(self.counted[i]),
+                "age": int(self.ages[i]),
+                "missed": int(self.missed[i])
+            }
+        return out
@@ -0,0 +1,179 @@
+"""
+Backend tracker yang bisa dipilih lewat settings (runtime.tracker_backend).
+
+Semua backend memakai antarmuka VehicleTracker (update_tracking, check_line_crossings_directional,
+snapshot, get_counts, counting_engine, events) sehingga counting, drawing dan DB tidak peduli
+backend mana yang jalan:
+- "vehicle":   VehicleTracker (asosiasi array + Kalman, bawaan)
+- "simple":    SimpleTracker dari try/tracking.py (nearest-centroid)
+- "bytetrack": BYTETracker milik ultralytics (sama dengan model.track(tracker="bytetrack.yaml"))
+Backend eksternal hanya memberi ID; path, counted flag, crossing dan event tetap di TrackStore.
+"""
+import importlib.util
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from config import TRACKING_CONFIG
+from counting_engine import class_columns
+from track_events import TRACK_CREATED, TRACK_UPDATED, TRACK_LOST
+from vehicle_tracker import VehicleTracker
+
+TRY_TRACKING_PATH = Path(__file__).resolve().parent / "try" / "tracking.py"
+
+
+class ExternalIdTracker(VehicleTracker):
+    """
+    Basis adapter: subclass cukup mengimplementasikan assign() yang mengembalikan
+    (ids, boxes, classes, confidences) untuk track yang terdeteksi di frame ini.
+    """
+    name = "external"
+
+    def assign(self, det_boxes: np.ndarray, det_cls: np.ndarray, det_conf: np.ndarray,
+               high_conf: Optional[float], frame: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        raise NotImplementedError
+
+    def update_tracking_arrays(self, det_boxes, det_cls, det_conf, frames_elapsed: int = 1,
+                               high_conf: Optional[float] = None, timestamp: Optional[float] = None,
+                               frame: Optional[np.ndarray] = None):
+        det_boxes = np.asarray(det_boxes, dtype=np.float64).reshape(-1, 4)
+        det_cls = np.asarray(det_cls, dtype=np.int32)
+        det_conf = np.asarray(det_conf, dtype=np.float64)
+        now = time.time() if timestamp is None else float(timestamp)
+        self._frame_ts = now
+        self._frame_no += max(1, int(frames_elapsed))
+        st = self.store
+        slots = st.active_slots()
+        st.ages[slots] += 1
+        st.updated[slots] = False
+
+        ids, boxes, cls, conf = self.assign(det_boxes, det_cls, det_conf, high_conf, frame)
+        ids = np.asarray(ids, dtype=np.int64)
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        out_slots = np.array([st.slot_of(int(t)) for t in ids.tolist()], dtype=np.intp)
+        new = np.flatnonzero(out_slots < 0)
+        for k in new.tolist():
+            out_slots[k] = st.add(int(ids[k]), boxes[k], int(cls[k]), float(conf[k]))
+            self.next_id = max(self.next_id, int(ids[k]) + 1)
+        if out_slots.size:
+            st.boxes[out_slots] = boxes
+            st.classes[out_slots] = cls
+            st.confidences[out_slots] = conf
+            st.vote(out_slots, class_columns(cls), conf)
+            st.ages[out_slots] = 0
+            st.missed[out_slots] = 0
+            st.updated[out_slots] = True
+            st.push_points(out_slots, self._centers(boxes), now)
+        is_new = np.zeros(out_slots.size, dtype=bool)
+        is_new[new] = True
+        self._queue_events(TRACK_CREATED, out_slots[is_new])
+        self._queue_events(TRACK_UPDATED, out_slots[~is_new])
+
+        lost = slots[~st.updated[slots]]
+        st.missed[lost] += 1
+        slots = st.active_slots()
+        stale = slots[st.ages[slots] > TRACKING_CONFIG["max_track_lost_frames"]]
+        if stale.size:
+            self._queue_events(TRACK_LOST, stale)
+            self.counting_engine.forget(st.ids[stale].tolist())
+            st.remove(stale)
+        if self._pending_events:
+            self.events.publish(self._pending_events)
+            self._pending_events = []
+        self.version += 1
+
+
+class SimpleTrackerBackend(ExternalIdTracker):
+    """Adapter SimpleTracker (try/tracking.py), dimuat dari path file karena 'try' bukan nama paket."""
+    name = "simple"
+
+    def __init__(self):
+        super().__init__()
+        spec = importlib.util.spec_from_file_location("try_tracking", TRY_TRACKING_PATH)
+        mod = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(mod)
+        self.backend = mod.SimpleTracker(max_missing=int(TRACKING_CONFIG["max_track_lost_frames"]),
+                                         max_dist=float(TRACKING_CONFIG["max_match_distance"]))
+
+    def assign(self, det_boxes, det_cls, det_conf, high_conf, frame):
+        # SimpleTracker tidak mengenal low-confidence: hanya deteksi high yang diberikan
+        keep = np.ones(len(det_boxes), dtype=bool) if high_conf is None else det_conf >= high_conf
+        ids, boxes, labels, confs, missing = self.backend.update_arrays(det_boxes[keep], det_cls[keep], det_conf[keep])
+        live = missing == 0
+        return (ids[live].astype(np.int64), boxes[live].reshape(-1, 4),
+                labels[live].astype(np.int32), confs[live].astype(np.float64))
+
+
+class _Detections:
+    """Objek mirip ultralytics Boxes (numpy) yang dibutuhkan BYTETracker.update."""
+
+    def __init__(self, xyxy: np.ndarray, conf: np.ndarray, cls: np.ndarray):
+        self.xyxy = xyxy.astype(np.float32)
+        self.conf = conf.astype(np.float32)
+        self.cls = cls.astype(np.float32)
+        wh = self.xyxy[:, 2:4] - self.xyxy[:, 0:2]
+        self.xywh = np.hstack([self.xyxy[:, 0:2] + wh / 2, wh])
+
+    def __len__(self):
+        return len(self.conf)
+
+    def __getitem__(self, idx):
+        return _Detections(self.xyxy[idx], self.conf[idx], self.cls[idx])
+
+
+class ByteTrackBackend(ExternalIdTracker):
+    """Adapter BYTETracker ultralytics langsung di atas deteksi pipeline (tanpa model.track)."""
+    name = "bytetrack"
+
+    def __init__(self, frame_rate: int = 30):
+        super().__init__()
+        from ultralytics.trackers.byte_tracker import BYTETracker
+        self._cls = BYTETracker
+        self._frame_rate = frame_rate
+        self.reset_backend()
+
+    def _args(self):
+        low = float(TRACKING_CONFIG.get("low_confidence", 0.10))
+        return SimpleNamespace(
+            tracker_type="bytetrack",
+            track_high_thresh=0.5, track_low_thresh=low, new_track_thresh=0.6,
+            track_buffer=int(TRACKING_CONFIG["max_track_lost_frames"]), match_thresh=0.8, fuse_score=True,
+        )
+
+    def reset_backend(self):
+        self.backend = self._cls(self._args(), frame_rate=self._frame_rate)
+
+    def assign(self, det_boxes, det_cls, det_conf, high_conf, frame):
+        if high_conf is not None:
+            # Threshold high/new mengikuti pipeline (sama seperti two-stage VehicleTracker)
+            self.backend.args.track_high_thresh = float(high_conf)
+            self.backend.args.new_track_thresh = float(high_conf)
+        out = np.asarray(self.backend.update(_Detections(det_boxes, det_conf, det_cls), frame), dtype=np.float64)
+        if out.size == 0:
+            out = np.zeros((0, 8))
+        # Kolom: x1, y1, x2, y2, track_id, score, cls, idx
+        return (out[:, 4].astype(np.int64), out[:, 0:4], out[:, 6].astype(np.int32), out[:, 5])
+
+
+BACKENDS: Dict[str, Callable[[], VehicleTracker]] = {
+    "vehicle": VehicleTracker,
+    "simple": SimpleTrackerBackend,
+    "bytetrack": ByteTrackBackend,
+}
+
+
+def create_tracker(name: Optional[str] = None) -> VehicleTracker:
+    """Buat tracker sesuai nama backend; gagal (mis. ultralytics tidak ada) -> VehicleTracker."""
+    name = str(name or TRACKING_CONFIG.get("backend", "vehicle")).lower()
+    factory = BACKENDS.get(name)
+    if factory is None:
+        print(f"Tracker backend '{name}' tidak dikenal, pakai 'vehicle'")
+        return VehicleTracker()
+    try:
+        return factory()
+    except Exception as e:
+        print(f"Tracker backend '{name}' gagal dimuat ({e}), pakai 'vehicle'")
+        return VehicleTracker()
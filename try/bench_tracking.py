@@ -0,0 +1,100 @@
+"""
+Micro-benchmark SimpleTracker.update: versi array (tracking.py) vs versi loop lama.
+
+    python bench_tracking.py
+    python bench_tracking.py --objects 50 100 200 400 --frames 200
+"""
+import argparse
+import itertools
+import time
+from typing import List
+
+import numpy as np
+
+from tracking import SimpleTracker, Track
+
+
+class LoopSimpleTracker:
+    """Referensi implementasi lama: matriks jarak double loop + argmin berulang."""
+    def __init__(self, max_missing: int = 15, max_dist: float = 60.0):
+        self.max_missing = max_missing
+        self.max_dist = max_dist
+        self.tracks: List[Track] = []
+        self._next_id = itertools.count(1)
+
+    def update(self, detections, labels, confs):
+        det_centroids = [((d[0]+d[2])/2.0, (d[1]+d[3])/2.0) for d in detections]
+        det_used = [False]*len(detections)
+        tr_used = [False]*len(self.tracks)
+        if self.tracks and detections:
+            dist = np.zeros((len(self.tracks), len(detections)), dtype=np.float32)
+            for i, tr in enumerate(self.tracks):
+                tx, ty = tr.centroid
+                for j, (cx, cy) in enumerate(det_centroids):
+                    dist[i, j] = np.hypot(tx - cx, ty - cy)
+            pairs = []
+            for _ in range(min(len(self.tracks), len(detections))):
+                i, j = np.unravel_index(np.argmin(dist, axis=None), dist.shape)
+                if np.isinf(dist[i, j]) or dist[i, j] > self.max_dist:
+                    break
+                pairs.append((i, j))
+                dist[i, :] = np.inf
+                dist[:, j] = np.inf
+            for i, j in pairs:
+                tr = self.tracks[i]
+                tr.prev_centroid = tr.centroid
+                tr.centroid = det_centroids[j]
+                tr.bbox = tuple(detections[j])
+                tr.label = labels[j]
+                tr.conf = confs[j]
+                tr.missing = 0
+                tr_used[i] = True
+                det_used[j] = True
+        for j, used in enumerate(det_used):
+            if not used:
+                self.tracks.append(Track(id=next(self._next_id), bbox=tuple(detections[j]),
+                                         centroid=det_centroids[j], prev_centroid=None,
+                                         label=labels[j], conf=confs[j], missing=0))
+        for i, tr in enumerate(self.tracks[:len(tr_used)]):
+            if not tr_used[i]:
+                tr.missing += 1
+        self.tracks = [t for t in self.tracks if t.missing <= self.max_missing]
+        return list(self.tracks)
+
+
+def make_frames(n_objects: int, n_frames: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    pos = rng.uniform(0, [1920, 1080], (n_objects, 2))
+    vel = rng.uniform(-6, 6, (n_objects, 2))
+    frames = []
+    for _ in range(n_frames):
+        pos = pos + vel + rng.normal(0, 1.0, pos.shape)
+        keep = rng.random(n_objects) > 0.05
+        p = pos[keep]
+        frames.append(np.hstack([p - 25, p + 25]).tolist())
+    return frames
+
+
+def bench(tracker, frames) -> float:
+    t0 = time.perf_counter()
+    for dets in frames:
+        tracker.update(dets, ["car"] * len(dets), [0.5] * len(dets))
+    return (time.perf_counter() - t0) * 1000.0 / len(frames)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="SimpleTracker micro-benchmark")
+    ap.add_argument("--objects", type=int, nargs="+", default=[10, 50, 100, 200, 400])
+    ap.add_argument("--frames", type=int, default=100)
+    args = ap.parse_args()
+
+    print(f"{'objects':>8} {'loop ms/frame':>14} {'array ms/frame':>15} {'speedup':>8}")
+    for n in args.objects:
+        frames = make_frames(n, args.frames)
+        old_ms = bench(LoopSimpleTracker(max_dist=80.0), frames)
+        new_ms = bench(SimpleTracker(max_dist=80.0), frames)
+        print(f"{n:>8} {old_ms:>14.3f} {new_ms:>15.3f} {old_ms / new_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
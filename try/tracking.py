@@ -1,6 +1,5 @@
 from dataclasses import dataclass
 from typing import List, Optional, Tuple
-import itertools
 import numpy as np
 
 
@@ -20,6 +19,9 @@ class SimpleTracker:
     Pelacak sederhana berbasis nearest-centroid matching.
     - Cocok untuk FPS realtime dan jumlah objek moderat.
     - Tidak sekuat ByteTrack/SORT, namun tanpa dependensi eksternal.
+    - State track disimpan sebagai array (struct-of-arrays); matriks jarak dihitung
+      sekali dengan broadcasting, lalu greedy global: pasangan diurutkan sekali
+      dan diambil dari yang terdekat (hasil sama dengan argmin berulang).
 
     Parameter:
     - max_missing: jumlah frame tanpa kecocokan sebelum track dihapus.
@@ -28,68 +30,110 @@ class SimpleTracker:
     def __init__(self, max_missing: int = 15, max_dist: float = 60.0):
         self.max_missing = max_missing
         self.max_dist = max_dist
-        self.tracks: List[Track] = []
-        self._next_id = itertools.count(1)
+        self.reset()
 
     def reset(self):
-        self.tracks = []
-        self._next_id = itertools.count(1)
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.boxes = np.zeros((0, 4), dtype=np.float64)
+        self.centroids = np.zeros((0, 2), dtype=np.float64)
+        self.prev_centroids = np.zeros((0, 2), dtype=np.float64)
+        self.has_prev = np.zeros(0, dtype=bool)
+        self.missing = np.zeros(0, dtype=np.int32)
+        self.confs = np.zeros(0, dtype=np.float64)
+        self.labels = np.zeros(0, dtype=object)
+        self._next_id = 1
+
+    def __len__(self):
+        return int(self.ids.shape[0])
+
+    @property
+    def tracks(self) -> List[Track]:
+        return self._as_tracks()
+
+    def _as_tracks(self) -> List[Track]:
+        out = []
+        for tid, box, c, p, hp, lab, conf, miss in zip(
+                self.ids.tolist(), self.boxes.tolist(), self.centroids.tolist(), self.prev_centroids.tolist(),
+                self.has_prev.tolist(), self.labels.tolist(), self.confs.tolist(), self.missing.tolist()):
+            out.append(Track(id=tid, bbox=tuple(box), centroid=tuple(c),
+                             prev_centroid=tuple(p) if hp else None, label=lab, conf=conf, missing=miss))
+        return out
+
+    def _match(self, det_centroids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        diff = self.centroids[:, None, :] - det_centroids[None, :, :]
+        dist = np.sqrt((diff * diff).sum(axis=2)).astype(np.float32)
+        rows, cols = np.nonzero(dist <= self.max_dist)
+        if rows.size == 0:
+            return rows, cols
+        order = np.argsort(dist[rows, cols], kind="stable")
+        rows, cols = rows[order], cols[order]
+        row_used = np.zeros(dist.shape[0], dtype=bool)
+        col_used = np.zeros(dist.shape[1], dtype=bool)
+        keep = np.zeros(rows.size, dtype=bool)
+        for k, (i, j) in enumerate(zip(rows.tolist(), cols.tolist())):
+            if row_used[i] or col_used[j]:
+                continue
+            row_used[i] = col_used[j] = keep[k] = True
+        return rows[keep], cols[keep]
 
     def update(self, detections: List[List[float]], labels: List[str], confs: List[float]) -> List[Track]:
         # detections: list of [x1,y1,x2,y2]
-        det_centroids = [((d[0]+d[2])/2.0, (d[1]+d[3])/2.0) for d in detections]
-        det_used = [False]*len(detections)
-        tr_used = [False]*len(self.tracks)
-
-        # Build distance matrix
-        if self.tracks and detections:
-            dist = np.zeros((len(self.tracks), len(detections)), dtype=np.float32)
-            for i, tr in enumerate(self.tracks):
-                tx, ty = tr.centroid
-                for j, (cx, cy) in enumerate(det_centroids):
-                    dist[i, j] = np.hypot(tx - cx, ty - cy)
-            # Greedy matching by min distance
-            pairs = []
-            for _ in range(min(len(self.tracks), len(detections))):
-                i, j = np.unravel_index(np.argmin(dist, axis=None), dist.shape)
-                if np.isinf(dist[i, j]) or dist[i, j] > self.max_dist:
-                    break
-                pairs.append((i, j))
-                dist[i, :] = np.inf
-                dist[:, j] = np.inf
-            # Apply matches
-            for i, j in pairs:
-                tr = self.tracks[i]
-                tr.prev_centroid = tr.centroid
-                tr.centroid = det_centroids[j]
-                tr.bbox = tuple(detections[j])
-                tr.label = labels[j]
-                tr.conf = confs[j]
-                tr.missing = 0
-                tr_used[i] = True
-                det_used[j] = True
+        self.update_arrays(detections, labels, confs)
+        return self._as_tracks()
 
-        # Unmatched detections -> new tracks
-        for j, used in enumerate(det_used):
-            if not used:
-                cx, cy = det_centroids[j]
-                new_tr = Track(
-                    id=next(self._next_id),
-                    bbox=tuple(detections[j]),
-                    centroid=(cx, cy),
-                    prev_centroid=None,
-                    label=labels[j],
-                    conf=confs[j],
-                    missing=0
-                )
-                self.tracks.append(new_tr)
+    def update_arrays(self, detections, labels, confs) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Sama dengan update() tanpa membentuk objek Track: return state array
+        (ids, boxes, labels, confs, missing) milik tracker; berlaku sampai update berikutnya.
+        """
+        det = np.asarray(detections, dtype=np.float64).reshape(-1, 4)
+        det_centroids = (det[:, 0:2] + det[:, 2:4]) / 2.0
+        det_conf = np.asarray(confs, dtype=np.float64).reshape(-1)
+        det_labels = np.empty(det.shape[0], dtype=object)
+        det_labels[:] = list(labels)
+        n_tracks = len(self)
+
+        tr_used = np.zeros(n_tracks, dtype=bool)
+        det_used = np.zeros(det.shape[0], dtype=bool)
+        if n_tracks and det.shape[0]:
+            i, j = self._match(det_centroids)
+            self.prev_centroids[i] = self.centroids[i]
+            self.has_prev[i] = True
+            self.centroids[i] = det_centroids[j]
+            self.boxes[i] = det[j]
+            self.labels[i] = det_labels[j]
+            self.confs[i] = det_conf[j]
+            self.missing[i] = 0
+            tr_used[i] = True
+            det_used[j] = True
 
         # Unmatched tracks -> increase missing
-        for i, tr in enumerate(self.tracks):
-            if not tr_used[i]:
-                tr.missing += 1
+        self.missing[~tr_used] += 1
+
+        # Unmatched detections -> new tracks
+        new = np.flatnonzero(~det_used)
+        if new.size:
+            m = new.size
+            self.ids = np.concatenate([self.ids, np.arange(self._next_id, self._next_id + m)])
+            self._next_id += m
+            self.boxes = np.concatenate([self.boxes, det[new]])
+            self.centroids = np.concatenate([self.centroids, det_centroids[new]])
+            self.prev_centroids = np.concatenate([self.prev_centroids, np.zeros((m, 2))])
+            self.has_prev = np.concatenate([self.has_prev, np.zeros(m, dtype=bool)])
+            self.missing = np.concatenate([self.missing, np.zeros(m, dtype=np.int32)])
+            self.confs = np.concatenate([self.confs, det_conf[new]])
+            self.labels = np.concatenate([self.labels, det_labels[new]])
 
         # Remove old tracks
-        self.tracks = [t for t in self.tracks if t.missing <= self.max_missing]
+        alive = self.missing <= self.max_missing
+        if not alive.all():
+            self.ids = self.ids[alive]
+            self.boxes = self.boxes[alive]
+            self.centroids = self.centroids[alive]
+            self.prev_centroids = self.prev_centroids[alive]
+            self.has_prev = self.has_prev[alive]
+            self.missing = self.missing[alive]
+            self.confs = self.confs[alive]
+            self.labels = self.labels[alive]
 
-        return list(self.tracks)
\ No newline at end of file
+        return self.ids, self.boxes, self.labels, self.confs, self.missing
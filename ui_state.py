@@ -0,0 +1,42 @@
+"""
+Model state UI: thread worker hanya mempublikasikan snapshot nilai label (versioned), satu task
+periodik di thread Tk mengambil nilai yang berubah dan mengupdate label terkait saja.
+Burst crossing cukup menaikkan versi; tidak ada root.after per label per event.
+"""
+import threading
+from typing import Any, Dict
+
+
+class UiState:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: Dict[str, Any] = {}
+        self.version = 0
+        self._seen = 0
+        self._shown: Dict[str, Any] = {}
+        self.published = 0       # jumlah publish (worker)
+        self.applied = 0         # jumlah update label yang benar-benar dilakukan (UI)
+
+    def publish(self, **values):
+        """Thread worker: simpan nilai terbaru; versi naik hanya bila ada yang berubah."""
+        with self._lock:
+            self.published += 1
+            changed = False
+            for key, value in values.items():
+                if self._values.get(key) != value:
+                    self._values[key] = value
+                    changed = True
+            if changed:
+                self.version += 1
+
+    def pending(self) -> Dict[str, Any]:
+        """Thread UI: nilai yang berbeda dari yang terakhir ditampilkan (kosong bila versi sama)."""
+        if self.version == self._seen:
+            return {}
+        with self._lock:
+            self._seen = self.version
+            values = dict(self._values)
+        out = {k: v for k, v in values.items() if self._shown.get(k) != v}
+        self._shown.update(out)
+        self.applied += len(out)
+        return out
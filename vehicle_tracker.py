@@ -1,12 +1,37 @@
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Optional
 import math
-from collections import deque
+import time
+import numpy as np
 from config import CLASS_NAMES, TRACKING_CONFIG
+from association import association_cost, iou_cost, solve_assignment
+import kalman
+from track_store import TrackStore, TrackSnapshot
+from counting_engine import CountingEngine, CrossingEvent, COUNT_CLASS_IDS, class_columns
+from reid import AppearanceReID, DESC_DIM, blend_descriptors
+from track_events import EventBus, TrackEvent, TRACK_CREATED, TRACK_UPDATED, LINE_CROSSED, TRACK_LOST
+
+MAIN_LINE_NAME = "main"
+
 
 class VehicleTracker:
     def __init__(self):
         self.next_id = 1
-        self.tracks: Dict[int, Dict[str, Any]] = {}
+        self.store = TrackStore(capacity=64, path_len=64, desc_dim=DESC_DIM, class_ids=COUNT_CLASS_IDS)
+        # Versi state: naik setiap kali track berubah; snapshot di-cache per versi
+        self.version = 0
+        self._snapshot: Optional[TrackSnapshot] = None
+        self._line_cache = None
+        # Garis/zona tambahan (multi-line & polygon zone); garis utama tetap di self.counts
+        self.counting_engine = CountingEngine()
+        # Event crossing (garis utama + engine) hasil evaluasi terakhir
+        self.crossing_events: List[CrossingEvent] = []
+        self._frame_ts = 0.0
+        # Re-ID appearance (opsional): galeri track hilang + statistik biaya per frame
+        self.reid = AppearanceReID(int(TRACKING_CONFIG.get("reid_gallery_size", 64)))
+        self._frame_no = 0
+        # Stream event lifecycle track (created/updated/line_crossed/lost) untuk subscriber
+        self.events = EventBus()
+        self._pending_events: List[TrackEvent] = []
         self.counts = {
             "up": {"car": 0, "motorcycle": 0, "bus": 0, "truck": 0},
             "down": {"car": 0, "motorcycle": 0, "bus": 0, "truck": 0},
@@ -14,90 +39,289 @@ class VehicleTracker:
             "total_down": 0
         }
 
+    @property
+    def tracks(self) -> Dict[int, Dict[str, Any]]:
+        # Kompatibilitas: tampilan dict-of-dicts dari track store
+        return self.get_tracked_vehicles_with_status()
+
     def reset_counts(self):
         for k in self.counts["up"].keys():
             self.counts["up"][k] = 0
             self.counts["down"][k] = 0
         self.counts["total_up"] = 0
         self.counts["total_down"] = 0
-        for tid in list(self.tracks.keys()):
-            self.tracks[tid]["is_counted"] = False
-            self.tracks[tid]["last_side"] = None
-            self.tracks[tid]["missed"] = 0
-
-    def update_tracking(self, detections: List[Dict[str, Any]]):
-        for t in self.tracks.values():
-            t["age"] += 1
-            t["_updated"] = False
-
-        used = set()
-        for det in detections:
-            x1, y1, x2, y2 = det["bbox"]
-            cx, cy = (x1 + x2) // 2, (y1 + y2) // 2
-
-            best_id = None
-            best_dist = 1e9
-            for tid, tr in self.tracks.items():
-                if tid in used:
-                    continue
-                tx1, ty1, tx2, ty2 = tr["bbox"]
-                tcx, tcy = (tx1 + tx2) // 2, (ty1 + ty2) // 2
-                d = math.hypot(cx - tcx, cy - tcy)
-                if d < best_dist and d <= TRACKING_CONFIG["max_match_distance"]:
-                    best_dist = d
-                    best_id = tid
-
-            if best_id is None:
-                tid = self.next_id
-                self.next_id += 1
-                self.tracks[tid] = {
-                    "bbox": det["bbox"],
-                    "class": det["class"],
-                    "confidence": det["confidence"],
-                    "path": deque(maxlen=64),
-                    "is_counted": False,
-                    "age": 0,
-                    "last_side": None,
-                    "missed": 0,
-                    "_updated": True
-                }
-                bx1, by1, bx2, by2 = det["bbox"]
-                self.tracks[tid]["path"].append(((bx1 + bx2) // 2, (by1 + by2) // 2))
-                used.add(tid)
+        st = self.store
+        st.counted[:] = False
+        st.missed[:] = 0
+        self.reid.gallery.counted[:] = False
+        self.counting_engine.reset_counts()
+        self.version += 1
+
+    def _use_kalman(self) -> bool:
+        return TRACKING_CONFIG.get("motion_model", "kalman") == "kalman"
+
+    def _queue_events(self, etype: str, slots: np.ndarray):
+        # Event hanya dibentuk bila ada subscriber untuk tipe tsb
+        if slots.size == 0 or not self.events.wants(etype):
+            return
+        st = self.store
+        boxes = np.rint(st.boxes[slots]).astype(np.int32).tolist()
+        self._pending_events.extend(
+            TrackEvent(etype, tid, self._frame_ts, CLASS_NAMES.get(c, "car"), conf, tuple(b))
+            for tid, c, conf, b in zip(st.ids[slots].tolist(), st.classes[slots].tolist(),
+                                       st.confidences[slots].tolist(), boxes))
+
+    def _use_reid(self) -> bool:
+        return bool(TRACKING_CONFIG.get("reid", False)) and self.reid.available
+
+    def _smoothed_boxes(self, kf_boxes: np.ndarray, det_boxes: np.ndarray) -> np.ndarray:
+        # bbox_smooth_mode "off": tampilkan bbox deteksi apa adanya (filter tetap jalan untuk gating)
+        if str(TRACKING_CONFIG.get("bbox_smooth_mode", "adaptive")).lower() in ("off", "none"):
+            return det_boxes
+        m = float(TRACKING_CONFIG.get("bbox_max_shift_px", 48))
+        return np.rint(np.clip(kf_boxes, det_boxes - m, det_boxes + m))
+
+    def _measurement_scale(self, key: str = "bbox_smooth_alpha", default: float = 0.5) -> float:
+        # alpha besar = lebih percaya deteksi (noise measurement lebih kecil)
+        alpha = min(1.0, max(0.05, float(TRACKING_CONFIG.get(key, default))))
+        return (1.0 - alpha) / alpha
+
+    def _apply_matches(self, ms: np.ndarray, boxes: np.ndarray, cls: np.ndarray, conf: np.ndarray, use_kf: bool):
+        st = self.store
+        if ms.size == 0:
+            return
+        if use_kf:
+            # Track yang sempat missed (prediksi saja) memakai bbox_smooth_alpha_missed: cepat kembali ke deteksi
+            r_scale = np.where(st.missed[ms] > 0, self._measurement_scale("bbox_smooth_alpha_missed", 0.75),
+                               self._measurement_scale())
+            st.kf_mean[ms], st.kf_cov[ms] = kalman.update(st.kf_mean[ms], st.kf_cov[ms], boxes, r_scale)
+            st.boxes[ms] = self._smoothed_boxes(kalman.mean_to_xyxy(st.kf_mean[ms]), boxes)
+        else:
+            st.boxes[ms] = boxes
+        st.classes[ms] = cls
+        st.confidences[ms] = conf
+        st.vote(ms, class_columns(cls), conf)
+        st.ages[ms] = 0
+        st.missed[ms] = 0
+        st.updated[ms] = True
+        st.push_points(ms, self._centers(st.boxes[ms]), self._frame_ts)
+        self._queue_events(TRACK_UPDATED, ms)
+
+    def update_tracking(self, detections: List[Dict[str, Any]], frames_elapsed: int = 1,
+                        high_conf: Optional[float] = None, timestamp: Optional[float] = None,
+                        frame: Optional[np.ndarray] = None):
+        """
+        high_conf: deteksi dengan confidence < high_conf dianggap low-confidence
+        (ByteTrack-style): hanya dipakai untuk menyambung track lama via IoU,
+        tidak pernah membuat track baru. None = semua deteksi high-confidence.
+        timestamp: waktu capture frame (detik, epoch); default time.time().
+        frame: gambar BGR (koordinat sama dengan bbox) untuk descriptor re-ID; None = tanpa re-ID.
+        """
+        det_boxes = np.array([det["bbox"] for det in detections], dtype=np.float64).reshape(-1, 4)
+        det_cls = np.array([det["class"] for det in detections], dtype=np.int32)
+        det_conf = np.array([det["confidence"] for det in detections], dtype=np.float64)
+        self.update_tracking_arrays(det_boxes, det_cls, det_conf, frames_elapsed, high_conf, timestamp, frame)
+
+    def update_tracking_arrays(self, det_boxes: np.ndarray, det_cls: np.ndarray, det_conf: np.ndarray,
+                               frames_elapsed: int = 1, high_conf: Optional[float] = None,
+                               timestamp: Optional[float] = None, frame: Optional[np.ndarray] = None):
+        """Sama dengan update_tracking, tetapi deteksi sudah berupa array (n,4)/(n,)/(n,) (mis. replay)."""
+        det_boxes = np.asarray(det_boxes, dtype=np.float64).reshape(-1, 4)
+        det_cls = np.asarray(det_cls, dtype=np.int32)
+        det_conf = np.asarray(det_conf, dtype=np.float64)
+        now = time.time() if timestamp is None else float(timestamp)
+        self._frame_ts = now
+        self._frame_no += max(1, int(frames_elapsed))
+        reid_on = self._use_reid()
+        if reid_on:
+            self.reid.begin_frame(TRACKING_CONFIG.get("reid_max_crops", 16), TRACKING_CONFIG.get("reid_budget_ms", 3.0))
+        st = self.store
+        slots = st.active_slots()
+        st.ages[slots] += 1
+        st.updated[slots] = False
+        use_kf = self._use_kalman()
+
+        is_high = np.ones(len(det_boxes), dtype=bool) if high_conf is None else det_conf >= high_conf
+        hi = np.flatnonzero(is_high)
+        lo = np.flatnonzero(~is_high)
+        if not TRACKING_CONFIG.get("two_stage_association", True):
+            lo = lo[:0]   # perilaku lama: deteksi low-confidence dibuang
+
+        # Prediksi Kalman seluruh track sekaligus; posisi prediksi dipakai untuk gating
+        if use_kf and slots.size:
+            st.kf_mean[slots], st.kf_cov[slots] = kalman.predict(
+                st.kf_mean[slots], st.kf_cov[slots], max(1, int(frames_elapsed)))
+            gate_boxes = kalman.mean_to_xyxy(st.kf_mean[slots])
+        else:
+            gate_boxes = st.boxes[slots]
+
+        # Tahap 1: track vs deteksi high-confidence (jarak centroid + opsional IoU/size)
+        rows = cols = np.zeros(0, dtype=np.intp)
+        if slots.size and hi.size:
+            cost = association_cost(
+                gate_boxes, det_boxes[hi],
+                max_dist=TRACKING_CONFIG["max_match_distance"],
+                iou_weight=float(TRACKING_CONFIG.get("iou_weight", 0.0)),
+                size_weight=float(TRACKING_CONFIG.get("size_weight", 0.0)),
+            )
+            rows, cols = solve_assignment(cost, TRACKING_CONFIG.get("assignment", "auto"))
+        mj = hi[cols]
+        self._apply_matches(slots[rows], det_boxes[mj], det_cls[mj], det_conf[mj], use_kf)
+
+        # Tahap 2: sisa track vs deteksi low-confidence, murni IoU
+        rest = np.flatnonzero(~st.updated[slots])
+        if rest.size and lo.size:
+            cost = iou_cost(gate_boxes[rest], det_boxes[lo], float(TRACKING_CONFIG.get("low_match_iou", 0.3)))
+            rows2, cols2 = solve_assignment(cost, TRACKING_CONFIG.get("assignment", "auto"))
+            mj2 = lo[cols2]
+            self._apply_matches(slots[rest[rows2]], det_boxes[mj2], det_cls[mj2], det_conf[mj2], use_kf)
+
+        # Deteksi high-confidence tanpa pasangan -> track baru
+        det_used = np.zeros(len(det_boxes), dtype=bool)
+        det_used[mj] = True
+        new_j = hi[~det_used[hi]]
+        if new_j.size:
+            self._add_tracks(new_j, det_boxes, det_cls, det_conf, frame if reid_on else None)
+        if reid_on and frame is not None:
+            self._refresh_appearance(frame)
+
+        # Track tanpa pasangan -> missed++ dan (opsional) prediksi posisi
+        lost = slots[~st.updated[slots]]
+        st.missed[lost] += 1
+        if TRACKING_CONFIG.get("predict_missing", False) and lost.size:
+            max_pred = int(TRACKING_CONFIG.get("max_prediction_frames", 1))
+            lost = lost[st.missed[lost] <= max_pred]
+            if use_kf:
+                if lost.size:
+                    st.boxes[lost] = np.rint(kalman.mean_to_xyxy(st.kf_mean[lost]))
+                    st.push_points(lost, self._centers(st.boxes[lost]), now)
             else:
-                tr = self.tracks[best_id]
-                tr["bbox"] = det["bbox"]
-                tr["class"] = det["class"]
-                tr["confidence"] = det["confidence"]
-                tr["age"] = 0
-                tr["missed"] = 0
-                bx1, by1, bx2, by2 = det["bbox"]
-                tr["path"].append(((bx1 + bx2) // 2, (by1 + by2) // 2))
-                tr["_updated"] = True
-                used.add(best_id)
-
-        do_predict = TRACKING_CONFIG.get("predict_missing", False)
-        max_pred = int(TRACKING_CONFIG.get("max_prediction_frames", 1))
-        for tid, tr in list(self.tracks.items()):
-            if tr.get("_updated"):
-                continue
-            tr["missed"] = tr.get("missed", 0) + 1
-            if do_predict and tr["missed"] <= max_pred:
-                path = list(tr["path"])
-                if len(path) >= 2:
-                    (x0, y0), (x1, y1) = path[-2], path[-1]
-                    vx, vy = (x1 - x0), (y1 - y0)
-                    bx1, by1, bx2, by2 = tr["bbox"]
-                    nb = [int(bx1 + vx), int(by1 + vy), int(bx2 + vx), int(by2 + vy)]
-                    tr["bbox"] = nb
-                    tr["path"].append((int(x1 + vx), int(y1 + vy)))
-                else:
-                    if tr["path"]:
-                        tr["path"].append(tr["path"][-1])
-
-        stale = [tid for tid, tr in self.tracks.items() if tr["age"] > TRACKING_CONFIG["max_track_lost_frames"]]
-        for tid in stale:
-            self.tracks.pop(tid, None)
+                two = lost[st.path_count[lost] >= 2]
+                if two.size:
+                    last = st.last_points(two, 1)
+                    v = last - st.last_points(two, 2)
+                    st.boxes[two] += np.tile(v, 2)
+                    st.push_points(two, last + v, now)
+                one = lost[st.path_count[lost] == 1]
+                if one.size:
+                    st.push_points(one, st.last_points(one, 1), now)
+
+        slots = st.active_slots()
+        stale = slots[st.ages[slots] > TRACKING_CONFIG["max_track_lost_frames"]]
+        forget: List[int] = []
+        if stale.size:
+            forget = st.ids[stale].tolist()
+            if reid_on:
+                forget = self._to_gallery(stale, use_kf)
+            self._queue_events(TRACK_LOST, stale)
+            st.remove(stale)
+        if reid_on:
+            forget += self.reid.gallery.expire(self._frame_no, int(TRACKING_CONFIG.get("reid_max_lost_frames", 90)))
+            self.reid.end_frame()
+        if forget:
+            self.counting_engine.forget(forget)
+        if self._pending_events:
+            self.events.publish(self._pending_events)
+            self._pending_events = []
+        self.version += 1
+
+    # ===== re-ID =====
+    def _add_tracks(self, new_j: np.ndarray, det_boxes: np.ndarray, det_cls: np.ndarray,
+                    det_conf: np.ndarray, frame: Optional[np.ndarray]):
+        """Buat track dari deteksi tak berpasangan; bila re-ID aktif, sambungkan dulu ke galeri."""
+        st = self.store
+        boxes = det_boxes[new_j]
+        centers = self._centers(boxes)
+        desc = np.zeros((new_j.size, DESC_DIM), dtype=np.float32)
+        gi = np.full(new_j.size, -1, dtype=np.intp)
+        if frame is not None:
+            done, d = self.reid.describe(frame, boxes)
+            desc[done] = d
+            if len(self.reid.gallery) and done.size:
+                g, k = self.reid.gallery.match(
+                    desc, centers.astype(np.float64), self._frame_no,
+                    float(TRACKING_CONFIG.get("reid_min_similarity", 0.80)),
+                    float(TRACKING_CONFIG.get("reid_max_distance", 300)))
+                gi[k] = g
+
+        gal = self.reid.gallery
+        ids = []
+        for k in range(new_j.size):
+            if gi[k] >= 0:
+                ids.append(int(gal.ids[gi[k]]))
+            else:
+                ids.append(self.next_id)
+                self.next_id += 1
+        new_slots = np.array([st.add(tid, boxes[k], det_cls[j], det_conf[j])
+                              for k, (tid, j) in enumerate(zip(ids, new_j.tolist()))], dtype=np.intp)
+        st.kf_mean[new_slots], st.kf_cov[new_slots] = kalman.initiate(boxes)
+        st.vote(new_slots, class_columns(det_cls[new_j]), det_conf[new_j])
+
+        rel = np.flatnonzero(gi >= 0)
+        if rel.size:
+            # Track lama kembali: status counted, kecepatan & titik terakhir dipulihkan
+            # sehingga segmen (titik terakhir -> titik sekarang) tetap diuji crossing.
+            g = gi[rel]
+            rs = new_slots[rel]
+            st.counted[rs] = gal.counted[g]
+            st.kf_mean[rs, 4:6] = gal.velocity[g]
+            st.push_points(rs, np.rint(gal.points[g]).astype(np.int32), gal.times[g])
+            desc[rel] = blend_descriptors(gal.desc[g], desc[rel], 0.5)
+            gal.take(g)
+            self.reid.stats["relinked"] += int(rel.size)
+        st.push_points(new_slots, centers, self._frame_ts)
+
+        self._queue_events(TRACK_CREATED, new_slots[gi < 0])
+        self._queue_events(TRACK_UPDATED, new_slots[rel])
+
+        has = desc.any(axis=1)
+        st.appearance[new_slots[has]] = desc[has]
+        st.appearance_frame[new_slots[has]] = self._frame_no
+
+    def _refresh_appearance(self, frame: np.ndarray):
+        """Perbarui descriptor track yang terdeteksi frame ini (yang belum punya / paling lama dulu)."""
+        st = self.store
+        slots = st.active_slots()
+        upd = slots[st.updated[slots] & (st.appearance_frame[slots] != self._frame_no)]
+        refresh = max(1, int(TRACKING_CONFIG.get("reid_refresh_frames", 5)))
+        last = st.appearance_frame[upd]
+        due = upd[(last < 0) | (self._frame_no - last >= refresh)]
+        if due.size == 0:
+            return
+        due = due[np.argsort(st.appearance_frame[due], kind="stable")]
+        done, desc = self.reid.describe(frame, st.boxes[due])
+        if done.size == 0:
+            return
+        s = due[done]
+        ok = desc.any(axis=1)
+        s, desc = s[ok], desc[ok]
+        had = st.appearance_frame[s] >= 0
+        desc[had] = blend_descriptors(st.appearance[s[had]], desc[had], 0.3)
+        st.appearance[s] = desc
+        st.appearance_frame[s] = self._frame_no
+
+    def _to_gallery(self, stale: np.ndarray, use_kf: bool) -> List[int]:
+        """Simpan track basi yang punya descriptor ke galeri; return id yang boleh dilupakan engine."""
+        st = self.store
+        has = stale[(st.appearance_frame[stale] >= 0) & (st.path_count[stale] > 0)]
+        forget = st.ids[stale[~np.isin(stale, has)]].tolist()
+        if has.size == 0:
+            return forget
+        last = st.last_points(has, 1).astype(np.float64)
+        if use_kf:
+            origins = st.kf_mean[has, 0:2]
+            velocity = st.kf_mean[has, 4:6]
+        else:
+            origins = last
+            velocity = np.zeros((has.size, 2))
+        forget += self.reid.gallery.add(
+            st.ids[has], st.appearance[has], last, st.last_times(has, 1), origins, velocity,
+            st.classes[has], st.counted[has], self._frame_no)
+        return forget
+
+    @staticmethod
+    def _centers(boxes: np.ndarray) -> np.ndarray:
+        return ((boxes[:, 0:2] + boxes[:, 2:4]) // 2).astype(np.int32)
 
     # ===== directional crossing =====
     def _line_vec(self, line):
@@ -108,85 +332,117 @@ class VehicleTracker:
         nx, ny = (-vy / L, vx / L)
         return (x1, y1, x2, y2, vx, vy, L2, L, nx, ny)
 
-    def _signed_distance_px(self, p, line_geom) -> float:
-        x, y = p
-        x1, y1, x2, y2, vx, vy, L2, L, nx, ny = line_geom
-        cross = vx * (y - y1) - vy * (x - x1)
-        return cross / (L if L != 0 else 1.0)
-
-    def _projection_t(self, p, line_geom) -> float:
-        x, y = p
-        x1, y1, x2, y2, vx, vy, L2, L, nx, ny = line_geom
-        if L2 == 0:
-            return 0.0
-        return ((x - x1) * vx + (y - y1) * vy) / L2
+    def _line_geometry(self, line, band_px: int, invert_dir: bool):
+        # Geometri garis di-cache sampai counting_line / line_settings berubah
+        key = (tuple(map(tuple, line)), band_px, invert_dir)
+        cache = self._line_cache
+        if cache is None or cache[0] != key:
+            cache = (key, self._line_vec(line))
+            self._line_cache = cache
+        return cache[1]
 
     def check_line_crossings_directional(self, line, line_settings) -> bool:
-        if not line:
+        """
+        Uji segmen gerak penuh (titik sebelumnya -> titik sekarang) terhadap garis.
+        Tidak ada syarat band untuk lompatan jauh (stride besar); posisi & waktu
+        crossing diinterpolasi di titik potong dan dicatat di self.crossing_events.
+        """
+        # Hanya track yang bergerak (titik path baru) sejak evaluasi terakhir
+        st = self.store
+        slots = st.active_slots()
+        moved = slots[st.moved[slots] & (st.path_count[slots] >= 2)]
+        st.moved[slots] = False
+        self.crossing_events = []
+        if moved.size == 0:
             return False
-        changed = False
-
-        band_px = int(line_settings.get("band_px", 12))
-        invert_dir = bool(line_settings.get("invert_direction", False))
-
-        geom = self._line_vec(line)
-        nx, ny = geom[8], geom[9]
-
-        for tid, tr in self.tracks.items():
-            path = list(tr["path"])
-            if len(path) < 2 or tr.get("is_counted", False):
-                continue
-
-            prev_pt = path[-2]
-            last_pt = path[-1]
-
-            d_prev = self._signed_distance_px(prev_pt, geom)
-            d_now = self._signed_distance_px(last_pt, geom)
-
-            if d_prev == 0:
-                d_prev = 1e-6
-            if d_now == 0:
-                d_now = -1e-6
-
-            if d_prev * d_now < 0:
-                if min(abs(d_prev), abs(d_now)) <= band_px + 2:
-                    mid_pt = ((prev_pt[0] + last_pt[0]) * 0.5, (prev_pt[1] + last_pt[1]) * 0.5)
-                    t_mid = self._projection_t(mid_pt, geom)
-                    if -0.1 <= t_mid <= 1.1:
-                        mvx = last_pt[0] - prev_pt[0]
-                        mvy = last_pt[1] - prev_pt[1]
-                        dot_mn = mvx * nx + mvy * ny
-                        if invert_dir:
-                            dot_mn = -dot_mn
-                        direction = "up" if dot_mn < 0 else "down"
-
-                        cname = CLASS_NAMES.get(tr["class"], "car")
-                        if direction == "up":
-                            tr["is_counted"] = True
-                            self.counts["up"][cname] = self.counts["up"].get(cname, 0) + 1
-                            self.counts["total_up"] += 1
-                        else:
-                            tr["is_counted"] = True
-                            self.counts["down"][cname] = self.counts["down"].get(cname, 0) + 1
-                            self.counts["total_down"] += 1
-                        changed = True
 
+        prev_all = st.last_points(moved, 2)
+        last_all = st.last_points(moved, 1)
+        prev_ts = st.last_times(moved, 2)
+        last_ts = st.last_times(moved, 1)
+        if self.counting_engine:
+            self.crossing_events = self.counting_engine.process(
+                st.ids[moved], prev_all, last_all, st.voted_classes(moved), prev_ts, last_ts)
+        changed = bool(self.crossing_events)
+
+        if line:
+            invert_dir = bool(line_settings.get("invert_direction", False))
+            band_px = int(line_settings.get("band_px", 12))
+            x1, y1, x2, y2, vx, vy, L2, L, nx, ny = self._line_geometry(line, band_px, invert_dir)
+
+            keep = ~st.counted[moved]
+            cand = moved[keep]
+            prev = prev_all[keep].astype(np.float64)
+            last = last_all[keep].astype(np.float64)
+
+            # Signed distance (px) kedua titik ke garis, semua track sekaligus
+            inv_L = 1.0 / (L if L != 0 else 1.0)
+            d_prev = (vx * (prev[:, 1] - y1) - vy * (prev[:, 0] - x1)) * inv_L
+            d_now = (vx * (last[:, 1] - y1) - vy * (last[:, 0] - x1)) * inv_L
+
+            # Berpindah sisi, atau mendarat tepat di garis (dihitung sekali karena flag counted)
+            hit = ((d_prev * d_now < 0) | ((d_now == 0) & (d_prev != 0)))
+            denom = np.where(hit, d_prev - d_now, 1.0)
+            frac = np.where(hit, d_prev / denom, 0.0)            # posisi potong pada segmen (0..1)
+            cross_pt = prev + (last - prev) * frac[:, None]
+            t_line = ((cross_pt[:, 0] - x1) * vx + (cross_pt[:, 1] - y1) * vy) / L2 if L2 else np.zeros(len(cand))
+            hit &= (t_line >= -0.1) & (t_line <= 1.1)
+
+            if hit.any():
+                # d = proyeksi ke normal garis, jadi arah gerak = tanda (d_now - d_prev)
+                dot_mn = d_now - d_prev
+                if invert_dir:
+                    dot_mn = -dot_mn
+                hit_idx = np.flatnonzero(hit)
+                hit_slots = cand[hit_idx]
+                st.counted[hit_slots] = True
+                p_ts = prev_ts[keep][hit_idx]
+                c_ts = last_ts[keep][hit_idx]
+                ts = p_ts + (c_ts - p_ts) * frac[hit_idx]
+                # Kelas diputuskan sekali di sini dari histogram vote track (bukan kelas frame terakhir)
+                voted = st.voted_classes(hit_slots).tolist()
+                for k, s in enumerate(hit_slots.tolist()):
+                    cname = CLASS_NAMES.get(voted[k], "car")
+                    direction = "up" if dot_mn[hit_idx[k]] < 0 else "down"
+                    self.counts[direction][cname] = self.counts[direction].get(cname, 0) + 1
+                    self.counts["total_" + direction] += 1
+                    px, py = cross_pt[hit_idx[k]]
+                    self.crossing_events.append(CrossingEvent(
+                        "line", MAIN_LINE_NAME, int(st.ids[s]), direction, cname,
+                        float(ts[k]), float(px), float(py)))
+                changed = True
+
+        if changed:
+            self.version += 1
+            if self.events.wants(LINE_CROSSED):
+                self._publish_crossings()
         return changed
 
-    def get_tracked_vehicles_with_status(self) -> Dict[int, Dict[str, Any]]:
-        out = {}
-        for tid, tr in self.tracks.items():
-            out[tid] = {
-                "bbox": tr["bbox"],
-                "class": tr["class"],
-                "confidence": tr["confidence"],
-                "path": list(tr["path"]),
-                "is_counted": tr["is_counted"],
-                "age": tr.get("age", 0),
-                "missed": tr.get("missed", 0)
-            }
+    def crossing_details(self) -> List[Tuple[CrossingEvent, Tuple[int, int, int, int], float]]:
+        """(event, bbox, confidence) untuk crossing_events evaluasi terakhir (track yang masih ada)."""
+        st = self.store
+        out = []
+        for ev in self.crossing_events:
+            s = st.slot_of(ev.track_id)
+            if s >= 0:
+                out.append((ev, tuple(np.rint(st.boxes[s]).astype(int).tolist()), float(st.confidences[s])))
         return out
 
+    def _publish_crossings(self):
+        self.events.publish([TrackEvent(LINE_CROSSED, ev.track_id, ev.timestamp, ev.class_name, conf, bbox,
+                                        ev.name, ev.direction) for ev, bbox, conf in self.crossing_details()])
+
+    def snapshot(self) -> TrackSnapshot:
+        """Snapshot read-only state track; dibagikan semua konsumen pada versi yang sama."""
+        snap = self._snapshot
+        if snap is None or snap.version != self.version:
+            snap = self.store.snapshot(self.version)
+            self._snapshot = snap
+        return snap
+
+    def get_tracked_vehicles_with_status(self) -> Dict[int, Dict[str, Any]]:
+        return self.snapshot().as_dict()
+
     def get_counts(self) -> Dict[str, Any]:
         return {
             "up": dict(self.counts["up"]),
@@ -0,0 +1,200 @@
+"""
+Rekaman video teranotasi sesi deteksi (untuk audit), di-encode di thread terpisah.
+
+- Capture thread hanya memanggil submit(frame, tracks): put_nowait ke antrean terbatas. Bila antrean
+  penuh (encoder tertinggal) frame dibuang, tidak pernah menunggu; jumlah drop dilaporkan.
+- Frame dipacing per timestamp ke slot waktu record_video_fps: frame yang lebih rapat dari slot
+  dilewati, celah diisi dengan mengulang frame, sehingga durasi video = durasi nyata.
+- Thread writer: overlay track (opsional, mode overlay_resolution=display), resize, tulis ke
+  cv2.VideoWriter atau pipe ffmpeg (libx264). Segmen diputar per durasi dan/atau ukuran file.
+
+Satu sesi = satu folder vid_YYYYmmdd_HHMMSS/ berisi seg_NNNNN.mp4.
+"""
+import os
+import queue
+import shutil
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import cv2
+import numpy as np
+
+
+class _CvWriter:
+    def __init__(self, path: Path, fps: float, size, codec: str = "mp4v"):
+        self._w = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*codec), fps, size)
+        if not self._w.isOpened():
+            raise RuntimeError(f"VideoWriter gagal dibuka: {path}")
+
+    def write(self, img: np.ndarray):
+        self._w.write(img)
+
+    def close(self):
+        self._w.release()
+
+
+class _FfmpegWriter:
+    def __init__(self, path: Path, fps: float, size, exe: str, crf: int = 28):
+        w, h = size
+        cmd = [exe, "-y", "-loglevel", "error", "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{w}x{h}",
+               "-r", f"{fps:g}", "-i", "-", "-c:v", "libx264", "-preset", "veryfast", "-crf", str(crf),
+               "-pix_fmt", "yuv420p", str(path)]
+        self._p = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+
+    def write(self, img: np.ndarray):
+        self._p.stdin.write(np.ascontiguousarray(img).data)
+
+    def close(self):
+        try:
+            self._p.stdin.close()
+        finally:
+            self._p.wait()
+
+
+class VideoRecorder:
+    """Rekaman teranotasi non-blocking: submit() O(1), encode + rotasi segmen di thread writer."""
+
+    def __init__(self, out_dir: str, fps: float = 15.0, width: int = 0, backend: str = "opencv",
+                 segment_sec: float = 600.0, segment_mb: float = 0.0, queue_size: int = 32,
+                 overlay_fn: Optional[Callable[[np.ndarray, Any, float], None]] = None):
+        self.path = Path(out_dir)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.fps = max(1.0, float(fps))
+        self.width = int(width) & ~1                 # dimensi genap (yuv420p)
+        self.ffmpeg = shutil.which("ffmpeg") if backend == "ffmpeg" else None
+        if backend == "ffmpeg" and self.ffmpeg is None:
+            print("ffmpeg tidak ditemukan, rekaman video memakai cv2.VideoWriter")
+        self.backend = "ffmpeg" if self.ffmpeg else "opencv"
+        self.segment_sec = float(segment_sec)
+        self.segment_bytes = float(segment_mb) * 1024 * 1024
+        self.overlay_fn = overlay_fn
+        self._q: "queue.Queue" = queue.Queue(maxsize=max(1, int(queue_size)))
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.segments = 0
+        self.queue_peak = 0
+        self.paced = 0                   # frame dilewati karena lebih rapat dari slot fps
+        self.repeated = 0                # frame tambahan (ulang) untuk mengisi celah
+        self._next_slot: Optional[float] = None
+        self._seg_frames = 0
+        self.encode_ms = 0.0
+        self.errors = 0
+        self._writer = None
+        self._seg_path: Optional[Path] = None
+        self._thread = threading.Thread(target=self._run, daemon=True, name="video-recorder")
+        self._thread.start()
+
+    # ===== sisi capture =====
+    def submit(self, frame: np.ndarray, tracks=None, timestamp: Optional[float] = None) -> bool:
+        """
+        Serahkan frame (tidak boleh dimutasi lagi oleh pemanggil). False = tidak ditulis: terlalu rapat
+        untuk slot fps (paced) atau antrean penuh (dropped; slotnya diisi frame berikutnya).
+        """
+        self.submitted += 1
+        ts = time.time() if timestamp is None else float(timestamp)
+        dt = 1.0 / self.fps
+        if self._next_slot is None:
+            count = 1
+            start = ts
+        else:
+            if ts < self._next_slot - 0.5 * dt:
+                self.paced += 1
+                return False
+            count = int((ts - self._next_slot) / dt + 0.5) + 1
+            start = self._next_slot
+            if count > self.fps * 10:        # capture tertahan lama: tulis sekali lalu sinkron ulang
+                count = 1
+                start = ts
+        try:
+            self._q.put_nowait((frame, tracks, start, count))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self._next_slot = start + count * dt
+        self.repeated += count - 1
+        self.queue_peak = max(self.queue_peak, self._q.qsize())
+        return True
+
+    # ===== thread writer =====
+    def _run(self):
+        while True:
+            item = self._q.get()
+            if item is None:
+                break
+            frame, tracks, ts, count = item
+            t0 = time.perf_counter()
+            try:
+                self._write(frame, tracks, ts, count)
+            except Exception as e:
+                self.errors += 1
+                if self.errors == 1:
+                    print(f"Video recorder error: {e}")
+                self._close_segment()
+                continue
+            ms = (time.perf_counter() - t0) * 1000.0
+            self.encode_ms = ms if self.written <= 1 else self.encode_ms * 0.95 + ms * 0.05
+        self._close_segment()
+
+    def _write(self, frame: np.ndarray, tracks, ts: float, count: int = 1):
+        h, w = frame.shape[:2]
+        scale = 1.0
+        img = frame
+        if 0 < self.width < w:
+            scale = self.width / w
+            img = cv2.resize(frame, (self.width, max(2, int(h * scale)) & ~1), interpolation=cv2.INTER_AREA)
+        if tracks is not None and self.overlay_fn is not None:
+            if img is frame:
+                img = frame.copy()
+            self.overlay_fn(img, tracks, scale)
+        eh, ew = img.shape[0] & ~1, img.shape[1] & ~1
+        if (eh, ew) != img.shape[:2]:
+            img = np.ascontiguousarray(img[:eh, :ew])   # yuv420p butuh dimensi genap
+        for k in range(count):
+            if self._writer is not None and self._rotate_due():
+                self._close_segment()
+            if self._writer is None:
+                self._open_segment(img.shape[1], img.shape[0])
+            self._writer.write(img)
+            self._seg_frames += 1
+            self.written += 1
+
+    def _rotate_due(self) -> bool:
+        # Durasi segmen dihitung dari jumlah frame (waktu video), sama dengan waktu nyata karena pacing
+        if self.segment_sec > 0 and self._seg_frames >= self.segment_sec * self.fps:
+            return True
+        if self.segment_bytes > 0 and self.written % 30 == 0:
+            try:
+                return os.path.getsize(self._seg_path) >= self.segment_bytes
+            except OSError:
+                return False
+        return False
+
+    def _open_segment(self, w: int, h: int):
+        self._seg_path = self.path / f"seg_{self.segments:05d}.mp4"
+        if self.backend == "ffmpeg":
+            self._writer = _FfmpegWriter(self._seg_path, self.fps, (w, h), self.ffmpeg)
+        else:
+            self._writer = _CvWriter(self._seg_path, self.fps, (w, h))
+        self._seg_frames = 0
+        self.segments += 1
+
+    def _close_segment(self):
+        if self._writer is not None:
+            try:
+                self._writer.close()
+            finally:
+                self._writer = None
+
+    def close(self):
+        """Tulis sisa antrean lalu tutup segmen terakhir (dipanggil setelah capture berhenti)."""
+        self._q.put(None)
+        self._thread.join()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"submitted": self.submitted, "written": self.written, "dropped": self.dropped,
+                "paced": self.paced, "repeated": self.repeated, "segments": self.segments, "queue": self._q.qsize(), "queue_peak": self.queue_peak,
+                "encode_ms": self.encode_ms, "errors": self.errors, "backend": self.backend}